@@ -0,0 +1,98 @@
+"""Perfil de arranque por INTERFACE_MODE basado en `python -X importtime`.
+
+Importa en un intérprete limpio los módulos que main.py carga para cada modo (sin
+conectar a la BD ni levantar servidores) y resume el tiempo de import y los paquetes que
+más pesan.
+
+Uso (desde engine/):
+    python benchmarks/startup_importtime.py               # todos los modos
+    python benchmarks/startup_importtime.py notary_worker --top 15
+    python benchmarks/startup_importtime.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ENGINE_ROOT = Path(__file__).resolve().parents[1]
+
+# Módulos que main.py importa antes de entrar al bucle de cada modo.
+MODE_IMPORTS: dict[str, list[str]] = {
+    "outbox_dispatcher": ["src.config", "src.persistence", "src.logging_config", "src.queueing"],
+    "notary_worker": ["src.config", "src.persistence", "src.logging_config", "src.notary", "src.queueing"],
+    "api": ["src.config", "src.persistence", "src.logging_config", "src.api.app"],
+    "terminal": ["src.config", "src.persistence", "src.api.auth", "src.cli.run"],
+    "mock_llm": ["src.config", "src.agents.mock_llm_server"],
+}
+
+
+def _parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Filas (self_us, cumulative_us, módulo con sangría) de la salida de -X importtime."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+            rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+        except ValueError:
+            continue
+    return rows
+
+
+def profile_mode(mode: str, top: int = 10) -> dict:
+    code = "; ".join(f"import {module}" for module in MODE_IMPORTS[mode])
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ENGINE_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+    rows = _parse_importtime(proc.stderr)
+    # Paquetes de primer nivel (sin sangría bajo otro import): lo que cuesta cada dependencia.
+    roots = [(cum, name.strip()) for _self, cum, name in rows if not name.startswith("  ")]
+    roots.sort(reverse=True)
+    return {
+        "mode": mode,
+        "ok": proc.returncode == 0,
+        "wall_ms": round(wall_ms, 1),
+        "import_ms": round(sum(self_us for self_us, _cum, _name in rows) / 1000, 1),
+        "modules": len(rows),
+        "top": [{"module": name, "cumulative_ms": round(cum / 1000, 1)} for cum, name in roots[:top]],
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else "",
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modes", nargs="*", help=f"modos a medir (por defecto todos): {', '.join(MODE_IMPORTS)}")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    unknown = [mode for mode in args.modes if mode not in MODE_IMPORTS]
+    if unknown:
+        parser.error(f"modos desconocidos: {', '.join(unknown)}")
+
+    reports = [profile_mode(mode, top=args.top) for mode in (args.modes or list(MODE_IMPORTS))]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for report in reports:
+        status = "" if report["ok"] else f"  ERROR: {report['error']}"
+        print(
+            f"{report['mode']:<18} wall={report['wall_ms']:>8.1f} ms  "
+            f"imports={report['import_ms']:>8.1f} ms  modules={report['modules']}{status}"
+        )
+        for entry in report["top"]:
+            print(f"    {entry['cumulative_ms']:>8.1f} ms  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,20 +5,25 @@ Lee INTERFACE_MODE para elegir modo:
 - api: configura logging mínimo y levanta el servidor HTTP (FastAPI/uvicorn).
 - outbox_dispatcher: publica eventos outbox persistidos hacia Redis Streams.
 - notary_worker: consume checkpoints y materializa snapshots del notario.
+- mock_llm: servidor LLM local compatible con OpenAI que reproduce respuestas grabadas.
+- migrate: one-shot; aplica migraciones, usuario por defecto, plantillas y usuario seed.
 
 Valores inválidos provocan error claro y salida con código 1.
+
+Cada modo importa solo lo que usa: los workers no cargan FastAPI ni el motor y no
+ejecutan migraciones ni bootstrap de plantillas (arranque en frío más corto al escalar).
+Con DB_BOOTSTRAP_ON_START=false tampoco lo hacen terminal/api y el esquema se prepara con
+INTERFACE_MODE=migrate antes del despliegue.
 """
 
 import os
 import sys
 
-from src.api.auth import ensure_seed_user
 from src.config import bootstrap_runtime_config
-from src.persistence import create_persistence_provider
 
 bootstrap_runtime_config()
 
-VALID_MODES = ("terminal", "api", "outbox_dispatcher", "notary_worker")
+VALID_MODES = ("terminal", "api", "outbox_dispatcher", "notary_worker", "mock_llm", "migrate")
 
 
 def main() -> None:
@@ -31,18 +36,37 @@ def main() -> None:
         )
         sys.exit(1)
 
-    # Inicializa persistencia al arranque para fallar rápido en modo db.
-    persistence = create_persistence_provider()
-    ensure_seed_user()
+    if mode == "mock_llm":
+        # No necesita persistencia ni usuarios: solo sirve completions grabadas.
+        from src.agents.mock_llm_server import run_mock_llm_server
+        run_mock_llm_server()
+        return
+
+    from src.persistence import create_persistence_provider, storage_bootstrap_enabled
+
+    if mode == "migrate":
+        from src.api.auth import ensure_seed_user
+        create_persistence_provider(bootstrap=True)
+        ensure_seed_user()
+        print("Migraciones y bootstrap aplicados.")
+        return
 
     if mode == "terminal":
         from src.cli.run import run_terminal
+        # Inicializa persistencia al arranque para fallar rápido en modo db.
+        create_persistence_provider()
+        if storage_bootstrap_enabled():
+            from src.api.auth import ensure_seed_user
+            ensure_seed_user()
         run_terminal()
         return
 
     if mode == "api":
+        from src.api.dependencies import get_persistence_provider
         from src.logging_config import setup_api_logging
         import uvicorn
+        # Falla rápido si la BD no responde; el lifespan reutiliza esta instancia y crea el usuario seed.
+        get_persistence_provider()
         setup_api_logging()
         host = os.getenv("AGORA_API_HOST", "0.0.0.0")
         port = int(os.getenv("AGORA_API_PORT", "8000"))
@@ -59,7 +83,7 @@ def main() -> None:
         from src.queueing import OutboxDispatcher, RedisStreamQueue
         setup_api_logging()
         dispatcher = OutboxDispatcher(
-            persistence=persistence,
+            persistence=create_persistence_provider(bootstrap=False),
             queue_client=RedisStreamQueue(),
         )
         dispatcher.run_forever()
@@ -71,7 +95,7 @@ def main() -> None:
         from src.queueing import RedisStreamQueue
         setup_api_logging()
         worker = NotaryWorker(
-            persistence=persistence,
+            persistence=create_persistence_provider(bootstrap=False),
             queue_client=RedisStreamQueue(),
             processor=LLMNotaryProcessor(fallback_processor=HeuristicNotaryProcessor()),
         )
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS idx_users_username_lower ON users (LOWER(username));
@@ -0,0 +1,26 @@
+ALTER TABLE games
+    ADD COLUMN IF NOT EXISTS turn_count INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE games
+    ADD COLUMN IF NOT EXISTS last_message_preview VARCHAR(160);
+
+UPDATE games g
+SET turn_count = (gs.state_json->>'turn')::int
+FROM game_states gs
+WHERE gs.game_id = g.id
+  AND gs.state_json->>'turn' ~ '^[0-9]+$';
+
+UPDATE games g
+SET last_message_preview = LEFT(m.content, 160)
+FROM (
+    SELECT DISTINCT ON (game_id) game_id, content
+    FROM messages
+    ORDER BY game_id, turn_number DESC, created_at DESC, metadata_json->>'timestamp' DESC NULLS LAST, id DESC
+) m
+WHERE m.game_id = g.id;
+
+CREATE INDEX IF NOT EXISTS idx_games_user_updated_id
+    ON games (user_id, updated_at DESC, id DESC)
+    INCLUDE (title, status, game_mode, standard_template_id, template_version, created_at, turn_count, last_message_preview);
+
+DROP INDEX IF EXISTS idx_games_user_id;
@@ -5,11 +5,16 @@ from typing import Dict, Any, Iterator
 
 from ..player_identity import display_author, player_name_from_state
 from ..state import ConversationState
-from ..text_limits import truncate_agent_output
+from ..text_limits import StreamingOutputTruncator, truncate_agent_output
 from .actor_prompt_template import render_actor_prompt
 from .base import Agent
 from .deepseek_adapter import send_message
-from .scene_prompt_context import build_scene_participants_block
+from .scene_prompt_context import build_scene_participants_block, select_context_messages
+
+_THINKING_MARKERS = (
+    "[Personaje pensando...]",
+    "[personaje pensando...]",
+)
 
 
 class CharacterAgent(Agent):
@@ -45,6 +50,10 @@ class CharacterAgent(Agent):
         self._player_public_mission = player_public_mission
         self._scene_participants = list(scene_participants or [])
         self._prompt_template = prompt_template
+        self._bracket_prefix = f"[{name}]"
+        self._name_prefix_re = re.compile(rf"^{re.escape(name)}\s*[:\-—]\s*")
+        # (player_name, bloque): el contexto público de la escena no cambia entre turnos.
+        self._scene_block: tuple[str, str] | None = None
         # Permitir sobreescribir modelo/temperatura vía entorno
         self._model = os.getenv("DEEPSEEK_MODEL_CHARACTER", model)
         try:
@@ -109,12 +118,15 @@ class CharacterAgent(Agent):
                 extra_system_instruction=extra_system_instruction,
             )
             if not stream:
+                budget = _StreamingSanitizer(self)
                 content = send_message(
                     messages,
                     model=self._model,
+                    role="character",
                     temperature=self._temperature,
                     stream=False,
                     max_tokens=self._max_output_tokens,
+                    stop_when=budget.reached,
                 )
                 assert isinstance(content, str)
                 return {
@@ -123,7 +135,7 @@ class CharacterAgent(Agent):
                 }
             full_content = self._stream_response_to_stdout(messages, stream_sink=stream_sink)
             return {
-                "message": self._sanitize_response_content(full_content),
+                "message": full_content,
                 "author": self.name,
                 "displayed": True,
             }
@@ -140,12 +152,17 @@ class CharacterAgent(Agent):
     ) -> list[dict[str, str]]:
         """Construye la lista de mensajes para el LLM (lógica de dominio)."""
         player_name = player_name_from_state(state)
-        scene_participants_block = build_scene_participants_block(
-            actor_name=self.name,
-            player_name=player_name,
-            player_public_mission=self._player_public_mission,
-            participants=self._scene_participants,
-        )
+        if self._scene_block is None or self._scene_block[0] != player_name:
+            self._scene_block = (
+                player_name,
+                build_scene_participants_block(
+                    actor_name=self.name,
+                    player_name=player_name,
+                    player_public_mission=self._player_public_mission,
+                    participants=self._scene_participants,
+                ),
+            )
+        scene_participants_block = self._scene_block[1]
         system_prompt = render_actor_prompt(
             template=self._prompt_template,
             name=self.name,
@@ -158,8 +175,11 @@ class CharacterAgent(Agent):
         )
 
         max_history = int(os.getenv("CHAR_CONTEXT_MESSAGES", "12"))
-        history = state["messages"][-max_history:]
+        token_budget = int(os.getenv("CHAR_CONTEXT_TOKENS", "0") or 0)
+        snapshot_block, history = select_context_messages(state, max_history, token_budget=token_budget)
         messages = [{"role": "system", "content": system_prompt}]
+        if snapshot_block:
+            messages.append({"role": "system", "content": snapshot_block})
         for msg in history:
             messages.append(
                 {
@@ -177,7 +197,10 @@ class CharacterAgent(Agent):
         messages: list[dict[str, str]],
         stream_sink: Any = None,
     ) -> str:
-        """Consume el stream del modelo; escribe en stdout o en stream_sink(str). Devuelve el texto completo."""
+        """Consume el stream del modelo; escribe en stdout o en stream_sink(str). Devuelve el texto saneado.
+
+        El stream se cierra en cuanto la respuesta alcanza los límites de salida del actor.
+        """
         if stream_sink is None:
             out = sys.stdout
         else:
@@ -196,49 +219,107 @@ class CharacterAgent(Agent):
         response = send_message(
             messages,
             model=self._model,
+            role="character",
             temperature=self._temperature,
             stream=True,
             max_tokens=self._max_output_tokens,
         )
         assert isinstance(response, Iterator)
-        raw_content: list[str] = []
-        emitted_content = ""
-        for chunk in response:
-            raw_content.append(chunk)
-            cleaned_content = self._sanitize_response_content("".join(raw_content))
-            if len(cleaned_content) > len(emitted_content):
-                delta = cleaned_content[len(emitted_content):]
-                out.write(delta)
-                out.flush()
-                emitted_content = cleaned_content
+        sanitizer = _StreamingSanitizer(self)
+        try:
+            for chunk in response:
+                delta = sanitizer.feed(chunk)
+                if delta:
+                    out.write(delta)
+                    out.flush()
+                if sanitizer.done:
+                    break
+        finally:
+            close = getattr(response, "close", None)
+            if callable(close):
+                close()
+        delta = sanitizer.finish()
+        if delta:
+            out.write(delta)
         out.write("\n")
         out.flush()
-        return emitted_content
+        return sanitizer.text
 
-    def _sanitize_response_content(self, content: str) -> str:
-        cleaned = str(content or "").strip()
-        if not cleaned:
-            return ""
-
-        thinking_markers = (
-            "[Personaje pensando...]",
-            "[personaje pensando...]",
-        )
+    def _strip_response_head(self, content: str) -> str:
+        """Elimina marcadores de thinking y prefijos con el nombre del actor al inicio."""
+        cleaned = content
         changed = True
         while changed and cleaned:
             changed = False
-            for marker in thinking_markers:
+            for marker in _THINKING_MARKERS:
                 if cleaned.startswith(marker):
                     cleaned = cleaned[len(marker):].lstrip()
                     changed = True
-            bracket_prefix = f"[{self.name}]"
-            if cleaned.startswith(bracket_prefix):
-                cleaned = cleaned[len(bracket_prefix):].lstrip(" \t:-—\n\r")
+            if cleaned.startswith(self._bracket_prefix):
+                cleaned = cleaned[len(self._bracket_prefix):].lstrip(" \t:-—\n\r")
                 changed = True
-            name_prefix = re.compile(rf"^{re.escape(self.name)}\s*[:\-—]\s*")
-            updated = name_prefix.sub("", cleaned, count=1)
+            updated = self._name_prefix_re.sub("", cleaned, count=1)
             if updated != cleaned:
                 cleaned = updated.lstrip()
                 changed = True
+        return cleaned
+
+    def _is_partial_response_head(self, rest: str) -> bool:
+        """True si `rest` aún podría completarse como marcador o prefijo de nombre."""
+        if not rest:
+            return True
+        for prefix in (*_THINKING_MARKERS, self._bracket_prefix, self.name):
+            if prefix.startswith(rest):
+                return True
+        return rest.startswith(self.name) and not rest[len(self.name):].strip()
+
+    def _sanitize_response_content(self, content: str) -> str:
+        cleaned = str(content or "").strip()
+        if not cleaned:
+            return ""
+        return truncate_agent_output(self._strip_response_head(cleaned))
+
+
+class _StreamingSanitizer:
+    """Saneado incremental de la respuesta de un actor en streaming.
+
+    Fase de cabecera: acumula hasta descartar marcadores/prefijos de nombre (una sola vez).
+    Fase de cuerpo: delega en StreamingOutputTruncator, que aplica los límites de
+    frases/caracteres sin reprocesar el texto ya emitido.
+    """
+
+    def __init__(self, agent: CharacterAgent) -> None:
+        self._agent = agent
+        self._head: str | None = ""
+        self._truncator = StreamingOutputTruncator()
+
+    @property
+    def done(self) -> bool:
+        return self._truncator.done
+
+    @property
+    def text(self) -> str:
+        return self._truncator.text
+
+    def feed(self, chunk: str) -> str:
+        if self._head is None:
+            return self._truncator.feed(chunk)
+        self._head += chunk
+        rest = self._agent._strip_response_head(self._head.lstrip())
+        if self._agent._is_partial_response_head(rest):
+            return ""
+        self._head = None
+        return self._truncator.feed(rest)
+
+    def reached(self, chunk: str) -> bool:
+        """Predicado stop_when para send_message: True cuando ya se alcanzó el límite de salida."""
+        self.feed(chunk)
+        return self.done
 
-        return truncate_agent_output(cleaned)
+    def finish(self) -> str:
+        if self._head is not None:
+            rest = self._agent._strip_response_head(self._head.strip())
+            self._head = None
+            delta = self._truncator.feed(rest)
+            return delta + self._truncator.finish()
+        return self._truncator.finish()
@@ -0,0 +1,210 @@
+"""Pre-clasificador por reglas y caché para la decisión de continuación del observer.
+
+Resuelve localmente los casos obvios (pregunta directa o vocativo a un personaje
+concreto) y solo deja al LLM los dudosos. Modo por OBSERVER_CONTINUATION_RULES:
+- off: siempre LLM.
+- shadow (por defecto): siempre LLM, pero se compara con la regla y se registra
+  la tasa de acuerdo para decidir si activarla.
+- on: si la regla decide, no se llama al LLM.
+
+La caché (OBSERVER_CONTINUATION_CACHE_SIZE, 0 = desactivada) guarda decisiones del
+LLM por ventana normalizada de los últimos 5 mensajes + reparto de personajes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List
+
+from ..observability import emit_event
+from ..player_identity import INTERNAL_PLAYER_AUTHOR
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_WINDOW = 5
+_VALID_MODES = ("off", "shadow", "on")
+_TRAILING_CLOSERS = " \t\n\"'»”’)]*_"
+_NON_WORD_RE = re.compile(r"[^\w?¿ ]+")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def continuation_rules_mode() -> str:
+    mode = os.getenv("OBSERVER_CONTINUATION_RULES", "shadow").strip().lower()
+    return mode if mode in _VALID_MODES else "shadow"
+
+
+def _fold(text: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).casefold()
+
+
+def normalize_text(text: str) -> str:
+    """Minúsculas, sin tildes ni puntuación (salvo interrogaciones) y espacios colapsados."""
+    return _SPACES_RE.sub(" ", _NON_WORD_RE.sub(" ", _fold(text))).strip()
+
+
+def _ends_with_question(text: str) -> bool:
+    return (text or "").rstrip(_TRAILING_CLOSERS).endswith("?")
+
+
+def _mentioned(names: List[str], text: str) -> List[str]:
+    folded = _fold(text)
+    return [
+        name
+        for name in names
+        if name and re.search(rf"(?<!\w){re.escape(_fold(name))}(?!\w)", folded)
+    ]
+
+
+def _vocative(names: List[str], text: str) -> str | None:
+    """Nombre usado como vocativo al inicio del mensaje ("Alice, ..." / "¿Alice, ...")."""
+    head = _fold(text).lstrip(" ¿¡\"'«“")
+    for name in names:
+        folded = _fold(name)
+        if folded and head.startswith(folded) and head[len(folded):len(folded) + 1] in (",", ":"):
+            return name
+    return None
+
+
+def _decision(who: str, actor_names: List[str], reason: str) -> Dict[str, Any]:
+    if who != "user" and len(actor_names) == 1:
+        who = "character"
+    return {"needs_response": True, "who_should_respond": who, "reason": reason}
+
+
+def classify_continuation(
+    messages: List[Dict[str, Any]],
+    actor_names: List[str],
+    player_name: str,
+) -> Dict[str, Any] | None:
+    """Decide sin LLM los casos obvios; devuelve None si el caso es dudoso."""
+    if not messages or not actor_names:
+        return None
+    last = messages[-1]
+    author = last.get("author")
+    content = str(last.get("content") or "")
+    is_question = _ends_with_question(content)
+
+    if author == INTERNAL_PLAYER_AUTHOR:
+        addressed = _vocative(actor_names, content)
+        if addressed:
+            return _decision(addressed, actor_names, f"El jugador se dirige directamente a {addressed}.")
+        mentioned = _mentioned(actor_names, content)
+        if is_question and len(mentioned) == 1:
+            return _decision(mentioned[0], actor_names, f"Pregunta directa del jugador a {mentioned[0]}.")
+        if is_question and len(actor_names) == 1 and not mentioned:
+            return _decision(actor_names[0], actor_names, "Pregunta del jugador al único personaje en escena.")
+        return None
+
+    if author in actor_names and is_question:
+        others = [name for name in actor_names if name != author]
+        addressed = _vocative(others, content)
+        mentioned = _mentioned(others, content)
+        if addressed or len(mentioned) == 1:
+            target = addressed or mentioned[0]
+            return _decision(target, actor_names, f"{author} pregunta directamente a {target}.")
+        if not mentioned and player_name and _mentioned([player_name], content):
+            return _decision("user", actor_names, f"{author} pregunta directamente al jugador.")
+    return None
+
+
+def continuation_cache_key(
+    messages: List[Dict[str, Any]],
+    actor_names: List[str],
+    actors_who_spoke: List[str],
+    player_name: str,
+) -> str:
+    window = messages[-CONTEXT_WINDOW:]
+    parts = [
+        "|".join(sorted(actor_names)),
+        "|".join(sorted(actors_who_spoke)),
+        normalize_text(player_name),
+    ]
+    parts.extend(f"{m.get('author')}:{normalize_text(str(m.get('content') or ''))}" for m in window)
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class ContinuationCache:
+    """LRU acotada de decisiones del LLM."""
+
+    def __init__(self, max_size: int | None = None) -> None:
+        if max_size is None:
+            try:
+                max_size = int(os.getenv("OBSERVER_CONTINUATION_CACHE_SIZE", "256"))
+            except ValueError:
+                max_size = 256
+        self._max_size = max(0, max_size)
+        self._items: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Dict[str, Any] | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return dict(item)
+
+    def put(self, key: str, decision: Dict[str, Any]) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._items[key] = dict(decision)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+
+class ShadowStats:
+    """Contadores de acuerdo regla vs LLM en modo shadow (por proceso)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.compared = 0
+        self.agreed = 0
+
+    @property
+    def agreement_rate(self) -> float:
+        with self._lock:
+            return self.agreed / self.compared if self.compared else 0.0
+
+    def record(self, rule_decision: Dict[str, Any], llm_decision: Dict[str, Any]) -> bool:
+        agreed = (
+            bool(rule_decision.get("needs_response")) == bool(llm_decision.get("needs_response"))
+            and rule_decision.get("who_should_respond") == llm_decision.get("who_should_respond")
+        )
+        with self._lock:
+            self.compared += 1
+            self.agreed += int(agreed)
+            compared, rate = self.compared, self.agreed / self.compared
+        logger.info(
+            "Observer continuation shadow: %s (rule=%s llm=%s, agreement=%.1f%% over %d)",
+            "agree" if agreed else "disagree",
+            rule_decision.get("who_should_respond"),
+            llm_decision.get("who_should_respond"),
+            rate * 100.0,
+            compared,
+        )
+        emit_event(
+            "observer_continuation_shadow",
+            metadata={
+                "agent_type": "observer",
+                "agent_step": "continuation_rules",
+                "status": "agree" if agreed else "disagree",
+                "status_message": (
+                    f"rule={rule_decision.get('who_should_respond')} "
+                    f"llm={llm_decision.get('who_should_respond')} "
+                    f"agreement={rate:.3f} n={compared}"
+                ),
+            },
+        )
+        return agreed
+
+
+shadow_stats = ShadowStats()
@@ -0,0 +1,211 @@
+"""Resumen jerárquico y progresivo del historial de una partida.
+
+CONVERSATION_SUMMARY_MODE:
+- off (por defecto): no se generan resúmenes.
+- heuristic: resumen extractivo determinista (primera frase de cada mensaje).
+- llm: resumen con el backend del rol notary; si falla, se usa el heurístico.
+
+A medida que la partida crece, cada bloque de CONVERSATION_SUMMARY_CHUNK_MESSAGES mensajes
+(dejando siempre fuera los CONVERSATION_SUMMARY_KEEP_RECENT más recientes) se resume en un
+nodo de nivel 0; cuando se acumulan CONVERSATION_SUMMARY_FANIN nodos consecutivos del mismo
+nivel se funden en uno del nivel siguiente. Así el número de nodos crece de forma
+logarítmica con la partida. Los nodos viven en metadata["conversation_summary"] y se
+persisten con el estado; ConversationManager.get_context_window los empaqueta.
+
+El engine resume dentro del paso de persistencia del turno, así que cada persistencia
+resume como mucho CONVERSATION_SUMMARY_MAX_CHUNKS_PER_PERSIST bloques: una partida con
+mucho historial pendiente (p. ej. al activar el modo llm) se pone al día en varios turnos
+en lugar de resumirlo todo, páginas archivadas incluidas, en una sola request.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from ..context_window import SUMMARY_METADATA_KEY, summary_nodes
+from ..observability import emit_event
+from ..player_identity import display_author
+from .deepseek_adapter import send_message
+
+logger = logging.getLogger(__name__)
+
+_VALID_MODES = ("off", "heuristic", "llm")
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?…])\s")
+_MAX_LINE_CHARS = 140
+
+_SYSTEM_PROMPT = """Eres el Notario de una escena narrativa conversacional.
+
+Resume el fragmento indicado en un único párrafo breve (máximo 3 frases), objetivo y en
+tercera persona. Conserva nombres, acuerdos, revelaciones, amenazas y cambios de postura.
+No inventes nada que no aparezca en el fragmento. Responde solo con el resumen, sin
+prefijos ni markdown."""
+
+
+def _int_env(name: str, default: int, minimum: int) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _first_sentence(text: str) -> str:
+    clean = " ".join(str(text or "").split())
+    sentence = _SENTENCE_END_RE.split(clean, maxsplit=1)[0] if clean else ""
+    if len(sentence) > _MAX_LINE_CHARS:
+        sentence = sentence[: _MAX_LINE_CHARS - 1].rstrip() + "…"
+    return sentence
+
+
+def _clip(text: str, max_chars: int) -> str:
+    clean = " ".join(str(text or "").split())
+    return clean if len(clean) <= max_chars else clean[: max_chars - 1].rstrip() + "…"
+
+
+@dataclass(slots=True)
+class SummaryConfig:
+    mode: str = "off"
+    chunk_messages: int = 12
+    keep_recent: int = 12
+    fanin: int = 4
+    max_chars: int = 600
+    max_chunks_per_persist: int = 1
+
+    @classmethod
+    def from_env(cls) -> "SummaryConfig":
+        mode = os.getenv("CONVERSATION_SUMMARY_MODE", "off").strip().lower()
+        return cls(
+            mode=mode if mode in _VALID_MODES else "off",
+            chunk_messages=_int_env("CONVERSATION_SUMMARY_CHUNK_MESSAGES", 12, 2),
+            keep_recent=_int_env("CONVERSATION_SUMMARY_KEEP_RECENT", 12, 0),
+            fanin=_int_env("CONVERSATION_SUMMARY_FANIN", 4, 2),
+            max_chars=_int_env("CONVERSATION_SUMMARY_MAX_CHARS", 600, 80),
+            max_chunks_per_persist=_int_env("CONVERSATION_SUMMARY_MAX_CHUNKS_PER_PERSIST", 1, 1),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+
+class ConversationSummarizer:
+    """Compacta rangos de mensajes en nodos de resumen jerárquicos dentro del estado."""
+
+    def __init__(
+        self,
+        config: SummaryConfig | None = None,
+        model: str = "deepseek-chat",
+    ) -> None:
+        self._config = config or SummaryConfig.from_env()
+        self._model = model
+
+    @property
+    def config(self) -> SummaryConfig:
+        return self._config
+
+    def update(self, state: Dict[str, Any], player_name: str = "", max_chunks: int | None = None) -> int:
+        """Resume los bloques pendientes y funde niveles. Devuelve el número de nodos creados.
+
+        max_chunks limita los bloques de nivel 0 resumidos en esta llamada (None = todos);
+        el resto queda pendiente para la siguiente.
+        """
+        if not self._config.enabled:
+            return 0
+        messages = state.get("messages") or []
+        nodes = [dict(node) for node in summary_nodes(state)]
+        covered = int(nodes[-1]["end"]) if nodes else 0
+        limit = len(messages) - self._config.keep_recent
+        created = 0
+        chunks = 0
+        while limit - covered >= self._config.chunk_messages:
+            if max_chunks is not None and chunks >= max_chunks:
+                break
+            chunks += 1
+            end = covered + self._config.chunk_messages
+            nodes.append(
+                {
+                    "level": 0,
+                    "start": covered,
+                    "end": end,
+                    "text": self._summarize_messages(messages[covered:end], player_name),
+                }
+            )
+            covered = end
+            created += 1
+            created += self._merge_levels(nodes)
+        if created:
+            metadata = state.setdefault("metadata", {})
+            metadata[SUMMARY_METADATA_KEY] = {"covered_until": covered, "nodes": nodes}
+            emit_event(
+                "conversation_summary",
+                metadata={
+                    "agent_type": "notary",
+                    "agent_step": "conversation_summary",
+                    "status": self._config.mode,
+                    "status_message": f"nodes={len(nodes)} created={created} covered_until={covered}",
+                },
+            )
+        return created
+
+    def _merge_levels(self, nodes: List[Dict[str, Any]]) -> int:
+        merged = 0
+        fanin = self._config.fanin
+        while len(nodes) >= fanin:
+            tail = nodes[-fanin:]
+            level = int(tail[0].get("level") or 0)
+            if any(int(node.get("level") or 0) != level for node in tail):
+                break
+            del nodes[-fanin:]
+            nodes.append(
+                {
+                    "level": level + 1,
+                    "start": int(tail[0]["start"]),
+                    "end": int(tail[-1]["end"]),
+                    "text": self._summarize_summaries(tail),
+                }
+            )
+            merged += 1
+        return merged
+
+    def _summarize_messages(self, messages: List[Dict[str, Any]], player_name: str) -> str:
+        lines = [
+            f"{display_author(m.get('author'), player_name=player_name)}: {str(m.get('content') or '').strip()}"
+            for m in messages
+        ]
+        heuristic = " / ".join(
+            f"{display_author(m.get('author'), player_name=player_name)}: {_first_sentence(m.get('content'))}"
+            for m in messages
+            if str(m.get("content") or "").strip()
+        )
+        return self._summarize("Fragmento de conversación:\n" + "\n".join(lines), heuristic)
+
+    def _summarize_summaries(self, nodes: List[Dict[str, Any]]) -> str:
+        texts = [str(node.get("text") or "").strip() for node in nodes]
+        heuristic = " ".join(_first_sentence(text) for text in texts if text)
+        prompt = "Resúmenes consecutivos de la conversación:\n" + "\n".join(f"- {text}" for text in texts)
+        return self._summarize(prompt, heuristic)
+
+    def _summarize(self, prompt: str, heuristic: str) -> str:
+        if self._config.mode == "llm":
+            try:
+                content = send_message(
+                    [
+                        {"role": "system", "content": _SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    model=self._model,
+                    role="notary",
+                    temperature=0.1,
+                    stream=False,
+                    max_tokens=max(64, self._config.max_chars // 3),
+                )
+                text = _clip(str(content or ""), self._config.max_chars)
+                if text:
+                    return text
+            except Exception as exc:
+                logger.warning("Resumen LLM fallido, se usa el heurístico: %s", exc)
+        return _clip(heuristic, self._config.max_chars) or "Sin contenido relevante."
+
@@ -1,9 +1,12 @@
 """
-Adaptador centralizado para llamadas a DeepSeek usando el cliente OpenAI.
+Adaptador centralizado para llamadas LLM usando el cliente OpenAI.
 
 Configuración:
-- base_url: https://api.deepseek.com (API compatible con OpenAI).
-- api_key: variable de entorno DEEPSEEK_API_KEY. Obligatoria; se lanza error si falta.
+- base_url: https://api.deepseek.com (API compatible con OpenAI) salvo override por rol
+  en llm_backends (LLM_BASE_URL, LLM_<ROL>_BASE_URL, LLM_<ROL>_MODEL...).
+- api_key: LLM_<ROL>_API_KEY, LLM_API_KEY o DEEPSEEK_API_KEY (ver llm_backends). Obligatoria con DeepSeek; se lanza error si falta.
+- LLM_RECORD_PATH: si se define, cada respuesta completa se añade a ese JSONL para poder
+  reproducirla después con el servidor mock (INTERFACE_MODE=mock_llm).
 
 Uso básico (sin streaming):
     from src.agents.deepseek_adapter import send_message
@@ -15,20 +18,35 @@ Uso básico (sin streaming):
 Con streaming (para UI gráfica o Android):
     for chunk in send_message(messages, stream=True):
         print(chunk, end="")
+
+Enrutado por rol (usa el backend/modelo configurado para ese rol):
+    content = send_message(messages, role="observer")
+
+Con presupuesto de salida (corta el stream HTTP en cuanto stop_when devuelve True):
+    content = send_message(messages, max_tokens=120, stop_when=lambda piece: ...)
 """
 
 from __future__ import annotations
 
+import json
 import os
+import threading
 import time
-from typing import Iterator
+from typing import Any, Callable, Iterator
 
 from src.logging_config import get_logger
-from src.observability import start_generation, end_generation
+from src.observability import current_user_id, start_generation, end_generation
+
+from .llm_backends import LLMBackend, api_key_env_vars, resolve_backend
+from .llm_resilience import CallStats, ResilientCaller
+from .llm_scheduler import LLMScheduler, SchedulerTicket, estimate_request_tokens
 
-_BASE_URL = "https://api.deepseek.com"
 _HIGH_LATENCY_THRESHOLD_S = 30.0
-_client = None
+_clients: dict[tuple[str, str], Any] = {}
+_clients_lock = threading.Lock()
+_record_lock = threading.Lock()
+_resilience: ResilientCaller | None = None
+_scheduler: LLMScheduler | None = None
 
 
 def _to_int(value) -> int:
@@ -81,20 +99,125 @@ def _calculate_cost_details(usage_details: dict[str, int]) -> dict[str, float]:
     }
 
 
-def _get_client():
-    """Devuelve cliente OpenAI para DeepSeek."""
-    global _client
-    if _client is not None:
-        return _client
-    api_key = os.environ.get("DEEPSEEK_API_KEY")
-    if not api_key or not api_key.strip():
+def _estimate_tokens(text: str) -> int:
+    """Estimación barata de tokens (~4 caracteres por token) cuando no hay usage del proveedor."""
+    return (len(text) + 3) // 4 if text else 0
+
+
+def _close_stream(response) -> None:
+    close = getattr(response, "close", None)
+    if not callable(close):
+        return
+    try:
+        close()
+    except Exception:
+        pass
+
+
+class _SlotStream:
+    """Iterador del stream que libera el hueco de concurrencia aunque nunca llegue a iterarse.
+
+    El finally del generador solo corre si el generador arrancó; si el consumidor descarta
+    el stream sin leerlo, close() (o el recolector) llama a on_abandon.
+    """
+
+    __slots__ = ("_chunks", "_on_abandon", "_started")
+
+    def __init__(self, chunks: Iterator[str], on_abandon: Callable[[], None]) -> None:
+        self._chunks = chunks
+        self._on_abandon: Callable[[], None] | None = on_abandon
+        self._started = False
+
+    def __iter__(self) -> "_SlotStream":
+        return self
+
+    def __next__(self) -> str:
+        self._started = True
+        return next(self._chunks)
+
+    def close(self) -> None:
+        on_abandon, self._on_abandon = self._on_abandon, None
+        if not self._started and on_abandon is not None:
+            on_abandon()
+        self._chunks.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _early_stop_fields(
+    stopped_early: bool,
+    output: str,
+    usage_details: dict[str, int],
+    max_tokens: int | None,
+) -> dict[str, object]:
+    if not stopped_early:
+        return {"early_stop": False}
+    produced = usage_details.get("output") or _estimate_tokens(output)
+    saved = max(0, int(max_tokens) - produced) if max_tokens else 0
+    return {
+        "early_stop": True,
+        "output_tokens_estimate": produced,
+        "output_tokens_saved_estimate": saved,
+    }
+
+
+def _get_client(backend: LLMBackend):
+    """Devuelve el cliente OpenAI del backend (uno por base_url + api_key, reutilizado)."""
+    if not backend.api_key:
         raise ValueError(
-            "DEEPSEEK_API_KEY no está definida. Configúrala en el entorno o en un archivo .env."
+            f"Falta la API key del backend {backend.name} (rol {backend.role}): define "
+            f"{' o '.join(api_key_env_vars(backend.role))} en el entorno o en un archivo .env."
         )
-    api_key = api_key.strip()
-    from openai import OpenAI
-    _client = OpenAI(api_key=api_key, base_url=_BASE_URL)
-    return _client
+    key = (backend.base_url, backend.api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            from openai import OpenAI
+            # Los reintentos los gestiona llm_resilience (con jitter y breaker); evitar reintentos anidados del SDK.
+            client = OpenAI(api_key=backend.api_key, base_url=backend.base_url, max_retries=0)
+            _clients[key] = client
+        return client
+
+
+def _record_completion(
+    backend: LLMBackend,
+    model: str,
+    content: str,
+    usage_details: dict[str, int],
+) -> None:
+    """Añade la respuesta a LLM_RECORD_PATH (JSONL) para replays del servidor mock."""
+    path = os.getenv("LLM_RECORD_PATH", "").strip()
+    if not path or not content:
+        return
+    line = json.dumps(
+        {"role": backend.role, "model": model, "content": content, "usage": usage_details or None},
+        ensure_ascii=False,
+    )
+    try:
+        with _record_lock, open(path, "a", encoding="utf-8") as fh:
+            fh.write(line + "\n")
+    except OSError as exc:
+        get_logger("LLM").warning("No se pudo grabar la respuesta LLM en %s: %s", path, exc)
+
+
+def _get_resilience() -> ResilientCaller:
+    """Devuelve la capa de resiliencia compartida por el proceso (config leída del entorno)."""
+    global _resilience
+    if _resilience is None:
+        _resilience = ResilientCaller()
+    return _resilience
+
+
+def _get_scheduler() -> LLMScheduler:
+    """Devuelve el planificador/rate limiter compartido por el proceso (config leída del entorno)."""
+    global _scheduler
+    if _scheduler is None:
+        _scheduler = LLMScheduler()
+    return _scheduler
 
 
 def send_message(
@@ -104,60 +227,136 @@ def send_message(
     stream: bool = False,
     max_tokens: int | None = None,
     timeout: float | None = None,
+    stop_when: Callable[[str], bool] | None = None,
+    role: str | None = None,
 ) -> str | Iterator[str]:
-    """Envía mensajes a DeepSeek y devuelve la respuesta (texto o stream de chunks).
+    """Envía mensajes al backend LLM del rol y devuelve la respuesta (texto o stream de chunks).
 
     Args:
         messages: Lista de dicts con "role" ("system"|"user"|"assistant") y "content" (str).
         model: Modelo a usar (p. ej. "deepseek-chat").
         temperature: Temperatura para la generación.
         stream: Si True, devuelve un iterador de strings (chunks). Si False, devuelve un único str.
+        stop_when: Predicado opcional evaluado con cada chunk emitido; al devolver True se
+            cierra el stream HTTP para no pagar tokens que se van a descartar. Con stream=False
+            la llamada se hace en streaming internamente y se devuelve el texto acumulado.
+        role: Rol que hace la llamada ("character", "observer", "guionista", "notary"); elige
+            backend y, si LLM_<ROL>_MODEL está definido, sustituye a model.
 
     Returns:
         Si stream=False: contenido de texto de la respuesta (str).
         Si stream=True: iterador que produce strings (fragmentos de contenido).
 
     Raises:
-        ValueError: Si DEEPSEEK_API_KEY no está configurada o la respuesta no tiene contenido.
+        ValueError: Si el backend no tiene API key configurada o la respuesta no tiene contenido.
     """
-    client = _get_client()
+    if stop_when is not None and not stream:
+        return "".join(
+            send_message(
+                messages,
+                model=model,
+                temperature=temperature,
+                stream=True,
+                max_tokens=max_tokens,
+                timeout=timeout,
+                stop_when=stop_when,
+                role=role,
+            )
+        )
+    backend = resolve_backend(role)
+    model = backend.model or model
+    client = _get_client(backend)
     logger = get_logger("LLM")
-    logger.info("LLM call started (model=%s)", model)
+    logger.info("LLM call started (model=%s, backend=%s)", model, backend.name)
     generation = start_generation(
         name="llm_call",
         model=model,
         model_parameters={
             "temperature": temperature,
-            "provider": "deepseek",
+            "provider": backend.provider,
             "stream": stream,
             "max_tokens": max_tokens,
             "timeout": timeout,
         },
         input_data=messages,
-        metadata={"stream": str(bool(stream)).lower(), "model_family": "deepseek"},
+        metadata={
+            "stream": str(bool(stream)).lower(),
+            "model_family": backend.provider,
+            "llm_role": backend.role,
+        },
     )
     t0 = time.perf_counter()
+    resilience = _get_resilience()
+    breaker_key = f"{backend.name}/{model}"
+    stats = CallStats()
+    ticket = SchedulerTicket()
+
+    def _call_fields() -> dict[str, object]:
+        return {**stats.as_fields(), **ticket.as_fields()}
+
+    try:
+        ticket = _get_scheduler().acquire(
+            backend.name,
+            role=backend.role,
+            user_id=current_user_id(),
+            tokens=estimate_request_tokens(messages, max_tokens),
+        )
+        wait_s = resilience.limiter.acquire(resilience.config.concurrency_wait_seconds)
+    except TimeoutError as exc:
+        end_generation(generation, level="ERROR", status_message=str(exc)[:500], extra_fields=_call_fields())
+        raise
+    stats.concurrency_wait_ms = int(wait_s * 1000)
+    slot_released = False
+
+    def _release_slot() -> None:
+        nonlocal slot_released
+        if not slot_released:
+            slot_released = True
+            resilience.limiter.release()
+
     try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=messages,
-            temperature=temperature,
+        response = resilience.call(
+            breaker_key,
+            lambda: client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                stream=stream,
+                max_tokens=max_tokens,
+                timeout=timeout,
+            ),
             stream=stream,
-            max_tokens=max_tokens,
-            timeout=timeout,
+            stats=stats,
         )
     except Exception as exc:
-        end_generation(generation, level="ERROR", status_message=str(exc)[:500])
+        _release_slot()
+        end_generation(
+            generation,
+            level="ERROR",
+            status_message=str(exc)[:500],
+            extra_fields=_call_fields(),
+        )
         if "timeout" in exc.__class__.__name__.lower():
             raise TimeoutError(str(exc)) from exc
         raise
     if not stream:
+        _release_slot()
         if not response.choices or len(response.choices) == 0:
-            end_generation(generation, level="ERROR", status_message="La respuesta de DeepSeek no tiene choices")
+            end_generation(
+                generation,
+                level="ERROR",
+                status_message="La respuesta de DeepSeek no tiene choices",
+                extra_fields=_call_fields(),
+            )
             raise ValueError("La respuesta de DeepSeek no tiene choices")
         content = response.choices[0].message.content
         if content is None:
-            end_generation(generation, level="ERROR", status_message="La respuesta de DeepSeek no tiene contenido")
+            end_generation(
+                generation,
+                level="ERROR",
+                status_message="La respuesta de DeepSeek no tiene contenido",
+                extra_fields=_call_fields(),
+            )
             raise ValueError("La respuesta de DeepSeek no tiene contenido")
         usage_details = _extract_usage_details(getattr(response, "usage", None))
         cost_details = _calculate_cost_details(usage_details)
@@ -166,7 +365,9 @@ def send_message(
             output=content,
             usage_details=usage_details or None,
             cost_details=cost_details or None,
+            extra_fields=_call_fields(),
         )
+        _record_completion(backend, model, content, usage_details)
         elapsed = time.perf_counter() - t0
         logger.info("LLM response received (duration=%.2f s)", elapsed)
         if elapsed > _HIGH_LATENCY_THRESHOLD_S:
@@ -179,6 +380,8 @@ def send_message(
     def _stream() -> Iterator[str]:
         full_content: list[str] = []
         usage_details: dict[str, int] = {}
+        stopped_early = False
+        stream_error: Exception | None = None
         try:
             for chunk in response:
                 chunk_usage = _extract_usage_details(getattr(chunk, "usage", None))
@@ -188,17 +391,52 @@ def send_message(
                     piece = chunk.choices[0].delta.content
                     full_content.append(piece)
                     yield piece
+                    if stop_when is not None and stop_when(piece):
+                        stopped_early = True
+                        break
+        except GeneratorExit:
+            # El consumidor ha dejado de leer (p. ej. alcanzó su propio límite de salida).
+            stopped_early = True
+            raise
+        except Exception as exc:
+            stream_error = exc
+            resilience.breaker_for(breaker_key).record_failure()
+            raise
         finally:
+            if stopped_early:
+                _close_stream(response)
+            _release_slot()
+            output = "".join(full_content)
             cost_details = _calculate_cost_details(usage_details)
             end_generation(
                 generation,
-                output="".join(full_content) if full_content else None,
+                output=output or None,
                 usage_details=usage_details or None,
                 cost_details=cost_details or None,
+                level="ERROR" if stream_error is not None else None,
+                status_message=str(stream_error)[:500] if stream_error is not None else None,
+                extra_fields={
+                    **_call_fields(),
+                    **_early_stop_fields(stopped_early, output, usage_details, max_tokens),
+                },
             )
+            if not stopped_early and stream_error is None:
+                _record_completion(backend, model, output, usage_details)
             elapsed = time.perf_counter() - t0
-            logger.info("LLM streaming finished (duration=%.2f s)", elapsed)
+            if stopped_early:
+                logger.info("LLM streaming stopped early at output budget (duration=%.2f s)", elapsed)
+            else:
+                logger.info("LLM streaming finished (duration=%.2f s)", elapsed)
             if elapsed > _HIGH_LATENCY_THRESHOLD_S:
                 logger.warning("High LLM latency: %.2f s", elapsed)
 
-    return _stream()
+    def _abandon() -> None:
+        _close_stream(response)
+        _release_slot()
+        end_generation(
+            generation,
+            status_message="Stream descartado sin consumir",
+            extra_fields=_call_fields(),
+        )
+
+    return _SlotStream(_stream(), _abandon)
@@ -159,6 +159,7 @@ Responde únicamente con el JSON especificado."""
         response = send_message(
             messages,
             model=self._model,
+            role="guionista",
             temperature=self._temperature,
             stream=True,
             timeout=timeout_seconds,
@@ -211,6 +212,7 @@ Responde únicamente con el JSON especificado."""
                 content = send_message(
                     messages,
                     model=self._model,
+                    role="guionista",
                     temperature=self._temperature,
                     stream=False,
                     timeout=timeout_seconds,
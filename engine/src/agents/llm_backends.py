@@ -0,0 +1,81 @@
+"""Registro de backends LLM por rol (cualquier endpoint compatible con OpenAI).
+
+Cada rol (character, observer, guionista, notary) puede apuntar a su propio
+endpoint/modelo sin tocar código:
+
+    LLM_BASE_URL / LLM_API_KEY / LLM_PROVIDER        -> backend por defecto
+    LLM_<ROL>_BASE_URL / LLM_<ROL>_API_KEY            -> override por rol
+    LLM_<ROL>_MODEL / LLM_<ROL>_PROVIDER
+
+Sin configuración se usa DeepSeek (https://api.deepseek.com + DEEPSEEK_API_KEY),
+igual que antes. Un LLM_<ROL>_MODEL tiene prioridad sobre el modelo que pida el agente.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+
+DEFAULT_BASE_URL = "https://api.deepseek.com"
+DEFAULT_PROVIDER = "deepseek"
+LLM_ROLES = ("character", "observer", "guionista", "notary")
+# Los servidores locales (p. ej. el mock) no validan la key, pero el cliente OpenAI exige una.
+_PLACEHOLDER_API_KEY = "not-needed"
+
+
+@dataclass(frozen=True, slots=True)
+class LLMBackend:
+    role: str
+    base_url: str
+    api_key: str
+    provider: str
+    model: str | None = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}@{self.base_url}"
+
+
+def api_key_env_vars(role: str) -> tuple[str, ...]:
+    """Variables de entorno que resolve_backend consulta (en orden) para la key de un rol."""
+    role_key = (role or "").strip().lower()
+    names = (f"LLM_{role_key.upper()}_API_KEY",) if role_key in LLM_ROLES else ()
+    return names + ("LLM_API_KEY", "DEEPSEEK_API_KEY")
+
+
+def _env(name: str) -> str:
+    return (os.getenv(name) or "").strip()
+
+
+def resolve_backend(role: str | None = None) -> LLMBackend:
+    """Resuelve el backend para un rol; los overrides LLM_<ROL>_* pisan al backend por defecto.
+
+    Con DeepSeek sin key, api_key queda vacía y el error se lanza al crear el cliente.
+
+    Raises:
+        ValueError: si el rol no es conocido.
+    """
+    role_key = (role or "").strip().lower()
+    if role_key and role_key not in LLM_ROLES:
+        raise ValueError(f"Rol LLM desconocido: {role!r} (válidos: {', '.join(LLM_ROLES)})")
+    prefix = f"LLM_{role_key.upper()}_" if role_key else None
+
+    def lookup(suffix: str) -> str:
+        if prefix:
+            value = _env(prefix + suffix)
+            if value:
+                return value
+        return _env("LLM_" + suffix)
+
+    base_url = (lookup("BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+    provider = lookup("PROVIDER") or (DEFAULT_PROVIDER if base_url == DEFAULT_BASE_URL else "openai_compatible")
+    api_key = lookup("API_KEY")
+    if not api_key:
+        api_key = _env("DEEPSEEK_API_KEY") if base_url == DEFAULT_BASE_URL else _PLACEHOLDER_API_KEY
+    return LLMBackend(
+        role=role_key or "default",
+        base_url=base_url,
+        api_key=api_key,
+        provider=provider,
+        model=(_env(prefix + "MODEL") if prefix else "") or None,
+    )
@@ -0,0 +1,338 @@
+"""Capa de resiliencia para llamadas LLM.
+
+- Reintentos con backoff exponencial y jitter completo ante errores transitorios
+  (timeouts, errores de conexión, 429 y 5xx).
+- Hedging opcional: si una llamada sin streaming supera el p95 de latencia del
+  modelo se lanza una segunda petición y se usa la primera que termine.
+- Circuit breaker por modelo: tras N fallos consecutivos se rechazan llamadas
+  durante un cooldown y después se deja pasar una sola llamada de prueba.
+- Límite global de concurrencia para no saturar al proveedor desde un proceso.
+
+Configuración por entorno (LLM_*), leída una vez al crear el ResilientCaller.
+"""
+
+from __future__ import annotations
+
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable
+
+_RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+_RETRYABLE_NAME_HINTS = ("timeout", "connection", "ratelimit", "internalserver", "serviceunavailable")
+
+
+class CircuitOpenError(RuntimeError):
+    """El circuit breaker del modelo está abierto; la llamada se rechaza sin ir al proveedor."""
+
+
+def _int_env(name: str, default: int, minimum: int = 0) -> int:
+    try:
+        return max(minimum, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float, minimum: float = 0.0) -> float:
+    try:
+        return max(minimum, float(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _bool_env(name: str, default: bool) -> bool:
+    raw = os.getenv(name, "").strip().lower()
+    if not raw:
+        return default
+    return raw in ("1", "true", "yes", "on")
+
+
+@dataclass(slots=True)
+class ResilienceConfig:
+    max_attempts: int = 3
+    base_delay_seconds: float = 0.5
+    max_delay_seconds: float = 4.0
+    hedging_enabled: bool = False
+    hedge_percentile: float = 95.0
+    hedge_min_samples: int = 20
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+    max_concurrency: int = 16
+    concurrency_wait_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ResilienceConfig":
+        return cls(
+            max_attempts=_int_env("LLM_RETRY_MAX_ATTEMPTS", 3, minimum=1),
+            base_delay_seconds=_float_env("LLM_RETRY_BASE_DELAY_SECONDS", 0.5),
+            max_delay_seconds=_float_env("LLM_RETRY_MAX_DELAY_SECONDS", 4.0),
+            hedging_enabled=_bool_env("LLM_HEDGING_ENABLED", False),
+            hedge_percentile=min(99.9, _float_env("LLM_HEDGE_PERCENTILE", 95.0, minimum=50.0)),
+            hedge_min_samples=_int_env("LLM_HEDGE_MIN_SAMPLES", 20, minimum=1),
+            breaker_failure_threshold=_int_env("LLM_BREAKER_FAILURE_THRESHOLD", 5, minimum=1),
+            breaker_reset_seconds=_float_env("LLM_BREAKER_RESET_SECONDS", 30.0),
+            max_concurrency=_int_env("LLM_MAX_CONCURRENCY", 16, minimum=1),
+            concurrency_wait_seconds=_float_env("LLM_CONCURRENCY_WAIT_SECONDS", 30.0),
+        )
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """True para errores transitorios del proveedor; los 4xx de cliente no se reintentan."""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    status_code = getattr(exc, "status_code", None)
+    if isinstance(status_code, int):
+        return status_code in _RETRYABLE_STATUS
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    name = exc.__class__.__name__.lower()
+    return any(hint in name for hint in _RETRYABLE_NAME_HINTS)
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng: random.Random | None = None) -> float:
+    """Backoff exponencial con jitter completo: uniforme en [0, min(cap, base * 2^(attempt-1))]."""
+    ceiling = min(cap, base * (2 ** max(0, attempt - 1)))
+    if ceiling <= 0:
+        return 0.0
+    return (rng or random).uniform(0.0, ceiling)
+
+
+class CircuitBreaker:
+    """Circuit breaker por modelo (closed -> open -> half_open -> closed)."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_seconds: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_seconds = max(0.0, reset_seconds)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state_locked()
+
+    def _state_locked(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self._reset_seconds:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """Lanza CircuitOpenError si el circuito no admite la llamada."""
+        with self._lock:
+            state = self._state_locked()
+            if state == "closed":
+                return
+            if state == "half_open" and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return
+        raise CircuitOpenError("LLM circuit breaker abierto; el proveedor está fallando de forma continuada")
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probe_in_flight or self._failures >= self._failure_threshold:
+                self._opened_at = self._clock()
+            self._probe_in_flight = False
+
+
+class LatencyTracker:
+    """Ventana deslizante de latencias para estimar percentiles por modelo."""
+
+    def __init__(self, maxlen: int = 200) -> None:
+        self._samples: deque[float] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(max(0.0, seconds))
+
+    def percentile(self, pct: float, min_samples: int = 1) -> float | None:
+        with self._lock:
+            if len(self._samples) < max(1, min_samples):
+                return None
+            ordered = sorted(self._samples)
+        idx = min(len(ordered) - 1, int(round((pct / 100.0) * (len(ordered) - 1))))
+        return ordered[idx]
+
+
+class ConcurrencyLimiter:
+    """Semáforo global de llamadas LLM en vuelo dentro del proceso."""
+
+    def __init__(self, limit: int) -> None:
+        self._semaphore = threading.BoundedSemaphore(max(1, limit))
+
+    def acquire(self, timeout: float) -> float:
+        """Bloquea hasta obtener hueco; devuelve los segundos de espera o lanza TimeoutError."""
+        t0 = time.perf_counter()
+        if not self._semaphore.acquire(timeout=timeout):
+            raise TimeoutError("Límite de concurrencia LLM: no hay hueco disponible")
+        return time.perf_counter() - t0
+
+    def try_acquire(self) -> bool:
+        return self._semaphore.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+@dataclass(slots=True)
+class CallStats:
+    attempts: int = 0
+    hedged: bool = False
+    hedge_won: bool = False
+    concurrency_wait_ms: int = 0
+    breaker_state: str = "closed"
+
+    def as_fields(self) -> dict[str, Any]:
+        return {
+            "llm_attempts": self.attempts,
+            "llm_retries": max(0, self.attempts - 1),
+            "llm_hedged": self.hedged,
+            "llm_hedge_won": self.hedge_won,
+            "llm_breaker_state": self.breaker_state,
+            "llm_concurrency_wait_ms": self.concurrency_wait_ms,
+        }
+
+
+class ResilientCaller:
+    """Ejecuta la creación de peticiones LLM aplicando breaker, reintentos y hedging."""
+
+    def __init__(
+        self,
+        config: ResilienceConfig | None = None,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.config = config or ResilienceConfig.from_env()
+        self.limiter = ConcurrencyLimiter(self.config.max_concurrency)
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._breakers: dict[str, CircuitBreaker] = {}
+        self._latencies: dict[str, LatencyTracker] = {}
+        self._executor: ThreadPoolExecutor | None = None
+
+    def breaker_for(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = CircuitBreaker(
+                    self.config.breaker_failure_threshold,
+                    self.config.breaker_reset_seconds,
+                )
+                self._breakers[model] = breaker
+            return breaker
+
+    def latency_for(self, model: str) -> LatencyTracker:
+        with self._lock:
+            tracker = self._latencies.get(model)
+            if tracker is None:
+                tracker = LatencyTracker()
+                self._latencies[model] = tracker
+            return tracker
+
+    def call(self, model: str, fn: Callable[[], Any], *, stream: bool, stats: CallStats) -> Any:
+        """Ejecuta fn() (la petición al proveedor) con reintentos; hedging solo sin streaming.
+
+        Para streaming solo se protege la apertura del stream: una vez emitidos chunks
+        no se reintenta (el consumidor ya los ha visto).
+        """
+        breaker = self.breaker_for(model)
+        stats.breaker_state = breaker.state
+        breaker.before_call()
+        attempt = 0
+        while True:
+            attempt += 1
+            stats.attempts = attempt
+            try:
+                if stream:
+                    result = fn()
+                elif self.config.hedging_enabled:
+                    result = self._call_hedged(model, fn, stats)
+                else:
+                    t0 = time.perf_counter()
+                    result = fn()
+                    self.latency_for(model).record(time.perf_counter() - t0)
+            except Exception as exc:
+                if not is_retryable_error(exc):
+                    # El proveedor respondió (p. ej. 400): no cuenta como caída.
+                    breaker.record_success()
+                    raise
+                breaker.record_failure()
+                stats.breaker_state = breaker.state
+                if attempt >= self.config.max_attempts or stats.breaker_state != "closed":
+                    raise
+                self._sleep(
+                    backoff_delay(
+                        attempt,
+                        self.config.base_delay_seconds,
+                        self.config.max_delay_seconds,
+                    )
+                )
+                continue
+            breaker.record_success()
+            stats.breaker_state = breaker.state
+            return result
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(2, self.config.max_concurrency * 2),
+                    thread_name_prefix="llm-hedge",
+                )
+            return self._executor
+
+    def _call_hedged(self, model: str, fn: Callable[[], Any], stats: CallStats) -> Any:
+        tracker = self.latency_for(model)
+        hedge_after = tracker.percentile(self.config.hedge_percentile, self.config.hedge_min_samples)
+        t0 = time.perf_counter()
+        if hedge_after is None:
+            result = fn()
+            tracker.record(time.perf_counter() - t0)
+            return result
+
+        executor = self._get_executor()
+        # Un Context no puede estar activo en dos hilos a la vez: una copia por envío.
+        primary = executor.submit(contextvars.copy_context().run, fn)
+        done, _ = wait([primary], timeout=hedge_after)
+        if done or not self.limiter.try_acquire():
+            result = primary.result()
+            tracker.record(time.perf_counter() - t0)
+            return result
+
+        stats.hedged = True
+        hedge = executor.submit(contextvars.copy_context().run, fn)
+        hedge.add_done_callback(lambda _f: self.limiter.release())
+        pending: set[Future] = {primary, hedge}
+        first_error: BaseException | None = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                error = fut.exception()
+                if error is None:
+                    stats.hedge_won = fut is hedge
+                    tracker.record(time.perf_counter() - t0)
+                    return fut.result()
+                first_error = first_error or error
+        assert first_error is not None
+        raise first_error
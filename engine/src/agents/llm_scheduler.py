@@ -0,0 +1,338 @@
+"""Rate limiting global y planificación justa de llamadas LLM.
+
+- Token bucket por minuto de peticiones (RPM) y de tokens (TPM) por backend, local al
+  proceso o compartido entre procesos vía Redis (LLM_RATE_LIMIT_BACKEND=redis).
+- Cola con prioridad por rol: los streams interactivos de personajes pasan antes que
+  guionista, observer y, por último, el notario (trabajo en segundo plano).
+- Dentro de una misma prioridad, reparto justo por usuario (start-time fair queuing):
+  un usuario con muchas partidas no acapara el cupo frente a otro con una sola.
+
+Sin LLM_RATE_LIMIT_RPM ni LLM_RATE_LIMIT_TPM el planificador deja pasar todo sin esperas.
+
+Con Redis, la consulta al bucket se hace fuera del lock del planificador y con timeout de
+socket; si Redis falla, el cupo se degrada a un bucket local por proceso (fail-open acotado)
+en lugar de bloquear o tumbar las llamadas LLM.
+"""
+
+from __future__ import annotations
+
+import heapq
+import importlib
+import itertools
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol
+
+ROLE_PRIORITY = {"character": 0, "guionista": 1, "observer": 2, "notary": 3}
+DEFAULT_PRIORITY = 2
+_DEFAULT_OUTPUT_TOKENS = 512
+
+logger = logging.getLogger(__name__)
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(0, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+@dataclass(slots=True)
+class SchedulerConfig:
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    backend: str = "local"
+    redis_url: str = "redis://localhost:6379/0"
+    redis_key_prefix: str = "agora:llm_rate"
+    max_wait_seconds: float = 60.0
+    redis_timeout_seconds: float = 0.5
+
+    @property
+    def enabled(self) -> bool:
+        return self.requests_per_minute > 0 or self.tokens_per_minute > 0
+
+    @classmethod
+    def from_env(cls) -> "SchedulerConfig":
+        return cls(
+            requests_per_minute=_int_env("LLM_RATE_LIMIT_RPM", 0),
+            tokens_per_minute=_int_env("LLM_RATE_LIMIT_TPM", 0),
+            backend=(os.getenv("LLM_RATE_LIMIT_BACKEND", "local").strip().lower() or "local"),
+            redis_url=(os.getenv("REDIS_URL", "redis://localhost:6379/0")).strip(),
+            redis_key_prefix=(os.getenv("LLM_RATE_LIMIT_REDIS_PREFIX", "agora:llm_rate")).strip(),
+            max_wait_seconds=_float_env("LLM_RATE_LIMIT_WAIT_SECONDS", 60.0),
+            redis_timeout_seconds=_float_env("LLM_RATE_LIMIT_REDIS_TIMEOUT_SECONDS", 0.5),
+        )
+
+
+def estimate_request_tokens(messages: list[dict[str, Any]], max_tokens: int | None) -> int:
+    """Estimación conservadora (prompt ~4 chars/token + salida máxima) para el bucket TPM."""
+    prompt_chars = sum(len(str(m.get("content") or "")) for m in messages if isinstance(m, dict))
+    return (prompt_chars + 3) // 4 + (max_tokens or _DEFAULT_OUTPUT_TOKENS)
+
+
+class RateBudget(Protocol):
+    def try_acquire(self, requests: int, tokens: int) -> float:
+        """Consume requests/tokens si hay cupo y devuelve 0; si no, segundos hasta que lo haya."""
+        ...
+
+
+class LocalRateBudget:
+    """Par de token buckets (RPM y TPM) en memoria; capacidad = cupo de un minuto."""
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._rpm = max(0, requests_per_minute)
+        self._tpm = max(0, tokens_per_minute)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests = float(self._rpm)
+        self._tokens = float(self._tpm)
+        self._updated = clock()
+
+    def _refill_locked(self) -> None:
+        now = self._clock()
+        elapsed = max(0.0, now - self._updated)
+        self._updated = now
+        if self._rpm:
+            self._requests = min(float(self._rpm), self._requests + elapsed * self._rpm / 60.0)
+        if self._tpm:
+            self._tokens = min(float(self._tpm), self._tokens + elapsed * self._tpm / 60.0)
+
+    def try_acquire(self, requests: int, tokens: int) -> float:
+        with self._lock:
+            self._refill_locked()
+            wait = 0.0
+            if self._rpm:
+                need = min(float(requests), float(self._rpm))
+                if self._requests < need:
+                    wait = max(wait, (need - self._requests) * 60.0 / self._rpm)
+            if self._tpm:
+                need_tokens = min(float(tokens), float(self._tpm))
+                if self._tokens < need_tokens:
+                    wait = max(wait, (need_tokens - self._tokens) * 60.0 / self._tpm)
+            if wait > 0:
+                return wait
+            if self._rpm:
+                self._requests -= min(float(requests), float(self._rpm))
+            if self._tpm:
+                self._tokens -= min(float(tokens), float(self._tpm))
+            return 0.0
+
+
+# KEYS[1]=bucket hash; ARGV: rpm, tpm, requests, tokens. Devuelve espera en ms (0 = concedido).
+_REDIS_TRY_ACQUIRE = """
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local need_r = math.min(tonumber(ARGV[3]), rpm > 0 and rpm or tonumber(ARGV[3]))
+local need_t = math.min(tonumber(ARGV[4]), tpm > 0 and tpm or tonumber(ARGV[4]))
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'r', 't', 'ts')
+local r = tonumber(state[1]) or rpm
+local tk = tonumber(state[2]) or tpm
+local ts = tonumber(state[3]) or now
+local elapsed = math.max(0, now - ts)
+if rpm > 0 then r = math.min(rpm, r + elapsed * rpm / 60) end
+if tpm > 0 then tk = math.min(tpm, tk + elapsed * tpm / 60) end
+local wait = 0
+if rpm > 0 and r < need_r then wait = math.max(wait, (need_r - r) * 60 / rpm) end
+if tpm > 0 and tk < need_t then wait = math.max(wait, (need_t - tk) * 60 / tpm) end
+if wait == 0 then
+  if rpm > 0 then r = r - need_r end
+  if tpm > 0 then tk = tk - need_t end
+end
+redis.call('HSET', KEYS[1], 'r', r, 't', tk, 'ts', now)
+redis.call('EXPIRE', KEYS[1], 120)
+return math.ceil(wait * 1000)
+"""
+
+
+class RedisRateBudget:
+    """Mismo algoritmo que LocalRateBudget, atómico en Redis para compartir cupo entre procesos.
+
+    Si Redis no responde (timeout de socket) o falla, la petición se cobra a un bucket local
+    con los mismos límites: el cupo deja de ser global pero sigue acotado por proceso.
+    """
+
+    def __init__(
+        self,
+        redis_url: str,
+        key: str,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        timeout_seconds: float = 0.5,
+    ) -> None:
+        try:
+            redis_module = importlib.import_module("redis")
+        except ModuleNotFoundError as exc:
+            raise RuntimeError("Falta dependencia 'redis' para usar LLM_RATE_LIMIT_BACKEND=redis") from exc
+        timeout = timeout_seconds if timeout_seconds > 0 else None
+        self._client = redis_module.Redis.from_url(
+            redis_url,
+            decode_responses=True,
+            socket_timeout=timeout,
+            socket_connect_timeout=timeout,
+        )
+        self._script = self._client.register_script(_REDIS_TRY_ACQUIRE)
+        self._errors: tuple[type[BaseException], ...] = (redis_module.RedisError, OSError)
+        self._key = key
+        self._rpm = max(0, requests_per_minute)
+        self._tpm = max(0, tokens_per_minute)
+        self._fallback = LocalRateBudget(self._rpm, self._tpm)
+
+    def try_acquire(self, requests: int, tokens: int) -> float:
+        try:
+            wait_ms = self._script(keys=[self._key], args=[self._rpm, self._tpm, requests, tokens])
+        except self._errors as exc:
+            logger.warning("Rate limit LLM: Redis no disponible (%s); se usa el cupo local", exc)
+            return self._fallback.try_acquire(requests, tokens)
+        return max(0.0, float(wait_ms) / 1000.0)
+
+
+@dataclass(slots=True)
+class SchedulerTicket:
+    priority: int = DEFAULT_PRIORITY
+    queue_depth: int = 0
+    wait_ms: int = 0
+
+    def as_fields(self) -> dict[str, Any]:
+        return {
+            "llm_priority": self.priority,
+            "llm_queue_depth": self.queue_depth,
+            "llm_queue_wait_ms": self.wait_ms,
+        }
+
+
+@dataclass(order=True, slots=True)
+class _Waiter:
+    priority: int
+    start_tag: float
+    seq: int
+    user: str = field(compare=False)
+    tokens: int = field(compare=False)
+
+
+@dataclass(slots=True)
+class _Lane:
+    budget: RateBudget
+    heap: list[_Waiter] = field(default_factory=list)
+    virtual_time: float = 0.0
+    finish_tags: dict[str, float] = field(default_factory=dict)
+    # La cabeza está consultando el bucket fuera del lock (puede ser una ida a Redis).
+    probing: bool = False
+
+
+class LLMScheduler:
+    """Cola de prioridad + reparto justo por usuario delante de los buckets de cada backend."""
+
+    def __init__(
+        self,
+        config: SchedulerConfig | None = None,
+        budget_factory: Callable[[str], RateBudget] | None = None,
+    ) -> None:
+        self.config = config or SchedulerConfig.from_env()
+        self._budget_factory = budget_factory or self._default_budget
+        self._cond = threading.Condition()
+        self._lanes: dict[str, _Lane] = {}
+        self._seq = itertools.count()
+
+    def _default_budget(self, key: str) -> RateBudget:
+        if self.config.backend == "redis":
+            return RedisRateBudget(
+                self.config.redis_url,
+                f"{self.config.redis_key_prefix}:{key}",
+                self.config.requests_per_minute,
+                self.config.tokens_per_minute,
+                timeout_seconds=self.config.redis_timeout_seconds,
+            )
+        return LocalRateBudget(self.config.requests_per_minute, self.config.tokens_per_minute)
+
+    def queue_depth(self, key: str) -> int:
+        with self._cond:
+            lane = self._lanes.get(key)
+            return len(lane.heap) if lane else 0
+
+    def acquire(
+        self,
+        key: str,
+        *,
+        role: str | None,
+        user_id: str | None,
+        tokens: int,
+        timeout: float | None = None,
+    ) -> SchedulerTicket:
+        """Bloquea hasta que la petición tenga turno y cupo; TimeoutError si se agota la espera.
+
+        Solo la cabeza de la cola consulta el bucket y lo hace sin el lock del planificador:
+        una llamada lenta a Redis no frena al resto de carriles ni impide que los demás
+        waiters despierten para cumplir su plazo.
+        """
+        priority = ROLE_PRIORITY.get((role or "").lower(), DEFAULT_PRIORITY)
+        if not self.config.enabled:
+            return SchedulerTicket(priority=priority)
+        t0 = time.perf_counter()
+        deadline = t0 + (self.config.max_wait_seconds if timeout is None else timeout)
+        user = user_id or ""
+        with self._cond:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = _Lane(budget=self._budget_factory(key))
+                self._lanes[key] = lane
+            start_tag = max(lane.virtual_time, lane.finish_tags.get(user, 0.0))
+            lane.finish_tags[user] = start_tag + 1.0
+            waiter = _Waiter(priority, start_tag, next(self._seq), user, max(0, tokens))
+            heapq.heappush(lane.heap, waiter)
+            ticket = SchedulerTicket(priority=priority, queue_depth=len(lane.heap) - 1)
+            try:
+                while True:
+                    if lane.heap[0] is waiter and not lane.probing:
+                        lane.probing = True
+                        self._cond.release()
+                        try:
+                            wait = lane.budget.try_acquire(1, waiter.tokens)
+                        finally:
+                            self._cond.acquire()
+                            lane.probing = False
+                            self._cond.notify_all()
+                        if wait <= 0:
+                            # Mientras se consultaba pudo entrar alguien delante: se saca por valor.
+                            lane.heap.remove(waiter)
+                            heapq.heapify(lane.heap)
+                            lane.virtual_time = max(lane.virtual_time, waiter.start_tag)
+                            self._prune_tags(lane)
+                            ticket.wait_ms = int((time.perf_counter() - t0) * 1000)
+                            return ticket
+                        remaining = deadline - time.perf_counter()
+                        sleep_for = min(wait, remaining)
+                    else:
+                        remaining = deadline - time.perf_counter()
+                        sleep_for = remaining
+                    if remaining <= 0:
+                        raise TimeoutError("Rate limit LLM: la petición no obtuvo cupo a tiempo")
+                    self._cond.wait(timeout=max(0.001, sleep_for))
+            except BaseException:
+                if waiter in lane.heap:
+                    lane.heap.remove(waiter)
+                    heapq.heapify(lane.heap)
+                    self._cond.notify_all()
+                raise
+
+    @staticmethod
+    def _prune_tags(lane: _Lane) -> None:
+        # Un usuario cuyo finish_tag ya quedó atrás equivale a uno nuevo: no hace falta recordarlo.
+        if len(lane.finish_tags) > 256:
+            lane.finish_tags = {u: tag for u, tag in lane.finish_tags.items() if tag > lane.virtual_time}
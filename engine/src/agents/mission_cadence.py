@@ -0,0 +1,104 @@
+"""Cadencia adaptativa de la evaluación de misión del observer.
+
+OBSERVER_MISSION_EVAL_CADENCE:
+- always (por defecto): se evalúa en cada mensaje del jugador, como hasta ahora.
+- adaptive: no se evalúa antes de OBSERVER_MISSION_EVAL_MIN_TURN y después solo cada
+  OBSERVER_MISSION_EVAL_EVERY turnos, salvo que una señal barata adelante la evaluación:
+  el notario marca la misión como advanced/achieved (metadata notary_mission_progress)
+  o el último mensaje del jugador comparte palabras clave con la misión.
+
+El estado de la cadencia viaja en metadata["mission_eval_cadence"] para sobrevivir a la
+rehidratación y permitir comparar llamadas ahorradas frente al retraso de detección.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import unicodedata
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from ..player_identity import INTERNAL_PLAYER_AUTHOR
+
+_PROGRESS_STATUSES = ("advanced", "achieved")
+_WORD_RE = re.compile(r"\w+")
+_MIN_KEYWORD_LEN = 5
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _keywords(text: str) -> set[str]:
+    folded = "".join(
+        ch for ch in unicodedata.normalize("NFKD", text or "") if not unicodedata.combining(ch)
+    ).casefold()
+    return {word for word in _WORD_RE.findall(folded) if len(word) >= _MIN_KEYWORD_LEN}
+
+
+@dataclass(slots=True)
+class MissionEvalCadence:
+    mode: str = "always"
+    min_turn: int = 3
+    every: int = 2
+    keyword_overlap: int = 2
+
+    @classmethod
+    def from_env(cls) -> "MissionEvalCadence":
+        mode = os.getenv("OBSERVER_MISSION_EVAL_CADENCE", "always").strip().lower()
+        return cls(
+            mode=mode if mode in ("always", "adaptive") else "always",
+            min_turn=_int_env("OBSERVER_MISSION_EVAL_MIN_TURN", 3),
+            every=_int_env("OBSERVER_MISSION_EVAL_EVERY", 2),
+            keyword_overlap=_int_env("OBSERVER_MISSION_EVAL_KEYWORD_OVERLAP", 2),
+        )
+
+    def decide(self, state: Dict[str, Any], player_mission: str) -> tuple[bool, str]:
+        """(evaluar, motivo) para el turno actual."""
+        if self.mode != "adaptive":
+            return True, "always"
+        metadata = state.get("metadata", {}) or {}
+        progress = metadata.get("notary_mission_progress")
+        if isinstance(progress, dict) and str(progress.get("status") or "").lower() in _PROGRESS_STATUSES:
+            return True, "notary_progress"
+        if self._mentions_mission(state.get("messages", []), player_mission):
+            return True, "mission_keywords"
+        turn = int(state.get("turn") or 0)
+        if turn < self.min_turn:
+            return False, "before_min_turn"
+        stats = metadata.get("mission_eval_cadence")
+        last_evaluated = stats.get("last_evaluated_turn") if isinstance(stats, dict) else None
+        if last_evaluated is None or turn - int(last_evaluated) >= self.every:
+            return True, "cadence"
+        return False, "cadence_wait"
+
+    def _mentions_mission(self, messages: List[Dict[str, Any]], player_mission: str) -> bool:
+        if not messages or messages[-1].get("author") != INTERNAL_PLAYER_AUTHOR:
+            return False
+        mission_words = _keywords(player_mission)
+        if not mission_words:
+            return False
+        needed = min(self.keyword_overlap, len(mission_words))
+        return len(mission_words & _keywords(str(messages[-1].get("content") or ""))) >= needed
+
+
+def updated_cadence_stats(previous: Any, *, evaluated: bool, turn: int) -> Dict[str, Any]:
+    """Acumula evaluaciones hechas/omitidas y los turnos omitidos desde la última evaluación."""
+    stats = dict(previous) if isinstance(previous, dict) else {}
+    stats.setdefault("evaluated", 0)
+    stats.setdefault("skipped", 0)
+    stats.setdefault("skipped_since_eval", 0)
+    stats.setdefault("last_evaluated_turn", None)
+    if evaluated:
+        stats["evaluated"] += 1
+        stats["last_evaluated_turn"] = turn
+        stats["detection_delay_turns"] = stats["skipped_since_eval"]
+        stats["skipped_since_eval"] = 0
+    else:
+        stats["skipped"] += 1
+        stats["skipped_since_eval"] += 1
+    return stats
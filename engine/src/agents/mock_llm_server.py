@@ -0,0 +1,283 @@
+"""Servidor LLM local compatible con OpenAI que reproduce respuestas grabadas.
+
+Pensado para pruebas de carga y desarrollo sin coste: se apunta un rol (o todos) a
+este servidor con LLM_<ROL>_BASE_URL=http://host:puerto/v1 y responde a
+POST /v1/chat/completions, con y sin streaming (SSE).
+
+Grabaciones: JSONL con objetos {"content": str, "model"?: str, "role"?: str, "usage"?: {...}},
+el mismo formato que escribe el adaptador cuando LLM_RECORD_PATH está definido. Se
+reproducen en round-robin, priorizando las del modelo pedido.
+
+Configuración (INTERFACE_MODE=mock_llm):
+- MOCK_LLM_HOST / MOCK_LLM_PORT: bind del servidor (por defecto 127.0.0.1:8090).
+- MOCK_LLM_RECORDINGS: ruta del JSONL de grabaciones.
+- MOCK_LLM_TOKENS_PER_SECOND: velocidad de emisión; 0 = sin espera.
+- MOCK_LLM_FIRST_TOKEN_MS: latencia antes del primer token.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+from src.logging_config import get_logger
+
+_TOKEN_RE = re.compile(r"\S+\s*|\s+")
+_DEFAULT_CONTENT = "Respuesta simulada del servidor LLM local."
+
+
+def load_recordings(path: str | Path | None) -> list[dict[str, Any]]:
+    """Lee un JSONL de grabaciones; ignora líneas vacías, inválidas o sin content."""
+    if not path:
+        return []
+    recordings: list[dict[str, Any]] = []
+    with open(path, encoding="utf-8") as fh:
+        for line in fh:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(item, dict) and isinstance(item.get("content"), str):
+                recordings.append(item)
+    return recordings
+
+
+def split_tokens(content: str) -> list[str]:
+    """Trocea el texto en pseudo-tokens (palabra + espacio) para simular el streaming."""
+    return _TOKEN_RE.findall(content)
+
+
+class _ReplayBook:
+    """Selección round-robin de grabaciones, priorizando las del modelo pedido."""
+
+    def __init__(self, recordings: list[dict[str, Any]]) -> None:
+        self._recordings = recordings or [{"content": _DEFAULT_CONTENT}]
+        self._by_model: dict[str, list[dict[str, Any]]] = {}
+        for item in self._recordings:
+            model = item.get("model")
+            if isinstance(model, str) and model:
+                self._by_model.setdefault(model, []).append(item)
+        self._cursors: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def models(self) -> list[str]:
+        return sorted(self._by_model)
+
+    def next(self, model: str | None) -> dict[str, Any]:
+        pool = self._by_model.get(model or "") or self._recordings
+        key = model if pool is not self._recordings else ""
+        with self._lock:
+            idx = self._cursors.get(key, 0)
+            self._cursors[key] = idx + 1
+        return pool[idx % len(pool)]
+
+
+class MockLLMServer:
+    """Servidor HTTP en segundo plano; port=0 elige un puerto libre (útil en tests)."""
+
+    def __init__(
+        self,
+        recordings: list[dict[str, Any]] | None = None,
+        *,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        tokens_per_second: float = 0.0,
+        first_token_ms: float = 0.0,
+    ) -> None:
+        self.book = _ReplayBook(list(recordings or []))
+        self.tokens_per_second = max(0.0, tokens_per_second)
+        self.first_token_ms = max(0.0, first_token_ms)
+        self.requests_served = 0
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-llm", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+
+
+def _usage_for(recording: dict[str, Any], prompt_messages: list[Any], tokens: list[str]) -> dict[str, int]:
+    usage = recording.get("usage") if isinstance(recording.get("usage"), dict) else {}
+    prompt_chars = sum(len(str(m.get("content", ""))) for m in prompt_messages if isinstance(m, dict))
+    prompt_tokens = int(usage.get("input") or usage.get("prompt_tokens") or (prompt_chars + 3) // 4)
+    completion_tokens = len(tokens)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _make_handler(server: MockLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - firma de la stdlib
+            get_logger("MockLLM").debug(format, *args)
+
+        def _send_json(self, status: int, payload: dict[str, Any]) -> None:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self) -> None:
+            if self.path.rstrip("/") in ("/health", "/v1/health"):
+                self._send_json(200, {"status": "ok"})
+                return
+            if self.path.rstrip("/") in ("/models", "/v1/models"):
+                models = server.book.models() or ["mock-llm"]
+                self._send_json(200, {"object": "list", "data": [{"id": m, "object": "model"} for m in models]})
+                return
+            self._send_json(404, {"error": {"message": "not found"}})
+
+        def do_POST(self) -> None:
+            if self.path.rstrip("/") not in ("/chat/completions", "/v1/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except (ValueError, json.JSONDecodeError):
+                self._send_json(400, {"error": {"message": "invalid JSON body"}})
+                return
+            model = str(request.get("model") or "mock-llm")
+            recording = server.book.next(model)
+            tokens = split_tokens(recording["content"])
+            max_tokens = request.get("max_tokens")
+            if isinstance(max_tokens, int) and max_tokens > 0:
+                tokens = tokens[:max_tokens]
+            usage = _usage_for(recording, request.get("messages") or [], tokens)
+            server.requests_served += 1
+            if server.first_token_ms:
+                time.sleep(server.first_token_ms / 1000.0)
+            completion_id = f"chatcmpl-mock-{uuid.uuid4().hex[:12]}"
+            created = int(time.time())
+            if request.get("stream"):
+                self._stream(completion_id, created, model, tokens, usage)
+                return
+            delay = server.token_delay()
+            if delay:
+                time.sleep(delay * len(tokens))
+            self._send_json(
+                200,
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": created,
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": "".join(tokens)},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                    "usage": usage,
+                },
+            )
+
+        def _stream(
+            self,
+            completion_id: str,
+            created: int,
+            model: str,
+            tokens: list[str],
+            usage: dict[str, int],
+        ) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            delay = server.token_delay()
+
+            def emit(choices: list[dict[str, Any]], extra: dict[str, Any] | None = None) -> None:
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": created,
+                    "model": model,
+                    "choices": choices,
+                    **(extra or {}),
+                }
+                self.wfile.write(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            try:
+                for token in tokens:
+                    emit([{"index": 0, "delta": {"content": token}, "finish_reason": None}])
+                    if delay:
+                        time.sleep(delay)
+                emit([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+                emit([], {"usage": usage})
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                # El cliente cerró el stream antes (p. ej. stop_when); no es un error.
+                return
+
+    return Handler
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, "").strip() or default)
+    except ValueError:
+        return default
+
+
+def run_mock_llm_server() -> None:
+    """Arranca el servidor mock en primer plano con la configuración MOCK_LLM_*."""
+    logger = get_logger("MockLLM")
+    recordings_path = os.getenv("MOCK_LLM_RECORDINGS", "").strip() or None
+    recordings = load_recordings(recordings_path)
+    server = MockLLMServer(
+        recordings,
+        host=os.getenv("MOCK_LLM_HOST", "127.0.0.1"),
+        port=int(os.getenv("MOCK_LLM_PORT", "8090")),
+        tokens_per_second=_float_env("MOCK_LLM_TOKENS_PER_SECOND", 0.0),
+        first_token_ms=_float_env("MOCK_LLM_FIRST_TOKEN_MS", 0.0),
+    )
+    logger.warning(
+        "Mock LLM server listening on %s (%d recordings from %s)",
+        server.base_url,
+        len(recordings),
+        recordings_path or "-",
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -3,19 +3,43 @@
 import logging
 import json
 import os
+from dataclasses import dataclass
 from typing import Dict, Any, List
 from collections import Counter
+import contextvars
 from concurrent.futures import ThreadPoolExecutor
+from ..context_window import pack_messages
+from ..observability import emit_event
 from ..player_identity import INTERNAL_PLAYER_AUTHOR, display_author, player_name_from_state
 from ..state import ConversationState
 from ..text_limits import truncate_agent_output
 from .base import Agent
+from .continuation_rules import (
+    CONTEXT_WINDOW,
+    ContinuationCache,
+    classify_continuation,
+    continuation_cache_key,
+    continuation_rules_mode,
+    shadow_stats,
+)
 from .deepseek_adapter import send_message
+from .mission_cadence import MissionEvalCadence, updated_cadence_stats
+from .scene_prompt_context import select_context_messages
 
 
 logger = logging.getLogger(__name__)
 
 
+def _strip_code_fence(content: str) -> str:
+    """Extrae el JSON de una respuesta que puede venir envuelta en bloques ```json."""
+    content = content.strip()
+    if "```json" in content:
+        content = content.split("```json")[1].split("```")[0].strip()
+    elif "```" in content:
+        content = content.split("```")[1].split("```")[0].strip()
+    return content
+
+
 def parse_mission_evaluation_response(content: str) -> Dict[str, Any]:
     """Parsea la respuesta JSON del LLM de evaluación de misiones.
     
@@ -27,12 +51,13 @@ def parse_mission_evaluation_response(content: str) -> Dict[str, Any]:
     Raises:
         json.JSONDecodeError: Si el contenido no es JSON válido.
     """
-    content = content.strip()
-    if "```json" in content:
-        content = content.split("```json")[1].split("```")[0].strip()
-    elif "```" in content:
-        content = content.split("```")[1].split("```")[0].strip()
-    data = json.loads(content)
+    return mission_evaluation_from_dict(json.loads(_strip_code_fence(content)))
+
+
+def mission_evaluation_from_dict(data: Any) -> Dict[str, Any]:
+    """Normaliza la evaluación de misión ya parseada; ValueError si no es un objeto JSON."""
+    if not isinstance(data, dict):
+        raise ValueError("La evaluación de misión no es un objeto JSON")
     player_ok = bool(data.get("player_mission_achieved", False))
     return {
         "player_mission_achieved": player_ok,
@@ -67,6 +92,15 @@ def normalize_who_should_respond(decision: dict, actor_names: list[str]) -> str:
     return "none"
 
 
+@dataclass(slots=True)
+class _ContinuationRequest:
+    """Datos de una evaluación de continuación que necesita al LLM."""
+
+    player_name: str
+    cache_key: str
+    rule_decision: Dict[str, Any] | None
+
+
 class ObserverAgent(Agent):
     """Agente pasivo que analiza la conversaci?n sin escribir mensajes."""
     
@@ -94,6 +128,7 @@ class ObserverAgent(Agent):
             self._max_output_tokens = int(os.getenv("OBSERVER_MAX_OUTPUT_TOKENS", "180"))
         except ValueError:
             self._max_output_tokens = 180
+        self._continuation_cache = ContinuationCache()
     
     @property
     def is_actor(self) -> bool:
@@ -104,15 +139,38 @@ class ObserverAgent(Agent):
         limited = truncate_agent_output(str(value or "").strip())
         return limited or fallback
     
-    def evaluate_continuation(self, state: ConversationState) -> Dict[str, Any]:
-        """Eval?a si alguien debe continuar la conversaci?n antes de ceder la palabra.
-        
-        Args:
-            state: Estado actual de la conversaci?n
-            
-        Returns:
-            Diccionario con needs_response, who_should_respond, y reason
-        """
+    def _continuation_guidance(self, messages: List[Dict[str, Any]]) -> tuple[str, str, str]:
+        """Bloques del prompt de continuación: (contexto de escena, reglas, opciones de who_should_respond)."""
+        if self._actor_names:
+            authors_in_messages = {m["author"] for m in messages if m["author"] in self._actor_names}
+            actors_who_spoke = [n for n in self._actor_names if n in authors_in_messages]
+            actors_not_yet_spoken = [n for n in self._actor_names if n not in authors_in_messages]
+            spoken_str = ", ".join(actors_who_spoke) if actors_who_spoke else "ninguno"
+            not_spoken_str = ", ".join(actors_not_yet_spoken) if actors_not_yet_spoken else "ninguno"
+            names_str = ", ".join(f'"{n}"' for n in self._actor_names)
+            who_options = f'uno de los personajes ({names_str}), "user" o "none"'
+            scene = f"""Personajes en la escena: {", ".join(self._actor_names)}.
+Han intervenido ya en esta conversación: {spoken_str}.
+Aún no han hablado: {not_spoken_str}.
+
+Analiza el contexto de la conversación y decide:
+1. ¿Hay preguntas sin responder?
+2. ¿El último mensaje requiere una respuesta?
+3. ¿El flujo natural sugiere que alguien debe continuar (incluyendo un personaje que aún no ha hablado)?"""
+            rules = f"""- Si debe hablar un personaje, usa su nombre exacto (ej. {names_str}). Si es el jugador, usa "user". Si nadie debe responder, "none".
+- Los personajes pueden hablar entre sí; no es obligatorio que después de un personaje hable el jugador. Si el contexto lo pide (p. ej. una pregunta dirigida a otro personaje, o dar entrada a quien aún no ha intervenido), quien debe responder puede ser otro personaje.
+- El siguiente en hablar puede ser cualquier otro participante (otro personaje o el jugador), según el contexto.
+- Si el último mensaje es una pregunta, quien debe responder es otro participante (personaje o user).
+- Si la conversación está completa o naturalmente pausada, usa "none".
+- Considera dar turno a personajes que todavía no han hablado si el contexto lo pide."""
+            return scene, rules, who_options
+        rules = """- Si el último mensaje es una pregunta, quien debe responder es el otro participante
+- Si la conversación está completa o naturalmente pausada, usa "none"
+- Considera el flujo natural: después de un mensaje del character, normalmente responde el user, y viceversa"""
+        return "", rules, '"character" o "user" o "none"'
+
+    def _prepare_continuation(self, state: ConversationState) -> Dict[str, Any] | _ContinuationRequest:
+        """Resuelve localmente la continuación si es posible; si no, devuelve lo necesario para el LLM."""
         messages = state["messages"]
         
         if not messages:
@@ -143,38 +201,98 @@ class ObserverAgent(Agent):
                 "who_should_respond": "none",
                 "reason": "El usuario ha solicitado salir"
             }
+
+        player_name = player_name_from_state(state)
+        rules_mode = continuation_rules_mode()
+        rule_decision = (
+            classify_continuation(messages, self._actor_names, player_name)
+            if rules_mode != "off"
+            else None
+        )
+        if rule_decision is not None and rules_mode == "on":
+            return rule_decision
+
+        authors_in_messages = {m["author"] for m in messages if m["author"] in self._actor_names}
+        actors_who_spoke = [n for n in self._actor_names if n in authors_in_messages]
+        cache_key = continuation_cache_key(messages, self._actor_names, actors_who_spoke, player_name)
+        cached = self._continuation_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return _ContinuationRequest(
+            player_name=player_name,
+            cache_key=cache_key,
+            rule_decision=rule_decision,
+        )
+
+    def _finish_continuation(self, request: _ContinuationRequest, decision: Any) -> Dict[str, Any]:
+        """Valida y normaliza la decisión del LLM; la cachea y la compara con la regla (shadow)."""
+        if (
+            not isinstance(decision, dict)
+            or "needs_response" not in decision
+            or "who_should_respond" not in decision
+        ):
+            raise ValueError("Respuesta del LLM no tiene la estructura esperada")
+        who = normalize_who_should_respond(decision, self._actor_names)
+        result = {
+            "needs_response": bool(decision.get("needs_response", False)),
+            "who_should_respond": who,
+            "reason": self._limit_reason_text(
+                decision.get("reason"),
+                "Sin razón especificada.",
+            ),
+        }
+        self._continuation_cache.put(request.cache_key, result)
+        if request.rule_decision is not None:
+            shadow_stats.record(request.rule_decision, result)
+        return result
+
+    def _continuation_error(self, error: Exception) -> Dict[str, Any]:
+        logger.warning(f"Error al evaluar continuaci?n: {error}. Usando decisi?n por defecto.")
+        # Decisi?n por defecto: no continuar
+        return {
+            "needs_response": False,
+            "who_should_respond": "none",
+            "reason": self._limit_reason_text(
+                f"Error en evaluaci?n: {str(error)}",
+                "Error en evaluaci?n.",
+            ),
+        }
+
+    def evaluate_continuation(self, state: ConversationState) -> Dict[str, Any]:
+        """Eval?a si alguien debe continuar la conversaci?n antes de ceder la palabra.
         
+        Args:
+            state: Estado actual de la conversaci?n
+            
+        Returns:
+            Diccionario con needs_response, who_should_respond, y reason
+        """
+        request = self._prepare_continuation(state)
+        if isinstance(request, dict):
+            return request
+        messages = state["messages"]
+
         # Construir contexto de la conversaci?n
-        player_name = player_name_from_state(state)
         conversation_context = []
-        for msg in messages[-5:]:  # ?ltimos 5 mensajes para contexto
+        token_budget = int(os.getenv("OBSERVER_CONTINUATION_CONTEXT_TOKENS", "0") or 0)
+        window = (
+            pack_messages(messages, token_budget)
+            if token_budget > 0
+            else messages[-CONTEXT_WINDOW:]  # ?ltimos 5 mensajes para contexto
+        )
+        for msg in window:
             conversation_context.append(
-                f"[{display_author(msg.get('author'), player_name=player_name)}] {msg['content']}"
+                f"[{display_author(msg.get('author'), player_name=request.player_name)}] {msg['content']}"
             )
         
         context_text = "\n".join(conversation_context)
         last_message = messages[-1]
-        last_author = display_author(last_message.get("author"), player_name=player_name)
+        last_author = display_author(last_message.get("author"), player_name=request.player_name)
 
         # Construir prompt según si tenemos lista de personajes o no
-        if self._actor_names:
-            authors_in_messages = {m["author"] for m in messages if m["author"] in self._actor_names}
-            actors_who_spoke = [n for n in self._actor_names if n in authors_in_messages]
-            actors_not_yet_spoken = [n for n in self._actor_names if n not in authors_in_messages]
-            spoken_str = ", ".join(actors_who_spoke) if actors_who_spoke else "ninguno"
-            not_spoken_str = ", ".join(actors_not_yet_spoken) if actors_not_yet_spoken else "ninguno"
-            names_str = ", ".join(f'"{n}"' for n in self._actor_names)
-            who_options = f'uno de los personajes ({names_str}), "user" o "none"'
-            system_prompt = f"""Eres un observador experto que analiza conversaciones. Tu tarea es determinar si alguien debe responder antes de pasar al siguiente turno.
-
-Personajes en la escena: {", ".join(self._actor_names)}.
-Han intervenido ya en esta conversación: {spoken_str}.
-Aún no han hablado: {not_spoken_str}.
-
-Analiza el contexto de la conversación y decide:
-1. ¿Hay preguntas sin responder?
-2. ¿El último mensaje requiere una respuesta?
-3. ¿El flujo natural sugiere que alguien debe continuar (incluyendo un personaje que aún no ha hablado)?
+        scene, rules, who_options = self._continuation_guidance(messages)
+        scene_block = f"\n\n{scene}" if scene else ""
+        system_prompt = f"""Eres un observador experto que analiza conversaciones. Tu tarea es determinar si alguien debe responder antes de pasar al siguiente turno.{scene_block}
 
 Responde SOLO con un JSON válido en este formato exacto:
 {{
@@ -184,26 +302,7 @@ Responde SOLO con un JSON válido en este formato exacto:
 }}
 
 Reglas:
-- Si debe hablar un personaje, usa su nombre exacto (ej. {names_str}). Si es el jugador, usa "user". Si nadie debe responder, "none".
-- Los personajes pueden hablar entre sí; no es obligatorio que después de un personaje hable el jugador. Si el contexto lo pide (p. ej. una pregunta dirigida a otro personaje, o dar entrada a quien aún no ha intervenido), quien debe responder puede ser otro personaje.
-- El siguiente en hablar puede ser cualquier otro participante (otro personaje o el jugador), según el contexto.
-- Si el último mensaje es una pregunta, quien debe responder es otro participante (personaje o user).
-- Si la conversación está completa o naturalmente pausada, usa "none".
-- Considera dar turno a personajes que todavía no han hablado si el contexto lo pide."""
-        else:
-            system_prompt = """Eres un observador experto que analiza conversaciones. Tu tarea es determinar si alguien debe responder antes de pasar al siguiente turno.
-
-Responde SOLO con un JSON válido en este formato exacto:
-{
-    "needs_response": true/false,
-    "who_should_respond": "character" o "user" o "none",
-    "reason": "breve explicación de tu decisión en 1 a 3 frases cortas"
-}
-
-Reglas:
-- Si el último mensaje es una pregunta, quien debe responder es el otro participante
-- Si la conversación está completa o naturalmente pausada, usa "none"
-- Considera el flujo natural: después de un mensaje del character, normalmente responde el user, y viceversa"""
+{rules}"""
 
         user_prompt = f"""Analiza esta conversación:
 
@@ -221,58 +320,25 @@ Reglas:
             content = send_message(
                 llm_messages,
                 model=self._model,
+                role="observer",
                 temperature=self._temperature,
                 stream=False,
                 max_tokens=self._max_output_tokens,
             )
             assert isinstance(content, str)
-            content = content.strip()
-
             # Intentar parsear JSON (puede venir con markdown code blocks)
-            if "```json" in content:
-                content = content.split("```json")[1].split("```")[0].strip()
-            elif "```" in content:
-                content = content.split("```")[1].split("```")[0].strip()
-            
-            decision = json.loads(content)
-            
-            # Validar estructura
-            if "needs_response" not in decision or "who_should_respond" not in decision:
-                raise ValueError("Respuesta del LLM no tiene la estructura esperada")
-
-            who = normalize_who_should_respond(decision, self._actor_names)
-            return {
-                "needs_response": bool(decision.get("needs_response", False)),
-                "who_should_respond": who,
-                "reason": self._limit_reason_text(
-                    decision.get("reason"),
-                    "Sin razón especificada.",
-                ),
-            }
-            
+            decision = json.loads(_strip_code_fence(content))
+            return self._finish_continuation(request, decision)
         except Exception as e:
-            logger.warning(f"Error al evaluar continuaci?n: {e}. Usando decisi?n por defecto.")
-            # Decisi?n por defecto: no continuar
-            return {
-                "needs_response": False,
-                "who_should_respond": "none",
-                "reason": self._limit_reason_text(
-                    f"Error en evaluaci?n: {str(e)}",
-                    "Error en evaluaci?n.",
-                ),
-            }
+            return self._continuation_error(e)
 
-    def evaluate_missions(self, state: ConversationState) -> Dict[str, Any]:
-        """Evalúa si el jugador ha alcanzado su misión personal según la conversación.
-
-        Args:
-            state: Estado actual de la conversación (messages, turn).
-
-        Returns:
-            Diccionario con player_mission_achieved (bool) y reasoning (str).
-        """
-        has_player = bool(self._player_mission)
-        if not has_player:
+    def _mission_context(
+        self,
+        state: ConversationState,
+        min_messages: int = 0,
+    ) -> Dict[str, Any] | tuple[str, str]:
+        """Contexto reciente para evaluar la misión, o la evaluación directa si no hace falta LLM."""
+        if not self._player_mission:
             return {
                 "player_mission_achieved": False,
                 "reasoning": "No hay misión del jugador configurada.",
@@ -285,13 +351,44 @@ Reglas:
             }
         # Contexto reciente (últimos N mensajes para tener suficiente historia)
         max_history = int(os.getenv("OBSERVER_CONTEXT_MESSAGES", "10"))
-        recent = messages[-max_history:]
+        snapshot_block, recent = select_context_messages(
+            state,
+            max(max_history, min_messages),
+            min_recent=min_messages or 2,
+            include_mission_progress=True,
+            token_budget=int(os.getenv("OBSERVER_CONTEXT_TOKENS", "0") or 0),
+        )
         player_name = player_name_from_state(state)
-        context_lines = [
+        context_lines = [snapshot_block] if snapshot_block else []
+        context_lines.extend(
             f"[{display_author(m.get('author'), player_name=player_name)}] {m['content']}"
             for m in recent
-        ]
-        context_text = "\n".join(context_lines)
+        )
+        return "\n".join(context_lines), player_name
+
+    def _mission_error(self, error: Exception) -> Dict[str, Any]:
+        logger.warning("Error al evaluar misiones: %s. Usando valores por defecto.", error)
+        return {
+            "player_mission_achieved": False,
+            "reasoning": self._limit_reason_text(
+                f"Error en evaluación: {str(error)}",
+                "Error en evaluación.",
+            ),
+        }
+
+    def evaluate_missions(self, state: ConversationState) -> Dict[str, Any]:
+        """Evalúa si el jugador ha alcanzado su misión personal según la conversación.
+
+        Args:
+            state: Estado actual de la conversación (messages, turn).
+
+        Returns:
+            Diccionario con player_mission_achieved (bool) y reasoning (str).
+        """
+        mission_context = self._mission_context(state)
+        if isinstance(mission_context, dict):
+            return mission_context
+        context_text, player_name = mission_context
         mission_block = f'Misión del jugador (participante "{player_name}"): ' + self._player_mission
         system_prompt = """Eres un evaluador objetivo. Te dan una conversación y la misión privada del jugador.
 Tu tarea es determinar, solo con lo que se ha dicho y hecho en la conversación hasta ahora, si el jugador ha alcanzado su objetivo.
@@ -314,6 +411,7 @@ Responde SOLO con el JSON. Si usas markdown, envuelve en ```json ... ```."""
             content = send_message(
                 messages,
                 model=self._model,
+                role="observer",
                 temperature=self._temperature,
                 stream=False,
                 max_tokens=self._max_output_tokens,
@@ -321,14 +419,89 @@ Responde SOLO con el JSON. Si usas markdown, envuelve en ```json ... ```."""
             assert isinstance(content, str)
             return parse_mission_evaluation_response(content.strip())
         except Exception as e:
-            logger.warning("Error al evaluar misiones: %s. Usando valores por defecto.", e)
-            return {
-                "player_mission_achieved": False,
-                "reasoning": self._limit_reason_text(
-                    f"Error en evaluación: {str(e)}",
-                    "Error en evaluación.",
-                ),
-            }
+            return self._mission_error(e)
+
+    def evaluate_turn(self, state: ConversationState) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Continuación + misión en una sola llamada LLM que comparte el contexto de la conversación.
+
+        Si una de las dos partes se resuelve sin LLM (regla, caché, sin misión...) solo se
+        pide la otra por su camino normal. Si la respuesta fusionada trae una parte inválida,
+        esa parte se reevalúa con su llamada individual.
+        """
+        request = self._prepare_continuation(state)
+        mission_context = self._mission_context(state, min_messages=CONTEXT_WINDOW)
+        if isinstance(request, dict) or isinstance(mission_context, dict):
+            continuation = request if isinstance(request, dict) else self.evaluate_continuation(state)
+            mission = mission_context if isinstance(mission_context, dict) else self.evaluate_missions(state)
+            return continuation, mission
+
+        messages = state["messages"]
+        context_text, player_name = mission_context
+        last_message = messages[-1]
+        last_author = display_author(last_message.get("author"), player_name=player_name)
+        scene, rules, who_options = self._continuation_guidance(messages)
+        scene_block = f"\n\n{scene}" if scene else ""
+        system_prompt = f"""Eres un observador experto que analiza conversaciones. Tienes dos tareas sobre la misma conversación:
+A) Determinar si alguien debe responder antes de pasar al siguiente turno.
+B) Evaluar de forma objetiva si el jugador ha alcanzado su misión privada, solo con lo que se ha dicho y hecho hasta ahora.{scene_block}
+
+Responde SOLO con un JSON válido en este formato exacto (sin comentarios):
+{{
+    "continuation": {{
+        "needs_response": true/false,
+        "who_should_respond": {who_options},
+        "reason": "breve explicación de tu decisión en 1 a 3 frases cortas"
+    }},
+    "mission": {{
+        "player_mission_achieved": true o false,
+        "reasoning": "breve explicación de por qué se ha alcanzado o no (1-3 frases cortas como máximo)"
+    }}
+}}
+
+Reglas para A:
+{rules}
+
+Reglas para B: Sé estricto: solo true si la conversación muestra claramente que el objetivo se ha cumplido. Si no hay evidencia suficiente, false."""
+        user_prompt = (
+            f"Conversación reciente:\n{context_text}\n\n"
+            f"Último mensaje: [{last_author}] {last_message['content']}\n\n"
+            f'Misión del jugador (participante "{player_name}"): {self._player_mission}\n\n'
+            "Responde con el JSON especificado."
+        )
+        try:
+            content = send_message(
+                [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                model=self._model,
+                role="observer",
+                temperature=self._temperature,
+                stream=False,
+                max_tokens=self._max_output_tokens * 2,
+            )
+            assert isinstance(content, str)
+            data = json.loads(_strip_code_fence(content))
+            if not isinstance(data, dict):
+                raise ValueError("Respuesta fusionada del observer no es un objeto JSON")
+        except Exception as e:
+            logger.warning("Error en evaluación fusionada del observer: %s. Usando llamadas separadas.", e)
+            return self.evaluate_continuation(state), self.evaluate_missions(state)
+
+        try:
+            continuation = self._finish_continuation(request, data.get("continuation"))
+        except Exception as e:
+            logger.warning("Continuación inválida en respuesta fusionada: %s. Reevaluando por separado.", e)
+            continuation = self.evaluate_continuation(state)
+        try:
+            mission_data = data.get("mission")
+            if not isinstance(mission_data, dict) or "player_mission_achieved" not in mission_data:
+                raise ValueError("falta player_mission_achieved")
+            mission = mission_evaluation_from_dict(mission_data)
+        except Exception as e:
+            logger.warning("Misión inválida en respuesta fusionada: %s. Reevaluando por separado.", e)
+            mission = self.evaluate_missions(state)
+        return continuation, mission
 
     def _compute_game_ended(self, mission_evaluation: Dict[str, Any]) -> tuple[bool, str]:
         """Determina si la partida debe cerrarse por misión cumplida del jugador + evidencia narrativa."""
@@ -401,17 +574,38 @@ Responde SOLO con el JSON. Si usas markdown, envuelve en ```json ... ```."""
         
         # Evaluar si alguien debe continuar y si el jugador alcanzó su misión.
         # Si el último mensaje es del Usuario, ambas tareas son independientes:
-        # se ejecutan en paralelo para reducir latencia end-to-end.
+        # se ejecutan en paralelo para reducir latencia end-to-end, o en una sola
+        # llamada fusionada (OBSERVER_FUSED_EVAL) para ahorrar peticiones y tokens.
         last_author = messages[-1]["author"]
-        if last_author == INTERNAL_PLAYER_AUTHOR:
+        meta = state.get("metadata", {})
+        cadence_stats = None
+        evaluate_mission = last_author == INTERNAL_PLAYER_AUTHOR
+        if evaluate_mission and self._player_mission:
+            evaluate_mission, cadence_reason = MissionEvalCadence.from_env().decide(state, self._player_mission)
+            cadence_stats = updated_cadence_stats(
+                meta.get("mission_eval_cadence"),
+                evaluated=evaluate_mission,
+                turn=int(state.get("turn") or 0),
+            )
+            if not evaluate_mission:
+                logger.debug("Evaluación de misión omitida en turno %s (%s)", state.get("turn"), cadence_reason)
+        if evaluate_mission:
+            fused_eval = os.getenv(
+                "OBSERVER_FUSED_EVAL",
+                "false",
+            ).strip().lower() in ("1", "true", "yes")
             parallel_eval = os.getenv(
                 "OBSERVER_PARALLEL_EVAL",
                 "true",
             ).strip().lower() in ("1", "true", "yes")
-            if parallel_eval:
+            if fused_eval:
+                continuation_decision, mission_evaluation = self.evaluate_turn(state)
+            elif parallel_eval:
+                # Cada hilo corre en una copia del contexto: traza y user_id (reparto justo
+                # del scheduler de LLM) no se pierden al salir del hilo del turno.
                 with ThreadPoolExecutor(max_workers=2) as ex:
-                    fut_cont = ex.submit(self.evaluate_continuation, state)
-                    fut_miss = ex.submit(self.evaluate_missions, state)
+                    fut_cont = ex.submit(contextvars.copy_context().run, self.evaluate_continuation, state)
+                    fut_miss = ex.submit(contextvars.copy_context().run, self.evaluate_missions, state)
                     continuation_decision = fut_cont.result()
                     mission_evaluation = fut_miss.result()
             else:
@@ -419,7 +613,6 @@ Responde SOLO con el JSON. Si usas markdown, envuelve en ```json ... ```."""
                 mission_evaluation = self.evaluate_missions(state)
         else:
             continuation_decision = self.evaluate_continuation(state)
-            meta = state.get("metadata", {})
             mission_evaluation = meta.get("last_mission_evaluation")
             if not isinstance(mission_evaluation, dict):
                 mission_evaluation = {
@@ -428,8 +621,8 @@ Responde SOLO con el JSON. Si usas markdown, envuelve en ```json ... ```."""
                 }
         # Decisión de cierre: si al menos una misión lograda y hay evidencia narrativa (reasoning), partida terminada
         game_ended, game_ended_reason = self._compute_game_ended(mission_evaluation)
-        
-        return {
+
+        result = {
             "analysis": analysis,
             "continuation_decision": continuation_decision,
             "mission_evaluation": mission_evaluation,
@@ -437,3 +630,21 @@ Responde SOLO con el JSON. Si usas markdown, envuelve en ```json ... ```."""
             "game_ended_reason": game_ended_reason,
             "update_metadata": True
         }
+        if cadence_stats is not None:
+            result["mission_evaluated"] = evaluate_mission
+            result["mission_eval_cadence"] = cadence_stats
+            if game_ended or not evaluate_mission:
+                emit_event(
+                    "mission_eval_cadence",
+                    metadata={
+                        "agent_type": "observer",
+                        "agent_step": "mission_evaluation",
+                        "turn": state.get("turn"),
+                        "status": "game_ended" if game_ended else "skipped",
+                        "status_message": (
+                            f"evaluated={cadence_stats['evaluated']} skipped={cadence_stats['skipped']} "
+                            f"detection_delay_turns<={cadence_stats.get('detection_delay_turns', 0)}"
+                        ),
+                    },
+                )
+        return result
@@ -2,8 +2,11 @@
 
 from __future__ import annotations
 
+import os
 from typing import Any
 
+from ..context_window import estimate_tokens, pack_context_window, pack_messages
+
 
 def build_scene_participants_block(
     *,
@@ -52,3 +55,86 @@ def build_scene_participants_block(
         ]
     )
     return "\n".join(lines)
+
+
+def snapshot_context_enabled() -> bool:
+    """AGENT_CONTEXT_MODE=snapshot: resumen del notario + solo los mensajes posteriores."""
+    return os.getenv("AGENT_CONTEXT_MODE", "raw").strip().lower() == "snapshot"
+
+
+def build_scene_snapshot_block(snapshot: dict[str, Any], *, include_mission_progress: bool = False) -> str:
+    """Texto compacto del snapshot del notario para anteponer al historial reciente.
+
+    Los hechos mission_signal y el progreso de misión solo se incluyen para quien conoce
+    la misión del jugador (observer); los actores no deben verlos.
+    """
+    lines = ["Resumen de la escena hasta ahora (notario):"]
+    summary = str(snapshot.get("summary_text") or "").strip()
+    if summary:
+        lines.append(summary)
+    facts = [
+        str(fact.get("summary") or "").strip()
+        for fact in snapshot.get("facts_json") or []
+        if isinstance(fact, dict)
+        and (include_mission_progress or str(fact.get("kind") or "") != "mission_signal")
+    ]
+    facts = [fact for fact in facts if fact]
+    if facts:
+        lines.append("Hechos relevantes:")
+        lines.extend(f"- {fact}" for fact in facts)
+    threads = [str(item).strip() for item in snapshot.get("open_threads_json") or [] if str(item).strip()]
+    if threads:
+        lines.append("Hilos abiertos:")
+        lines.extend(f"- {thread}" for thread in threads)
+    progress = snapshot.get("mission_progress_json")
+    if include_mission_progress and isinstance(progress, dict) and progress.get("status"):
+        reason = str(progress.get("reason") or "").strip()
+        lines.append(f"Progreso de la misión del jugador: {progress['status']}" + (f" ({reason})" if reason else ""))
+    return "\n".join(lines) if len(lines) > 1 else ""
+
+
+def select_context_messages(
+    state: dict[str, Any],
+    max_history: int,
+    *,
+    min_recent: int = 2,
+    include_mission_progress: bool = False,
+    token_budget: int = 0,
+) -> tuple[str, list[dict[str, Any]]]:
+    """(bloque de snapshot o resumen, mensajes) para el prompt.
+
+    En modo snapshot, con un snapshot válido, se envía su resumen y solo los mensajes
+    posteriores a based_on_message_count (al menos min_recent para no perder el hilo y
+    como mucho max_history), de modo que el prompt no crece con la partida.
+    Con token_budget > 0 los mensajes se eligen por tokens (del más nuevo hacia atrás) en
+    lugar de por número; fuera del modo snapshot se anteponen además los resúmenes
+    jerárquicos de la conversación (ver context_window).
+    """
+    messages = state.get("messages") or []
+    raw = messages[-max_history:] if max_history > 0 else messages
+    if token_budget > 0:
+        window = pack_context_window(state, token_budget, min_recent=min_recent)
+        raw_block, raw = window.summary_text, window.messages
+    else:
+        raw_block = ""
+    if not snapshot_context_enabled():
+        return raw_block, raw
+    snapshot = (state.get("metadata") or {}).get("scene_snapshot")
+    if not isinstance(snapshot, dict):
+        return raw_block, raw
+    try:
+        based_on = int(snapshot.get("based_on_message_count") or 0)
+    except (TypeError, ValueError):
+        return raw_block, raw
+    if based_on <= 0 or based_on > len(messages):
+        return raw_block, raw
+    block = build_scene_snapshot_block(snapshot, include_mission_progress=include_mission_progress)
+    if not block:
+        return raw_block, raw
+    start = min(based_on, max(0, len(messages) - max(0, min_recent)))
+    tail = messages[start:]
+    if token_budget > 0:
+        tail = pack_messages(tail, token_budget - estimate_tokens(block), min_recent=min_recent)
+    elif max_history > 0:
+        tail = tail[-max_history:]
+    return block, tail
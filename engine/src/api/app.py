@@ -6,14 +6,17 @@ from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
-from fastapi.responses import RedirectResponse
+from fastapi.responses import JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
 
 from ..config import bootstrap_runtime_config
 bootstrap_runtime_config()
 
+from ..core import SessionOwnedElsewhereError, TurnInProgressError
 from ..observability import flush_observability
-from .dependencies import get_persistence_provider
+from ..password_hashing import shutdown_password_hashing_pool
+from ..persistence import storage_bootstrap_enabled
+from .dependencies import get_persistence_provider, shutdown_engine, worker_routing_header
 from .auth import InvalidAuthConfigurationError, ensure_seed_user, validate_auth_configuration
 from .observability_routes import (
     router as observability_router,
@@ -32,15 +35,21 @@ async def _lifespan(_app: FastAPI):
     try:
         try:
             validate_auth_configuration()
-            # Intenta bootstrap de esquema y usuario admin seed.
+            # Intenta bootstrap de esquema y usuario admin seed (salvo que lo haga INTERFACE_MODE=migrate).
             get_persistence_provider()
-            ensure_seed_user()
+            if storage_bootstrap_enabled():
+                ensure_seed_user()
         except Exception as exc:
             if isinstance(exc, InvalidAuthConfigurationError):
                 raise
             _logger.warning("Startup auth bootstrap skipped: %s", exc)
         yield
     finally:
+        try:
+            shutdown_engine()
+        except Exception as exc:
+            _logger.warning("Shutdown session handoff failed: %s", exc)
+        shutdown_password_hashing_pool()
         flush_observability()
 
 
@@ -67,9 +76,33 @@ async def apply_security_headers(request: Request, call_next):
     response.headers.setdefault("Permissions-Policy", "camera=(), microphone=(), geolocation=()")
     if request.url.path.startswith("/auth/"):
         response.headers.setdefault("Cache-Control", "no-store")
+    worker = worker_routing_header()
+    if worker:
+        response.headers.setdefault("X-Agora-Worker", worker)
     return response
 
 
+@app.exception_handler(SessionOwnedElsewhereError)
+async def session_owned_elsewhere(_request: Request, exc: SessionOwnedElsewhereError):
+    # Otro worker está escribiendo la partida: el cliente reintenta tras Retry-After (el lease
+    # se suelta al acabar el turno). La cabecera distingue este 409 del de turno en curso.
+    headers = {"Retry-After": "1", "X-Agora-Session-Owner": exc.owner or "unknown"}
+    return JSONResponse(
+        status_code=409,
+        content={"detail": "Session is active on another worker"},
+        headers=headers,
+    )
+
+
+@app.exception_handler(TurnInProgressError)
+async def turn_in_progress(_request: Request, _exc: TurnInProgressError):
+    return JSONResponse(
+        status_code=409,
+        content={"detail": "A turn is already in progress for this session"},
+        headers={"Retry-After": "1"},
+    )
+
+
 @app.get("/health", response_model=HealthResponse)
 def health():
     return HealthResponse(status="ok")
@@ -4,17 +4,29 @@ from __future__ import annotations
 
 import importlib
 import os
+import threading
+import time
 import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta, timezone
-from typing import Any
+from typing import Any, Callable
 
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 
-_PWD_CONTEXT = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+from ..password_hashing import (
+    PasswordHashingOverloadedError,
+    get_password_hashing_pool,
+    hash_password_inline,
+    verify_password_inline,
+)
+
 _INSECURE_SECRET_VALUES = {"", "dev-only-change-me", "change_me_super_secret"}
 _INSECURE_SEED_PASSWORDS = {"", "agora123", "admin", "change_me", "change_me_ingest_key"}
 
+# (username normalizado, iat del token) -> (instante de carga, usuario)
+_USER_CACHE: OrderedDict[tuple[str, int], tuple[float, dict[str, Any]]] = OrderedDict()
+_USER_CACHE_LOCK = threading.Lock()
+
 
 class UserAlreadyExistsError(Exception):
     """Error de dominio para username duplicado."""
@@ -96,16 +108,41 @@ def _auth_exp_minutes() -> int:
     return max(5, value)
 
 
+def _user_cache_ttl_seconds() -> float:
+    raw = os.getenv("AUTH_USER_CACHE_TTL_SECONDS", "30").strip()
+    try:
+        return max(0.0, float(raw))
+    except ValueError:
+        return 30.0
+
+
+def _user_cache_max_entries() -> int:
+    raw = os.getenv("AUTH_USER_CACHE_MAX_ENTRIES", "4096").strip()
+    try:
+        return max(1, int(raw))
+    except ValueError:
+        return 4096
+
+
 def hash_password(password: str) -> str:
-    return _PWD_CONTEXT.hash(password or "")
+    """Hash bcrypt_sha256 en el pool de hashing. Lanza PasswordHashingOverloadedError si está saturado."""
+    return get_password_hashing_pool().run("hash", hash_password_inline, password or "")
 
 
 def verify_password(password: str, password_hash: str) -> bool:
+    """Verifica en el pool de hashing.
+
+    Lanza PasswordHashingOverloadedError si está saturado y PasswordHashingUnavailableError
+    (subclase) si vence el timeout o el pool se rompe; False solo para hashes no verificables.
+    """
     if not password_hash:
         return False
     try:
-        return _PWD_CONTEXT.verify(password or "", password_hash)
-    except Exception:
+        return bool(get_password_hashing_pool().run("verify", verify_password_inline, password or "", password_hash))
+    except PasswordHashingOverloadedError:
+        raise
+    except (TypeError, ValueError):
+        # Hash malformado o de un esquema desconocido para passlib.
         return False
 
 
@@ -192,6 +229,52 @@ def ensure_seed_user() -> None:
                 (user_id, username, datetime.now(timezone.utc), pwd_hash, True, role),
             )
         conn.commit()
+    invalidate_user_cache(username)
+
+
+def invalidate_user_cache(username: str | None = None) -> None:
+    """Descarta el usuario cacheado (todas sus sesiones) o toda la caché si username es None.
+
+    Debe llamarse tras cambiar rol, is_active o password de un usuario.
+    """
+    with _USER_CACHE_LOCK:
+        if username is None:
+            _USER_CACHE.clear()
+            return
+        normalized = normalize_username(username)
+        for key in [key for key in _USER_CACHE if key[0] == normalized]:
+            del _USER_CACHE[key]
+
+
+def cached_user(
+    username: str,
+    issued_at: int,
+    loader: Callable[[str], dict[str, Any] | None],
+) -> dict[str, Any] | None:
+    """Usuario para (username, iat) desde una caché en proceso con TTL corto.
+
+    Con AUTH_USER_CACHE_TTL_SECONDS=0 siempre consulta `loader`. Los usuarios inexistentes
+    no se cachean.
+    """
+    ttl = _user_cache_ttl_seconds()
+    if ttl <= 0:
+        return loader(username)
+    key = (normalize_username(username), int(issued_at))
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        entry = _USER_CACHE.get(key)
+        if entry is not None and now - entry[0] < ttl:
+            _USER_CACHE.move_to_end(key)
+            return dict(entry[1])
+    user = loader(username)
+    if user is None:
+        return None
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[key] = (now, dict(user))
+        _USER_CACHE.move_to_end(key)
+        while len(_USER_CACHE) > _user_cache_max_entries():
+            _USER_CACHE.popitem(last=False)
+    return user
 
 
 def get_user_by_username(username: str) -> dict[str, Any] | None:
@@ -283,6 +366,12 @@ def authenticate_user(username: str, password: str) -> dict[str, Any] | None:
 
 
 def username_from_token(token: str) -> str | None:
+    claims = token_claims(token)
+    return claims[0] if claims else None
+
+
+def token_claims(token: str) -> tuple[str, int] | None:
+    """(username, iat) de un token válido; None si falta, caducó o no verifica."""
     if not token:
         return None
     try:
@@ -290,4 +379,10 @@ def username_from_token(token: str) -> str | None:
     except JWTError:
         return None
     username = payload.get("sub")
-    return str(username) if isinstance(username, str) and username else None
+    if not isinstance(username, str) or not username:
+        return None
+    try:
+        issued_at = int(payload.get("iat") or 0)
+    except (TypeError, ValueError):
+        issued_at = 0
+    return username, issued_at
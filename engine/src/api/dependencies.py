@@ -2,7 +2,7 @@
 
 from fastapi import Depends, HTTPException, Request, status
 
-from .auth import auth_required, get_user_by_username, username_from_token, auth_cookie_name
+from .auth import auth_required, cached_user, get_user_by_username, token_claims, auth_cookie_name
 from .schemas import AuthUserResponse
 from src.core import create_engine
 from src.persistence import create_persistence_provider
@@ -25,12 +25,26 @@ def get_engine():
     return _engine
 
 
+def worker_routing_header() -> str | None:
+    """Id del worker para X-Agora-Worker; solo si hay leases compartidos entre workers."""
+    if _engine is None or not _engine.shares_sessions:
+        return None
+    return _engine.worker_id
+
+
+def shutdown_engine() -> None:
+    """Handoff al apagar: persiste y libera las sesiones vivas para que otro worker las tome."""
+    if _engine is not None:
+        _engine.release_all_sessions()
+
+
 def get_current_user(request: Request) -> AuthUserResponse:
     """Devuelve usuario autenticado desde cookie JWT."""
     token = request.cookies.get(auth_cookie_name(), "")
-    username = username_from_token(token)
-    if username:
-        user = get_user_by_username(username)
+    claims = token_claims(token)
+    if claims:
+        username, issued_at = claims
+        user = cached_user(username, issued_at, get_user_by_username)
         if user and user.get("is_active", True):
             return AuthUserResponse(
                 id=str(user.get("id", "")),
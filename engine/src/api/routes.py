@@ -1,5 +1,6 @@
 """Endpoints HTTP para el motor de partida."""
 
+import hashlib
 import json
 import logging
 import os
@@ -8,8 +9,9 @@ import time
 import unicodedata
 from pathlib import Path
 from datetime import datetime
-from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi import APIRouter, HTTPException, Depends, Header, Query, Response
 from fastapi.responses import StreamingResponse, FileResponse, HTMLResponse
+from starlette.concurrency import run_in_threadpool
 
 from .auth import (
     authenticate_user,
@@ -18,6 +20,7 @@ from .auth import (
     auth_cookie_secure,
     create_user,
     create_access_token,
+    PasswordHashingOverloadedError,
     UserAlreadyExistsError,
 )
 from .schemas import (
@@ -74,6 +77,7 @@ from ..core.game_setup_contract import validate_game_setup
 from ..crew_roles.guionista import create_guionista_agent
 from ..observability import record_user_login
 from ..player_identity import display_author
+from ..queueing.game_channel import parse_last_event_id
 from ..text_limits import validate_custom_seed, validate_user_message
 
 
@@ -104,9 +108,38 @@ def _serialize_character_info(actor: dict | None) -> CharacterInfo:
     )
 
 
-def _format_sse(event: str, data: str) -> str:
-    """Formato Server-Sent Events: event + data + double newline."""
-    return f"event: {event}\ndata: {data}\n\n"
+def _format_sse(event: str, data: str, event_id: int | None = None) -> str:
+    """Formato Server-Sent Events: [id +] event + data + double newline."""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {data}\n\n"
+
+
+def _sse_event_data(ev: dict, player_name: str) -> str:
+    """JSON público de un evento del motor (mensajes con el autor visible del jugador)."""
+    ev_type = ev.get("type", "event")
+    if ev_type == "message_delta":
+        return json.dumps({"type": "message_delta", "delta": ev.get("delta", "")})
+    if ev_type == "observer_thinking":
+        return json.dumps({"type": "observer_thinking"})
+    if ev_type == "message_start":
+        return json.dumps({"type": "message_start", "author": ev.get("author", "")})
+    if ev_type == "message":
+        msg = ev.get("message", {})
+        return json.dumps(
+            {
+                "type": "message",
+                "message": _serialize_message(msg, player_name=player_name),
+            }
+        )
+    if ev_type == "game_ended":
+        return json.dumps({
+            "type": "game_ended",
+            "reason": ev.get("reason", ""),
+            "mission_evaluation": ev.get("mission_evaluation"),
+        })
+    if ev_type == "error":
+        return json.dumps({"type": "error", "message": ev.get("message", "")})
+    return json.dumps(ev, default=str)
 
 
 def _emit_game_init_metrics(
@@ -176,6 +209,15 @@ def _ensure_game_ownership(engine, game_id: str, username: str) -> None:
         raise HTTPException(status_code=404, detail="Session not found")
 
 
+def _auth_busy() -> HTTPException:
+    # Pool de hashing saturado: mejor un 503 rápido que dejar la request esperando.
+    return HTTPException(
+        status_code=503,
+        detail="Authentication is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 def _set_auth_cookie(response: Response, token: str) -> None:
     response.set_cookie(
         key=auth_cookie_name(),
@@ -228,7 +270,10 @@ def _template_generation_timeout_seconds() -> float:
 
 @auth_router.post("/login", response_model=LoginResponse)
 def login(body: LoginRequest, response: Response):
-    user = authenticate_user(body.username, body.password)
+    try:
+        user = authenticate_user(body.username, body.password)
+    except PasswordHashingOverloadedError:
+        raise _auth_busy()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
@@ -255,6 +300,8 @@ def register(body: RegisterRequest, response: Response):
         user = create_user(body.username, body.password)
     except UserAlreadyExistsError:
         raise HTTPException(status_code=409, detail="Username already exists")
+    except PasswordHashingOverloadedError:
+        raise _auth_busy()
     except ValueError as exc:
         raise HTTPException(status_code=422, detail=str(exc))
 
@@ -821,21 +868,63 @@ def start_standard_game(
     )
 
 
-@router.get("/status", response_model=StatusResponse)
+def _status_etag(status: dict, *, message_count: int, since: int, player_name: str) -> str:
+    """ETag débil de la parte de estado (campos escalares, resultado y cursor de mensajes)."""
+    payload = {
+        "turn_current": status.get("turn_current"),
+        "turn_max": status.get("turn_max"),
+        "current_speaker": status.get("current_speaker", ""),
+        "player_can_write": status.get("player_can_write"),
+        "game_finished": status.get("game_finished"),
+        "result": status.get("result"),
+        "message_count": message_count,
+        "since": since,
+        "player_name": player_name,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()}"'
+
+
+@router.get(
+    "/status",
+    response_model=StatusResponse,
+    responses={304: {"description": "Sin cambios respecto al ETag de If-None-Match"}},
+)
 def get_status(
     session_id: str,
+    response: Response,
+    since: int | None = Query(default=None, ge=0),
+    if_none_match: str | None = Header(default=None),
     current_user: AuthUserResponse = Depends(get_current_user),
     engine=Depends(get_engine),
 ):
-    """Devuelve estado actual: turn_current, turn_max, current_speaker, player_can_write, game_finished, result, messages."""
+    """Devuelve estado actual: turn_current, turn_max, current_speaker, player_can_write, game_finished, result, messages.
+
+    Con `since` (número de mensajes que el cliente ya tiene) solo se devuelven los mensajes
+    nuevos; `message_count` es el cursor para la siguiente consulta. Si If-None-Match coincide
+    con el ETag del estado se responde 304 sin cuerpo.
+    """
     try:
         _ensure_game_ownership(engine, session_id, current_user.username)
         status = engine.get_status(session_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="Session not found")
+    messages = status.get("messages", [])
+    message_count = len(messages)
+    start = min(since, message_count) if since is not None else 0
+    etag = _status_etag(
+        status,
+        message_count=message_count,
+        since=start,
+        player_name=current_user.username,
+    )
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
     messages_out = [
         MessageOut(**_serialize_message(m, player_name=current_user.username))
-        for m in status.get("messages", [])
+        for m in messages[start:]
     ]
     result = status.get("result")
     result_out = GameResultOut(**result) if result else None
@@ -847,6 +936,8 @@ def get_status(
         game_finished=status["game_finished"],
         result=result_out,
         messages=messages_out,
+        messages_from=start,
+        message_count=message_count,
     )
 
 
@@ -892,6 +983,8 @@ def turn(
         status = engine.get_status(body.session_id)
     except KeyError:
         raise HTTPException(status_code=404, detail="Session not found")
+    # Doble clic: 409 antes de abrir el stream en vez de pagar un segundo turno de LLM.
+    engine.check_turn_available(body.session_id)
     if not status.get("player_can_write", False):
         raise HTTPException(
             status_code=400,
@@ -908,32 +1001,45 @@ def turn(
             validated_text,
             user_exit=body.user_exit,
         ):
-            ev_type = ev.get("type", "event")
-            if ev_type == "message_delta":
-                data = json.dumps({"type": "message_delta", "delta": ev.get("delta", "")})
-            elif ev_type == "observer_thinking":
-                data = json.dumps({"type": "observer_thinking"})
-            elif ev_type == "message_start":
-                data = json.dumps({"type": "message_start", "author": ev.get("author", "")})
-            elif ev_type == "message":
-                msg = ev.get("message", {})
-                data = json.dumps(
-                    {
-                        "type": "message",
-                        "message": _serialize_message(msg, player_name=current_user.username),
-                    }
+            yield _format_sse(ev.get("type", "event"), _sse_event_data(ev, current_user.username))
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/events")
+async def game_events(
+    session_id: str,
+    last_event_id: str | None = Header(default=None),
+    current_user: AuthUserResponse = Depends(get_current_user),
+    engine=Depends(get_engine),
+):
+    """Canal SSE de la partida: message_start, message_delta, message, observer_thinking,
+    game_ended, error y status (fin de warmup/turno). Reanudable con Last-Event-ID; si el
+    hueco ya no está en el buffer llega un evento resync y hay que recargar /game/status.
+
+    Es async: cada pestaña abierta espera en el event loop, no en un hilo del threadpool."""
+    await run_in_threadpool(_ensure_game_ownership, engine, session_id, current_user.username)
+    items = engine.event_channel.subscribe_async(session_id, parse_last_event_id(last_event_id))
+
+    async def event_stream():
+        yield "retry: 3000\n\n"
+        try:
+            async for item in items:
+                if item is None:
+                    yield ": keepalive\n\n"
+                    continue
+                event_id, ev = item
+                yield _format_sse(
+                    ev.get("type", "event"),
+                    _sse_event_data(ev, current_user.username),
+                    event_id=event_id,
                 )
-            elif ev_type == "game_ended":
-                data = json.dumps({
-                    "type": "game_ended",
-                    "reason": ev.get("reason", ""),
-                    "mission_evaluation": ev.get("mission_evaluation"),
-                })
-            elif ev_type == "error":
-                data = json.dumps({"type": "error", "message": ev.get("message", "")})
-            else:
-                data = json.dumps(ev)
-            yield _format_sse(ev_type, data)
+        finally:
+            await items.aclose()
 
     return StreamingResponse(
         event_stream(),
@@ -997,12 +1103,29 @@ def get_context(
 
 @router.get("/list", response_model=GameListResponse)
 def list_games(
+    limit: int | None = Query(default=None, ge=1, le=200),
+    cursor: str | None = Query(default=None, max_length=512),
     current_user: AuthUserResponse = Depends(get_current_user),
     engine=Depends(get_engine),
 ):
-    """Lista partidas del usuario actual."""
-    games = engine.list_games(username=current_user.username)
-    return GameListResponse(games=[GameListItem(**g) for g in games])
+    """Lista partidas del usuario actual, de la más reciente a la más antigua.
+
+    Paginado por cursor: `next_cursor` se pasa como `cursor` para la página siguiente y es
+    null en la última. `limit` por defecto: GAME_LIST_PAGE_SIZE.
+    """
+    try:
+        page = engine.list_games_page(
+            username=current_user.username,
+            user_id=current_user.id,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return GameListResponse(
+        games=[GameListItem(**g) for g in page.get("games", [])],
+        next_cursor=page.get("next_cursor"),
+    )
 
 
 @router.post("/resume", response_model=ResumeGameResponse)
@@ -55,6 +55,9 @@ class StatusResponse(BaseModel):
     game_finished: bool = False
     result: Optional[GameResultOut] = None
     messages: list[MessageOut] = Field(default_factory=list)
+    # Cursor: índice del primer mensaje devuelto y total de mensajes (siguiente `since`).
+    messages_from: int = 0
+    message_count: int = 0
 
 
 # --- POST /game/turn ---
@@ -198,10 +201,13 @@ class GameListItem(BaseModel):
     template_version: Optional[str] = None
     created_at: Optional[str] = None
     updated_at: Optional[str] = None
+    turn_count: Optional[int] = None
+    last_message_preview: Optional[str] = None
 
 
 class GameListResponse(BaseModel):
     games: list[GameListItem] = Field(default_factory=list)
+    next_cursor: Optional[str] = None
 
 
 # --- POST /game/resume ---
@@ -0,0 +1,163 @@
+"""Ventana de contexto acotada por tokens: resúmenes jerárquicos + cola de mensajes crudos.
+
+Los resúmenes los mantiene ConversationSummarizer en metadata["conversation_summary"]
+(persistido con state_json):
+
+    {"covered_until": int, "nodes": [{"level", "start", "end", "text"}, ...]}
+
+Cada nodo resume los mensajes [start, end) y los nodos, en orden, cubren [0, covered_until).
+Este módulo no llama al LLM: solo empaqueta lo que ya hay dentro de un presupuesto.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+
+from .message_log import MessageView
+from .tokenizer import count_tokens, get_tokenizer
+
+SUMMARY_METADATA_KEY = "conversation_summary"
+# Tokens fijos por mensaje (rol, separadores y prefijo de autor en el prompt).
+MESSAGE_OVERHEAD_TOKENS = 4
+# Fracción del presupuesto reservada a resúmenes cuando existen.
+SUMMARY_BUDGET_SHARE = 0.25
+
+
+def estimate_tokens(text: str) -> int:
+    """Tokens de un texto con el tokenizer configurado (ver tokenizer.py)."""
+    return count_tokens(text)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Tokens de un mensaje, cacheados en el propio registro (token_count/tokenizer).
+
+    El contenido de un mensaje no cambia tras añadirse, así que cada mensaje se tokeniza
+    una sola vez por tokenizer y empaquetar una ventana de k mensajes es O(k). En un
+    MessageLog la cuenta vive en una columna del log.
+    """
+    tokenizer = get_tokenizer()
+    if isinstance(message, MessageView):
+        cached_view = message.cached_token_count(tokenizer.name)
+        if cached_view is not None:
+            return cached_view
+        tokens = tokenizer.count(message["content"]) + MESSAGE_OVERHEAD_TOKENS
+        message.cache_token_count(tokenizer.name, tokens)
+        return tokens
+    cached = message.get("token_count")
+    if isinstance(cached, int) and message.get("tokenizer") == tokenizer.name:
+        return cached
+    tokens = tokenizer.count(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS
+    if isinstance(message, dict):
+        message["token_count"] = tokens
+        message["tokenizer"] = tokenizer.name
+    return tokens
+
+
+def pack_messages(
+    messages: List[Dict[str, Any]],
+    token_budget: int,
+    *,
+    min_recent: int = 1,
+) -> List[Dict[str, Any]]:
+    """Cola más larga de mensajes (del más nuevo hacia atrás) que cabe en token_budget.
+
+    Siempre incluye al menos min_recent mensajes aunque excedan el presupuesto.
+    """
+    used = 0
+    first = len(messages)
+    for index in range(len(messages) - 1, -1, -1):
+        cost = message_tokens(messages[index])
+        if used + cost > token_budget and len(messages) - index > min_recent:
+            break
+        used += cost
+        first = index
+    return messages[first:]
+
+
+def summary_nodes(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Nodos de resumen válidos y contiguos desde el mensaje 0 (vacío si no hay o están corruptos)."""
+    metadata = state.get("metadata") or {}
+    store = metadata.get(SUMMARY_METADATA_KEY)
+    if not isinstance(store, dict):
+        return []
+    nodes: List[Dict[str, Any]] = []
+    expected_start = 0
+    for node in store.get("nodes") or []:
+        if not isinstance(node, dict):
+            return []
+        try:
+            start, end = int(node.get("start")), int(node.get("end"))
+        except (TypeError, ValueError):
+            return []
+        if start != expected_start or end <= start or not str(node.get("text") or "").strip():
+            return []
+        nodes.append(node)
+        expected_start = end
+    return nodes
+
+
+@dataclass(slots=True)
+class ContextWindow:
+    summary_text: str = ""
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+    first_message_index: int = 0
+    summary_nodes: int = 0
+
+
+def format_summary_block(nodes: List[Dict[str, Any]]) -> str:
+    if not nodes:
+        return ""
+    lines = ["Resumen de la conversación anterior:"]
+    lines.extend(
+        f"- (mensajes {int(node['start']) + 1}-{int(node['end'])}) {str(node['text']).strip()}"
+        for node in nodes
+    )
+    return "\n".join(lines)
+
+
+def pack_context_window(
+    state: Dict[str, Any],
+    token_budget: int,
+    *,
+    min_recent: int = 2,
+) -> ContextWindow:
+    """Empaqueta mensajes recientes (del más nuevo hacia atrás) y resúmenes de lo anterior.
+
+    Los mensajes crudos usan el presupuesto menos la reserva para resúmenes (si hay), pero
+    siempre se incluyen al menos min_recent. Después se añaden los nodos de resumen que
+    preceden a la cola, del más reciente al más antiguo, mientras quepan y sin dejar huecos.
+    """
+    messages = state.get("messages") or []
+    nodes = summary_nodes(state)
+    budget = max(0, int(token_budget))
+    raw_budget = budget - int(budget * SUMMARY_BUDGET_SHARE) if nodes else budget
+
+    tail = pack_messages(messages, raw_budget, min_recent=min_recent)
+    first = len(messages) - len(tail)
+    used = sum(message_tokens(message) for message in tail)
+
+    selected: List[Dict[str, Any]] = []
+    for node in reversed(nodes):
+        if int(node["start"]) >= first:
+            continue
+        cost = estimate_tokens(str(node["text"])) + MESSAGE_OVERHEAD_TOKENS
+        if used + cost > budget:
+            break
+        used += cost
+        selected.append(node)
+    selected.reverse()
+    # Si la cola no llega hasta el último resumen elegido, los mensajes intermedios se pierden:
+    # se prefiere no enviar resúmenes antes que un contexto con un hueco.
+    if selected and int(selected[-1]["end"]) < first:
+        used -= sum(estimate_tokens(str(n["text"])) + MESSAGE_OVERHEAD_TOKENS for n in selected)
+        selected = []
+
+    return ContextWindow(
+        summary_text=format_summary_block(selected),
+        messages=messages[first:],
+        tokens=used,
+        first_message_index=first,
+        summary_nodes=len(selected),
+    )
@@ -1,5 +1,33 @@
-"""Core: motor headless de partida (sin I/O ni FastAPI)."""
+"""Core: motor headless de partida (sin I/O ni FastAPI).
 
-from .engine import GameEngine, GameSession, create_engine
+Los exports se resuelven al primer acceso: importar un submódulo ligero (p. ej.
+game_setup_contract desde persistencia) no carga el motor ni los agentes.
+"""
 
-__all__ = ["GameEngine", "GameSession", "create_engine"]
+from importlib import import_module
+from typing import Any
+
+_EXPORTS = {
+    "GameEngine": ".engine",
+    "GameSession": ".engine",
+    "create_engine": ".engine",
+    "SessionOwnedElsewhereError": ".session_ownership",
+    "TurnInProgressError": ".turn_lock",
+}
+
+__all__ = [
+    "GameEngine",
+    "GameSession",
+    "SessionOwnedElsewhereError",
+    "TurnInProgressError",
+    "create_engine",
+]
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
@@ -3,38 +3,50 @@
 from __future__ import annotations
 
 import logging
+import os
 import random
 import time
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime
 from dataclasses import dataclass
 from queue import Empty, Queue
-from threading import Thread
+from threading import Lock, Thread
+from collections.abc import Mapping, Sequence
 from typing import Any, Iterator, Literal
 from uuid import uuid4
 
 from ..state import ConversationState
 from ..manager import ConversationManager
+from ..message_log import MessageLog
 from ..agents.actor_prompt_template import default_actor_prompt_template
+from ..agents.conversation_summarizer import ConversationSummarizer
+from ..agents.mission_cadence import MissionEvalCadence
+from ..agents.scene_prompt_context import snapshot_context_enabled
 from ..crew_roles.guionista import create_guionista_agent, run_setup_task
 from ..crew_roles.character import create_character_agent, run_character_response
 from ..crew_roles.observer import create_observer_agent
 from ..crew_roles.director import run_one_step
 from ..persistence import PersistenceProvider, create_persistence_provider
+from ..queueing.game_channel import GameEventChannel, create_game_event_channel
 from ..observability import emit_event, trace_interaction, trace_setup
-from ..player_identity import INTERNAL_PLAYER_AUTHOR
+from ..player_identity import INTERNAL_PLAYER_AUTHOR, player_name_from_state
 from ..public_missions import (
     fallback_actor_public_mission,
     fallback_player_public_mission,
 )
 from ..text_limits import validate_custom_seed, validate_user_message
 from .game_setup_contract import validate_game_setup
+from .session_agents import LazyAgent, LazyCharacterAgents, session_agent_specs
+from .session_ownership import SessionOwnedElsewhereError, SessionOwnership, create_session_ownership
+from .turn_lock import TurnInProgressError, TurnLocks, create_turn_locks
 
 
 @dataclass
 class GameSession:
     """Sesión de una partida en memoria."""
     manager: ConversationManager
-    character_agents: dict[str, Any]
+    character_agents: Mapping[str, Any]
     observer_agent: Any
     setup: dict[str, Any]
     max_turns: int
@@ -42,15 +54,72 @@ class GameSession:
     next_action: Literal["character", "user_input", "ended"] = "character"
     persisted_messages: int = 0
     actor_prompt_template: str = ""
+    # Dueño y metadata de la partida, leídos una vez al crear/rehidratar (no en cada turno).
+    user_id: str = ""
+    username: str = ""
+    game_mode: str = "custom"
+    # Versión de la partida (SessionOwnership.version) que refleja esta copia en memoria.
+    lease_version: int = 0
+
+    @property
+    def trace_user_id(self) -> str:
+        return self.user_id or self.username
 
 
 class GameEngine:
     """Motor de partidas: registro en memoria y ejecución por pasos."""
 
-    def __init__(self, persistence_provider: PersistenceProvider | None = None) -> None:
+    def __init__(
+        self,
+        persistence_provider: PersistenceProvider | None = None,
+        event_channel: GameEventChannel | None = None,
+        ownership: SessionOwnership | None = None,
+        turn_locks: TurnLocks | None = None,
+    ) -> None:
         self._registry: dict[str, GameSession] = {}
         self._logger = logging.getLogger(__name__)
         self._persistence = persistence_provider or create_persistence_provider()
+        self._events = event_channel or create_game_event_channel()
+        self._ownership = ownership or create_session_ownership()
+        self._turn_locks = turn_locks or create_turn_locks()
+        # game_id -> username del dueño; el dueño de una partida no cambia.
+        self._owners: OrderedDict[str, str] = OrderedDict()
+        self._owners_lock = Lock()
+        self._owners_max = self._owner_cache_size()
+
+    @property
+    def worker_id(self) -> str:
+        """Id de este worker (pista de enrutado para el proxy)."""
+        return self._ownership.worker_id
+
+    @property
+    def shares_sessions(self) -> bool:
+        """True si las partidas se reparten entre varios workers mediante leases."""
+        return self._ownership.backend != "local"
+
+    @property
+    def event_channel(self) -> GameEventChannel:
+        """Canal por partida con los eventos del motor (para SSE en /game/events)."""
+        return self._events
+
+    def _publish_event(self, game_id: str, event: dict[str, Any]) -> None:
+        """Publica un evento en el canal de la partida; un fallo del canal no afecta al turno."""
+        try:
+            self._events.publish(game_id, self._jsonable(event))
+        except Exception as exc:
+            self._logger.warning("No se pudo publicar evento %s game_id=%s: %s", event.get("type"), game_id, exc)
+
+    def _publish_status(self, game_id: str, session: GameSession) -> None:
+        """Publica el estado tras persistir, armado desde la sesión (sin releer la versión del lease).
+
+        Se llama con el turno ya confirmado: ni el armado del evento ni el canal pueden hacerlo fallar.
+        """
+        try:
+            messages = session.manager.state.get("messages", [])
+            event = {"type": "status", **self._status_fields(session), "message_count": len(messages)}
+            self._events.publish(game_id, self._jsonable(event))
+        except Exception as exc:
+            self._logger.warning("No se pudo publicar evento status game_id=%s: %s", game_id, exc)
 
     def create_game(
         self,
@@ -106,8 +175,12 @@ class GameEngine:
             actor_prompt_template=self._current_actor_prompt_template(),
             player_name=username,
         )
-        self._registry[game_id] = session
-        self._warmup_session(game_id, session, game_mode="custom")
+        self._attach_owner(game_id, session, game_mode="custom")
+        self._register_new_session(game_id, session)
+        try:
+            self._warmup_session(game_id, session, game_mode="custom")
+        finally:
+            self._release_lease(game_id)
         return game_id, session.setup
 
     def create_game_from_setup(
@@ -140,10 +213,23 @@ class GameEngine:
             actor_prompt_template=self._current_actor_prompt_template(),
             player_name=username,
         )
-        self._registry[game_id] = session
-        self._warmup_session(game_id, session, game_mode=game_mode)
+        self._attach_owner(game_id, session, game_mode=game_mode)
+        self._register_new_session(game_id, session)
+        try:
+            self._warmup_session(game_id, session, game_mode=game_mode)
+        finally:
+            self._release_lease(game_id)
         return game_id, session.setup
 
+    def _attach_owner(self, game_id: str, session: GameSession, game_mode: str) -> None:
+        """Única lectura tras crear la partida: el dueño real (el provider puede resolver un usuario por defecto)."""
+        owner = self._persistence.get_game_owner(game_id)
+        session.user_id = str(owner.get("user_id") or "")
+        session.username = str(owner.get("user") or "")
+        session.game_mode = game_mode
+        if session.username:
+            self._remember_owner(game_id, session.username)
+
     def _build_session_from_setup(
         self,
         setup: dict[str, Any],
@@ -157,42 +243,13 @@ class GameEngine:
         manager = ConversationManager()
         resolved_player_name = str(player_name or "").strip() or INTERNAL_PLAYER_AUTHOR
         manager.update_metadata("player_name", resolved_player_name)
-        character_agents: dict[str, Any] = {}
-        actor_names: list[str] = []
-        player_public_mission = str(
-            setup.get("player_public_mission")
-            or fallback_player_public_mission(
-                relevancia_jugador=setup.get("relevancia_jugador"),
-                contexto_problema=setup.get("contexto_problema"),
-            )
-        ).strip()
-        scene_participants = self._build_scene_participants(setup)
         resolved_actor_prompt_template = str(
             actor_prompt_template or default_actor_prompt_template()
         )
-        for actor in actors_list:
-            if not isinstance(actor, dict):
-                continue
-            name = str(actor.get("name", "")).strip()
-            if not name:
-                continue
-            actor_names.append(name)
-            character_agents[name] = create_character_agent(
-                name=name,
-                personality=actor.get("personality"),
-                mission=actor.get("mission"),
-                background=actor.get("background"),
-                player_public_mission=player_public_mission,
-                scene_participants=scene_participants,
-                prompt_template=resolved_actor_prompt_template,
-            )
-        if not actor_names:
+        character_agents, observer = self._build_session_agents(setup, resolved_actor_prompt_template)
+        if not character_agents:
             raise ValueError("Invalid setup actors")
-        max_messages_before_user = len(actor_names)
-        observer = create_observer_agent(
-            actor_names=actor_names,
-            player_mission=setup.get("player_mission") or "",
-        )
+        max_messages_before_user = len(character_agents)
         return GameSession(
             manager=manager,
             character_agents=character_agents,
@@ -206,32 +263,23 @@ class GameEngine:
         )
 
     @staticmethod
-    def _build_scene_participants(setup: dict[str, Any]) -> list[dict[str, str]]:
-        actors = setup.get("actors", [])
-        if not isinstance(actors, list):
-            return []
-        scene_participants: list[dict[str, str]] = []
-        for actor in actors:
-            if not isinstance(actor, dict):
-                continue
-            name = str(actor.get("name", "")).strip()
-            if not name:
-                continue
-            scene_participants.append(
-                {
-                    "name": name,
-                    "personality": str(actor.get("personality", "")).strip(),
-                    "public_mission": str(
-                        actor.get("public_mission")
-                        or fallback_actor_public_mission(
-                            personality=actor.get("personality"),
-                            presencia_escena=actor.get("presencia_escena"),
-                        )
-                    ).strip(),
-                    "presencia_escena": str(actor.get("presencia_escena", "")).strip(),
-                }
+    def _build_session_agents(
+        setup: dict[str, Any],
+        actor_prompt_template: str,
+    ) -> tuple[LazyCharacterAgents, LazyAgent]:
+        """Agentes de la sesión, construidos al primer uso a partir de specs cacheadas."""
+        specs = session_agent_specs(setup, actor_prompt_template)
+        character_agents = LazyCharacterAgents(
+            specs.actors,
+            lambda spec: create_character_agent(**spec.agent_kwargs()),
+        )
+        observer = LazyAgent(
+            lambda: create_observer_agent(
+                actor_names=specs.actor_names,
+                player_mission=specs.player_mission,
             )
-        return scene_participants
+        )
+        return character_agents, observer
 
     def _current_actor_prompt_template(self) -> str:
         persisted = self._persistence.get_actor_prompt_template()
@@ -301,10 +349,8 @@ class GameEngine:
         if game_mode == "standard":
             self._warmup_standard_session(game_id, session)
             return
-        game = self._persistence.get_game(game_id)
-        user_id = str(game.get("user_id") or game.get("user") or "") if game else ""
         interaction_id = f"{game_id}:warmup"
-        with trace_interaction(game_id, user_id, interaction_id, name="warmup"):
+        with trace_interaction(game_id, session.trace_user_id, interaction_id, name="warmup"):
             result = run_one_step(
                 session.manager,
                 session.character_agents,
@@ -343,6 +389,11 @@ class GameEngine:
     def get_status(self, game_id: str) -> dict[str, Any]:
         """Devuelve el contrato de estado para la API: turn_current, turn_max, current_speaker, player_can_write, game_finished, result, messages. Lanza KeyError si no existe."""
         session = self._get_session(game_id)
+        return {**self._status_fields(session), "messages": session.manager.state.get("messages", [])}
+
+    @staticmethod
+    def _status_fields(session: GameSession) -> dict[str, Any]:
+        """Campos del contrato de estado salvo los mensajes."""
         state = session.manager.state
         metadata = state.get("metadata", {})
         continuation = metadata.get("continuation_decision", {})
@@ -357,7 +408,6 @@ class GameEngine:
                 "reason": metadata.get("game_ended_reason", ""),
                 "mission_evaluation": metadata.get("last_mission_evaluation"),
             }
-        messages = state.get("messages", [])
         return {
             "turn_current": state.get("turn", 0),
             "turn_max": session.max_turns,
@@ -365,7 +415,6 @@ class GameEngine:
             "player_can_write": player_can_write,
             "game_finished": game_finished,
             "result": result,
-            "messages": messages,
         }
 
     def get_context(self, game_id: str) -> dict[str, Any]:
@@ -406,9 +455,57 @@ class GameEngine:
         """Lista partidas para el usuario indicado."""
         return self._persistence.list_games_for_user(username)
 
+    def list_games_page(
+        self,
+        username: str,
+        user_id: str | None = None,
+        limit: int | None = None,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Página de partidas del usuario ({games, next_cursor}); ValueError si el cursor no es válido."""
+        return self._persistence.list_games_page(
+            username,
+            user_id=user_id,
+            limit=limit or self._game_list_page_size(),
+            cursor=cursor,
+        )
+
+    @staticmethod
+    def _game_list_page_size() -> int:
+        try:
+            return max(1, int(os.getenv("GAME_LIST_PAGE_SIZE", "").strip() or 50))
+        except ValueError:
+            return 50
+
+    @staticmethod
+    def _owner_cache_size() -> int:
+        try:
+            return max(0, int(os.getenv("GAME_OWNER_CACHE_SIZE", "").strip() or 10000))
+        except ValueError:
+            return 10000
+
+    def _remember_owner(self, game_id: str, username: str) -> None:
+        if self._owners_max <= 0:
+            return
+        with self._owners_lock:
+            self._owners[game_id] = username
+            self._owners.move_to_end(game_id)
+            while len(self._owners) > self._owners_max:
+                self._owners.popitem(last=False)
+
+    def get_game_owner(self, game_id: str) -> str:
+        """Username del dueño de la partida; desde caché LRU o con una consulta ligera. KeyError si no existe."""
+        with self._owners_lock:
+            cached = self._owners.get(game_id)
+            if cached is not None:
+                self._owners.move_to_end(game_id)
+                return cached
+        owner = str(self._persistence.get_game_owner(game_id).get("user") or "")
+        self._remember_owner(game_id, owner)
+        return owner
+
     def game_belongs_to_user(self, game_id: str, username: str) -> bool:
-        game = self._persistence.get_game(game_id)
-        return str(game.get("user", "")) == username
+        return self.get_game_owner(game_id) == username
 
     def submit_feedback(self, game_id: str, user_id: str, feedback_text: str) -> str:
         return self._persistence.create_feedback(
@@ -422,10 +519,51 @@ class GameEngine:
 
     def resume_game(self, game_id: str) -> dict[str, Any]:
         """Reanuda sesión existente desde memoria o persistencia."""
-        if game_id in self._registry:
-            return {"session_id": game_id, "loaded_from_memory": True}
-        self._rehydrate_session(game_id)
-        return {"session_id": game_id, "loaded_from_memory": False}
+        in_memory = self._registry.get(game_id)
+        loaded_from_memory = in_memory is not None and self._get_session(game_id) is in_memory
+        if not loaded_from_memory:
+            self._get_session(game_id)
+        return {"session_id": game_id, "loaded_from_memory": loaded_from_memory}
+
+    def release_session(self, game_id: str) -> bool:
+        """Saca la partida de memoria persistiendo antes lo pendiente, si lo hay.
+
+        Las escrituras ya persisten y sueltan el lease al terminar; aquí solo queda algo
+        pendiente si falló una persistencia. Si otro worker está escribiendo la partida, la
+        copia local está desfasada y se descarta sin persistir. Si hay un turno en curso en
+        este worker (p. ej. un stream cuyo cliente se desconectó), la sesión se deja tal cual:
+        ese turno persiste sus mensajes al terminar. Devuelve False si la partida no estaba en
+        memoria en este worker.
+        """
+        session = self._registry.get(game_id)
+        if session is None:
+            return False
+        messages = session.manager.state.get("messages", [])
+        pending = isinstance(messages, Sequence) and len(messages) > session.persisted_messages
+        if not pending:
+            self._registry.pop(game_id, None)
+            return True
+        try:
+            with self._turn_locks.hold(game_id, wait=False):
+                try:
+                    if self._ownership.acquire(game_id):
+                        try:
+                            self._persist_session_state(game_id, session)
+                        finally:
+                            self._release_lease(game_id)
+                finally:
+                    self._registry.pop(game_id, None)
+        except TurnInProgressError:
+            self._logger.info("Turno en curso al liberar game_id=%s; persiste el propio turno", game_id)
+        return True
+
+    def release_all_sessions(self) -> None:
+        """Handoff de apagado: libera todas las sesiones vivas; un fallo no frena al resto."""
+        for game_id in list(self._registry):
+            try:
+                self.release_session(game_id)
+            except Exception as exc:
+                self._logger.warning("No se pudo liberar la sesión game_id=%s: %s", game_id, exc)
 
     @staticmethod
     def _parse_timestamp(value: Any) -> datetime:
@@ -450,7 +588,9 @@ class GameEngine:
         if game_id in self._registry:
             return self._registry[game_id]
 
-        game = self._persistence.get_game(game_id)
+        game, persisted_records, archived = self._load_session_records(game_id)
+        if game.get("user"):
+            self._remember_owner(game_id, str(game["user"]))
         config_json = game.get("config_json", {})
         if not isinstance(config_json, dict):
             raise ValueError("Session cannot be resumed: invalid config")
@@ -463,66 +603,25 @@ class GameEngine:
         if not isinstance(actors, list):
             raise ValueError("Session cannot be resumed: invalid actors")
 
-        character_agents: dict[str, Any] = {}
-        actor_names: list[str] = []
-        player_public_mission = str(
-            config_json.get("player_public_mission")
-            or fallback_player_public_mission(
-                relevancia_jugador=config_json.get("relevancia_jugador"),
-                contexto_problema=config_json.get("contexto_problema"),
-            )
-        ).strip()
-        scene_participants = self._build_scene_participants(config_json)
-        for actor in actors:
-            if not isinstance(actor, dict):
-                continue
-            name = str(actor.get("name", "")).strip()
-            if not name:
-                continue
-            actor_names.append(name)
-            character_agents[name] = create_character_agent(
-                name=name,
-                personality=actor.get("personality"),
-                mission=actor.get("mission"),
-                background=actor.get("background"),
-                player_public_mission=player_public_mission,
-                scene_participants=scene_participants,
-                prompt_template=str(
-                    state_json.get("actor_prompt_template")
-                    or default_actor_prompt_template()
-                ),
-            )
-
-        if not actor_names:
-            raise ValueError("Session cannot be resumed: no valid actors")
-
-        observer = create_observer_agent(
-            actor_names=actor_names,
-            player_mission=str(config_json.get("player_mission") or ""),
+        character_agents, observer = self._build_session_agents(
+            config_json,
+            str(state_json.get("actor_prompt_template") or default_actor_prompt_template()),
         )
+        if not character_agents:
+            raise ValueError("Session cannot be resumed: no valid actors")
 
-        persisted_records = self._persistence.get_game_messages(game_id)
-        restored_messages: list[dict[str, Any]] = []
-        if isinstance(persisted_records, list):
-            for rec in persisted_records:
-                if not isinstance(rec, dict):
-                    continue
-                metadata = rec.get("metadata_json", {})
-                if not isinstance(metadata, dict):
-                    metadata = {}
-                try:
-                    rec_turn = int(rec.get("turn_number", 0))
-                except (TypeError, ValueError):
-                    rec_turn = 0
-                restored_messages.append(
-                    {
-                        "author": str(rec.get("author") or metadata.get("author") or rec.get("role") or ""),
-                        "content": str(rec.get("content", "")),
-                        "timestamp": self._parse_timestamp(metadata.get("timestamp") or rec.get("created_at")),
-                        "turn": rec_turn,
-                        "displayed": bool(metadata.get("displayed", False)),
-                    }
-                )
+        restored_messages = self._restore_messages(persisted_records)
+        if archived:
+            restored_log: Sequence[Any] = MessageLog.with_archive(
+                restored_messages,
+                archived,
+                lambda start, end: self._restore_messages(
+                    self._persistence.get_game_messages_range(game_id, start, end)
+                ),
+                page_size=max(1, len(restored_messages)),
+            )
+        else:
+            restored_log = restored_messages
 
         raw_metadata = state_json.get("metadata", {})
         metadata = raw_metadata if isinstance(raw_metadata, dict) else {}
@@ -535,7 +634,7 @@ class GameEngine:
         manager = ConversationManager()
         manager.restore_state(
             {
-                "messages": restored_messages,
+                "messages": restored_log,
                 "turn": restored_turn,
                 "metadata": metadata,
             }
@@ -550,7 +649,7 @@ class GameEngine:
             max_turns = int(state_json.get("max_turns", 10))
         except (TypeError, ValueError):
             max_turns = 10
-        max_messages_before_user = len(actor_names)
+        max_messages_before_user = len(character_agents)
 
         session = GameSession(
             manager=manager,
@@ -560,19 +659,170 @@ class GameEngine:
             max_turns=max_turns,
             max_messages_before_user=max_messages_before_user,
             next_action=self._valid_next_action(state_json.get("next_action")),
-            persisted_messages=len(restored_messages),
+            persisted_messages=archived + len(restored_messages),
             actor_prompt_template=str(
                 state_json.get("actor_prompt_template")
                 or default_actor_prompt_template()
             ),
+            user_id=str(game.get("user_id") or ""),
+            username=str(game.get("user") or ""),
+            game_mode=str(game.get("game_mode") or "custom"),
         )
         self._registry[game_id] = session
         return session
 
+    @staticmethod
+    def _rehydrate_tail_messages() -> int | None:
+        """Mensajes recientes a cargar al rehidratar; None = historial completo (modo full)."""
+        if os.getenv("SESSION_REHYDRATE_MODE", "snapshot").strip().lower() == "full":
+            return None
+        try:
+            return max(1, int(os.getenv("SESSION_REHYDRATE_TAIL_MESSAGES", "").strip() or 50))
+        except ValueError:
+            return 50
+
+    def _load_session_records(self, game_id: str) -> tuple[dict[str, Any], list[Any], int]:
+        """(partida, mensajes cargados, mensajes anteriores sin cargar).
+
+        En modo snapshot (por defecto) es una sola lectura: estado + los últimos
+        SESSION_REHYDRATE_TAIL_MESSAGES mensajes; los anteriores se paginan al pedirlos, de
+        modo que reanudar no se encarece con la longitud de la partida.
+        """
+        tail = self._rehydrate_tail_messages()
+        if tail is None:
+            records = self._persistence.get_game_messages(game_id)
+            return self._persistence.get_game(game_id), records if isinstance(records, list) else [], 0
+        snapshot = self._persistence.get_session_snapshot(game_id, tail)
+        records = snapshot.get("messages")
+        records = records if isinstance(records, list) else []
+        try:
+            total = int(snapshot.get("message_count") or 0)
+        except (TypeError, ValueError):
+            total = len(records)
+        return dict(snapshot.get("game") or {}), records, max(0, total - len(records))
+
+    @classmethod
+    def _restore_messages(cls, records: Any) -> list[dict[str, Any]]:
+        """Registros de persistencia -> mensajes del ConversationManager."""
+        restored: list[dict[str, Any]] = []
+        if not isinstance(records, list):
+            return restored
+        for rec in records:
+            if not isinstance(rec, dict):
+                continue
+            metadata = rec.get("metadata_json", {})
+            if not isinstance(metadata, dict):
+                metadata = {}
+            try:
+                rec_turn = int(rec.get("turn_number", 0))
+            except (TypeError, ValueError):
+                rec_turn = 0
+            restored.append(
+                {
+                    "author": str(rec.get("author") or metadata.get("author") or rec.get("role") or ""),
+                    "content": str(rec.get("content", "")),
+                    "timestamp": cls._parse_timestamp(metadata.get("timestamp") or rec.get("created_at")),
+                    "turn": rec_turn,
+                    "displayed": bool(metadata.get("displayed", False)),
+                }
+            )
+        return restored
+
+    def _refresh_scene_snapshot(self, game_id: str, session: GameSession) -> None:
+        """Carga el último snapshot del notario en metadata para prompts y cadencia de misión.
+
+        Solo consulta persistencia si AGENT_CONTEXT_MODE=snapshot o la cadencia de misión es
+        adaptativa; un fallo de lectura no bloquea el turno (se sigue con historial crudo).
+        """
+        if not snapshot_context_enabled() and MissionEvalCadence.from_env().mode != "adaptive":
+            return
+        try:
+            snapshot = self._persistence.get_scene_snapshot(game_id)
+        except Exception as exc:
+            self._logger.warning("No se pudo leer scene snapshot game_id=%s: %s", game_id, exc)
+            return
+        if not snapshot:
+            return
+        session.manager.update_metadata("scene_snapshot", snapshot)
+        progress = snapshot.get("mission_progress_json")
+        if isinstance(progress, dict):
+            session.manager.update_metadata("notary_mission_progress", progress)
+
+    def _compact_conversation(self, game_id: str, session: GameSession) -> None:
+        """Resume los bloques antiguos del historial (CONVERSATION_SUMMARY_MODE) antes de persistir.
+
+        Corre dentro del turno, así que solo avanza CONVERSATION_SUMMARY_MAX_CHUNKS_PER_PERSIST
+        bloques por persistencia. Los nodos quedan en metadata y viajan con state_json; un
+        fallo no bloquea el turno.
+        """
+        summarizer = ConversationSummarizer()
+        if not summarizer.config.enabled:
+            return
+        state = session.manager.state
+        try:
+            summarizer.update(
+                state,
+                player_name=player_name_from_state(state),
+                max_chunks=summarizer.config.max_chunks_per_persist,
+            )
+        except Exception as exc:
+            self._logger.warning("No se pudo resumir la conversación game_id=%s: %s", game_id, exc)
+
+    def _register_new_session(self, game_id: str, session: GameSession) -> None:
+        """Registra una partida recién creada con el lease tomado para el warmup (el llamante lo suelta).
+
+        Su game_id es nuevo, así que el lease está libre.
+        """
+        if not self._ownership.acquire(game_id):
+            raise SessionOwnedElsewhereError(game_id, self._ownership.owner_of(game_id))
+        session.lease_version = self._ownership.version(game_id)
+        self._registry[game_id] = session
+
+    def _claim_lease(self, game_id: str) -> None:
+        """Toma el lease para escribir; espera el handoff del worker que esté escribiendo."""
+        if not self._ownership.claim(game_id):
+            raise SessionOwnedElsewhereError(game_id, self._ownership.owner_of(game_id))
+
+    @contextmanager
+    def _hold_lease(self, game_id: str) -> Iterator[None]:
+        self._claim_lease(game_id)
+        try:
+            yield
+        finally:
+            self._release_lease(game_id)
+
+    def _release_lease(self, game_id: str) -> None:
+        try:
+            self._ownership.release(game_id)
+        except Exception as exc:
+            self._logger.warning("No se pudo liberar el lease game_id=%s: %s", game_id, exc)
+
     def _get_session(self, game_id: str) -> GameSession:
-        if game_id not in self._registry:
-            self._rehydrate_session(game_id)
-        return self._registry[game_id]
+        """Sesión en memoria si refleja la última escritura persistida; si no, se rehidrata.
+
+        No toma el lease: leer (/game/status) no retiene la partida en este worker. Si otro
+        worker persistió después de cargar la copia local (versión distinta) se descarta y se
+        rehidrata. La versión se lee antes de cargar: si cambia a mitad, la próxima lectura
+        vuelve a rehidratar en vez de servir algo desfasado.
+        """
+        version = self._ownership.version(game_id)
+        session = self._registry.get(game_id)
+        if session is not None:
+            if session.lease_version == version:
+                return session
+            self._logger.debug("Copia desfasada game_id=%s: se rehidrata", game_id)
+            self._registry.pop(game_id, None)
+        session = self._rehydrate_session(game_id)
+        session.lease_version = version
+        return session
+
+    def check_turn_available(self, game_id: str) -> None:
+        """Rechazo rápido (TurnInProgressError) si hay un turno en curso y la política es reject.
+
+        Con TURN_LOCK_POLICY=queue no rechaza: el turno esperará al anterior.
+        """
+        if self._turn_locks.policy == "reject" and self._turn_locks.is_locked(game_id):
+            raise TurnInProgressError(game_id)
 
     def player_input(
         self,
@@ -582,18 +832,27 @@ class GameEngine:
     ) -> tuple[list, ConversationState, bool]:
         """
         Aplica el input del jugador y avanza pasos hasta user_input o game_ended.
-        Devuelve (events, state, game_ended).
+        Devuelve (events, state, game_ended). Lanza TurnInProgressError si la partida ya tiene
+        un turno en curso (según TURN_LOCK_POLICY).
         """
+        with self._turn_locks.hold(game_id), self._hold_lease(game_id):
+            return self._run_player_input(game_id, text, user_exit)
+
+    def _run_player_input(
+        self,
+        game_id: str,
+        text: str,
+        user_exit: bool,
+    ) -> tuple[list, ConversationState, bool]:
         session = self._get_session(game_id)
         if text and text.strip():
             validate_user_message(text)
-        game = self._persistence.get_game(game_id)
-        user_id = str(game.get("user_id") or game.get("user") or "") if game else ""
+        self._refresh_scene_snapshot(game_id, session)
         state = session.manager.state
         interaction_id = f"{game_id}:turn:{state.get('turn', 0)}"
         all_events: list = []
         t0 = time.perf_counter()
-        with trace_interaction(game_id, user_id, interaction_id):
+        with trace_interaction(game_id, session.trace_user_id, interaction_id):
             result = run_one_step(
                 session.manager,
                 session.character_agents,
@@ -635,6 +894,8 @@ class GameEngine:
             game_ended,
             elapsed,
         )
+        for event in all_events:
+            self._publish_event(game_id, event)
         self._persist_session_state(game_id, session)
         return all_events, state, game_ended
 
@@ -646,15 +907,18 @@ class GameEngine:
         Un paso de personaje si toca; si no, devuelve waiting_for_player.
         Devuelve (events, state, game_ended, waiting_for_player).
         """
+        with self._turn_locks.hold(game_id), self._hold_lease(game_id):
+            return self._run_tick(game_id)
+
+    def _run_tick(self, game_id: str) -> tuple[list, ConversationState, bool, bool]:
         session = self._get_session(game_id)
         if session.next_action != "character":
             return [], session.manager.state, False, True
 
-        game = self._persistence.get_game(game_id)
-        user_id = str(game.get("user_id") or game.get("user") or "") if game else ""
+        self._refresh_scene_snapshot(game_id, session)
         interaction_id = f"{game_id}:tick:{session.manager.state.get('turn', 0)}"
         t0 = time.perf_counter()
-        with trace_interaction(game_id, user_id, interaction_id, name="tick"):
+        with trace_interaction(game_id, session.trace_user_id, interaction_id, name="tick"):
             result = run_one_step(
                 session.manager,
                 session.character_agents,
@@ -679,6 +943,8 @@ class GameEngine:
             game_ended,
             elapsed,
         )
+        for event in events:
+            self._publish_event(game_id, event)
         self._persist_session_state(game_id, session)
         return events, state, game_ended, False
 
@@ -691,24 +957,41 @@ class GameEngine:
         """Ejecuta el turno (input del jugador + respuestas de personajes hasta user_input o game_ended).
         Genera eventos en streaming: observer_thinking, message_start, message_delta,
         message y game_ended a medida que cada actor termina.
+        Si la partida ya tiene un turno en curso emite un único evento error.
         """
-        session = self._get_session(game_id)
-        if text and text.strip():
-            validate_user_message(text)
-        game = self._persistence.get_game(game_id)
-        user_id = str(game.get("user_id") or game.get("user") or "") if game else ""
+        try:
+            self._turn_locks.acquire(game_id)
+        except TurnInProgressError as exc:
+            yield {"type": "error", "message": str(exc)}
+            return
+        try:
+            self._claim_lease(game_id)
+        except BaseException:
+            self._turn_locks.release(game_id)
+            raise
+        try:
+            session = self._get_session(game_id)
+            if text and text.strip():
+                validate_user_message(text)
+            self._refresh_scene_snapshot(game_id, session)
+        except BaseException:
+            self._release_lease(game_id)
+            self._turn_locks.release(game_id)
+            raise
         interaction_id = f"{game_id}:turn:{session.manager.state.get('turn', 0)}"
         queue: Queue = Queue()
 
         def chunk_sink(chunk: str) -> None:
+            self._publish_event(game_id, {"type": "message_delta", "delta": chunk})
             queue.put(("delta", chunk))
 
         def event_sink(event: dict[str, Any]) -> None:
+            self._publish_event(game_id, event)
             queue.put(("event", dict(event)))
 
         def run() -> None:
             try:
-                with trace_interaction(game_id, user_id, interaction_id, name="turn_stream"):
+                with trace_interaction(game_id, session.trace_user_id, interaction_id, name="turn_stream"):
                     result = run_one_step(
                         session.manager,
                         session.character_agents,
@@ -749,7 +1032,13 @@ class GameEngine:
                     self._persist_session_state(game_id, session)
                     queue.put(("done", None))
             except Exception as e:
+                self._publish_event(game_id, {"type": "error", "message": str(e)})
                 queue.put(("error", str(e)))
+            finally:
+                # El turno sigue en este hilo aunque el cliente se desconecte: lease y
+                # cerrojo se sueltan al terminar, no al cerrar el stream.
+                self._release_lease(game_id)
+                self._turn_locks.release(game_id)
 
         thread = Thread(target=run)
         thread.start()
@@ -780,7 +1069,7 @@ class GameEngine:
 
     @staticmethod
     def _jsonable(value: Any) -> Any:
-        if isinstance(value, dict):
+        if isinstance(value, Mapping):
             return {k: GameEngine._jsonable(v) for k, v in value.items()}
         if isinstance(value, list):
             return [GameEngine._jsonable(v) for v in value]
@@ -793,8 +1082,11 @@ class GameEngine:
 
     def _build_state_snapshot(self, session: GameSession) -> dict[str, Any]:
         state = session.manager.state
+        messages = state.get("messages", [])
         return {
             "turn": state.get("turn", 0),
+            # Total de mensajes persistidos con este estado (rehidratación snapshot + cola).
+            "message_count": len(messages) if isinstance(messages, Sequence) else 0,
             "metadata": state.get("metadata", {}),
             "next_action": session.next_action,
             "max_turns": session.max_turns,
@@ -807,7 +1099,7 @@ class GameEngine:
             return []
         actor_count = max(1, len(session.character_agents))
         messages = session.manager.state.get("messages", [])
-        total_messages = len(messages) if isinstance(messages, list) else len(new_messages)
+        total_messages = len(messages) if isinstance(messages, Sequence) else len(new_messages)
         window_size = (actor_count + 1) * 2
         return [
             {
@@ -826,9 +1118,14 @@ class GameEngine:
         ]
 
     def _persist_session_state(self, game_id: str, session: GameSession) -> None:
+        if not self._ownership.renew(game_id):
+            # Otro worker tiene la partida: escribir ahora intercalaría mensajes en su log.
+            self._registry.pop(game_id, None)
+            raise SessionOwnedElsewhereError(game_id, self._ownership.owner_of(game_id))
+        self._compact_conversation(game_id, session)
         state = session.manager.state
         messages = state.get("messages", [])
-        if not isinstance(messages, list):
+        if not isinstance(messages, Sequence):
             messages = []
         new_messages = []
         for msg in messages[session.persisted_messages :]:
@@ -852,8 +1149,21 @@ class GameEngine:
             domain_events=domain_events,
         )
         session.persisted_messages = len(messages)
+        # Después del commit: quien lea la versión nueva ya encuentra estos datos persistidos.
+        session.lease_version = self._ownership.bump(game_id)
+        self._publish_status(game_id, session)
 
 
-def create_engine(persistence_provider: PersistenceProvider | None = None) -> GameEngine:
+def create_engine(
+    persistence_provider: PersistenceProvider | None = None,
+    event_channel: GameEventChannel | None = None,
+    ownership: SessionOwnership | None = None,
+    turn_locks: TurnLocks | None = None,
+) -> GameEngine:
     """Factory: una instancia del motor (para API o tests)."""
-    return GameEngine(persistence_provider=persistence_provider)
+    return GameEngine(
+        persistence_provider=persistence_provider,
+        event_channel=event_channel,
+        ownership=ownership,
+        turn_locks=turn_locks,
+    )
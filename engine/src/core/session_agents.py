@@ -0,0 +1,204 @@
+"""Agentes de una sesión construidos al primer uso.
+
+Crear o rehidratar una partida solo calcula la configuración inmutable de cada actor
+(ActorSpec); el CharacterAgent y el ObserverAgent se construyen la primera vez que un turno
+los usa. Reanudar una partida para leer /status no paga la construcción de agentes y las
+sesiones inactivas no los retienen.
+
+Las specs se cachean por hash de (config, template de prompt): partidas con la misma
+configuración (p. ej. plantillas estándar) comparten las mismas tuplas en memoria.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from ..public_missions import fallback_actor_public_mission, fallback_player_public_mission
+
+_SPEC_CACHE_MAX = 256
+
+
+@dataclass(frozen=True)
+class ActorSpec:
+    """Configuración inmutable de un actor: argumentos de create_character_agent."""
+
+    name: str
+    personality: Any
+    mission: Any
+    background: Any
+    player_public_mission: str
+    scene_participants: tuple[Mapping[str, str], ...]
+    prompt_template: str
+
+    def agent_kwargs(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "personality": self.personality,
+            "mission": self.mission,
+            "background": self.background,
+            "player_public_mission": self.player_public_mission,
+            "scene_participants": [dict(p) for p in self.scene_participants],
+            "prompt_template": self.prompt_template,
+        }
+
+
+@dataclass(frozen=True)
+class SessionAgentSpecs:
+    actors: tuple[ActorSpec, ...]
+    player_mission: str
+
+    @property
+    def actor_names(self) -> list[str]:
+        return [actor.name for actor in self.actors]
+
+
+def build_scene_participants(setup: Mapping[str, Any]) -> list[dict[str, str]]:
+    """Participantes visibles de la escena (lo público de cada actor)."""
+    actors = setup.get("actors", [])
+    if not isinstance(actors, list):
+        return []
+    scene_participants: list[dict[str, str]] = []
+    for actor in actors:
+        if not isinstance(actor, dict):
+            continue
+        name = str(actor.get("name", "")).strip()
+        if not name:
+            continue
+        scene_participants.append(
+            {
+                "name": name,
+                "personality": str(actor.get("personality", "")).strip(),
+                "public_mission": str(
+                    actor.get("public_mission")
+                    or fallback_actor_public_mission(
+                        personality=actor.get("personality"),
+                        presencia_escena=actor.get("presencia_escena"),
+                    )
+                ).strip(),
+                "presencia_escena": str(actor.get("presencia_escena", "")).strip(),
+            }
+        )
+    return scene_participants
+
+
+def _build_specs(setup: Mapping[str, Any], prompt_template: str) -> SessionAgentSpecs:
+    player_public_mission = str(
+        setup.get("player_public_mission")
+        or fallback_player_public_mission(
+            relevancia_jugador=setup.get("relevancia_jugador"),
+            contexto_problema=setup.get("contexto_problema"),
+        )
+    ).strip()
+    scene_participants = tuple(build_scene_participants(setup))
+    actors: list[ActorSpec] = []
+    for actor in setup.get("actors", []):
+        if not isinstance(actor, dict):
+            continue
+        name = str(actor.get("name", "")).strip()
+        if not name:
+            continue
+        actors.append(
+            ActorSpec(
+                name=name,
+                personality=actor.get("personality"),
+                mission=actor.get("mission"),
+                background=actor.get("background"),
+                player_public_mission=player_public_mission,
+                scene_participants=scene_participants,
+                prompt_template=prompt_template,
+            )
+        )
+    return SessionAgentSpecs(actors=tuple(actors), player_mission=str(setup.get("player_mission") or ""))
+
+
+_spec_cache: OrderedDict[str, SessionAgentSpecs] = OrderedDict()
+_spec_cache_lock = threading.Lock()
+
+
+def session_agent_specs(setup: Mapping[str, Any], prompt_template: str) -> SessionAgentSpecs:
+    """Specs de actores y observer para un setup; cacheadas por hash de la configuración."""
+    actors = setup.get("actors", [])
+    if not isinstance(actors, list):
+        return SessionAgentSpecs(actors=(), player_mission=str(setup.get("player_mission") or ""))
+    raw = json.dumps([setup, prompt_template], sort_keys=True, ensure_ascii=False, default=str)
+    key = hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    with _spec_cache_lock:
+        cached = _spec_cache.get(key)
+        if cached is not None:
+            _spec_cache.move_to_end(key)
+            return cached
+    specs = _build_specs(setup, prompt_template)
+    with _spec_cache_lock:
+        _spec_cache[key] = specs
+        while len(_spec_cache) > _SPEC_CACHE_MAX:
+            _spec_cache.popitem(last=False)
+    return specs
+
+
+class LazyAgent:
+    """Proxy que construye el agente con `factory` la primera vez que se usa un atributo."""
+
+    __slots__ = ("_factory", "_agent", "_lock")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._agent: Any = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._agent is not None
+
+    def resolve(self) -> Any:
+        if self._agent is None:
+            with self._lock:
+                if self._agent is None:
+                    self._agent = self._factory()
+        return self._agent
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+
+class LazyCharacterAgents(Mapping):
+    """name -> CharacterAgent; nombres y orden salen de las specs, el agente se crea al pedirlo."""
+
+    def __init__(self, actors: tuple[ActorSpec, ...], factory: Callable[[ActorSpec], Any]) -> None:
+        self._specs = {actor.name: actor for actor in actors}
+        self._factory = factory
+        self._agents: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> list[str]:
+        """Actores cuyo agente ya se ha construido."""
+        return list(self._agents)
+
+    def __getitem__(self, name: str) -> Any:
+        agent = self._agents.get(name)
+        if agent is not None:
+            return agent
+        spec = self._specs[name]
+        with self._lock:
+            agent = self._agents.get(name)
+            if agent is None:
+                agent = self._agents[name] = self._factory(spec)
+        return agent
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def __repr__(self) -> str:
+        return f"LazyCharacterAgents(actors={list(self._specs)}, built={self.built})"
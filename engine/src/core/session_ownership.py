@@ -0,0 +1,184 @@
+"""Propiedad de sesiones entre workers: un lease por game_id mientras se escribe.
+
+Con varios workers de uvicorn (o varias instancias de la API) cada proceso tiene su propio
+registro de sesiones en memoria; si dos procesos escriben la misma partida a la vez, ambos
+añaden mensajes desde su copia y el log persistido queda intercalado. El lease garantiza
+que solo un worker escribe (warmup, turno o tick) y se suelta al terminar, de modo que la
+partida pasa de un worker a otro entre turnos. Un worker que quiere escribir mientras otro
+tiene el lease espera hasta SESSION_HANDOFF_WAIT_SECONDS; si no se libera, la API responde
+409 con Retry-After y el dueño actual como pista.
+
+Cada escritura persistida incrementa la versión de la partida: un worker con una copia en
+memoria de otra versión la descarta y rehidrata. Las lecturas (/game/status) no toman el
+lease, solo comparan la versión.
+
+SESSION_OWNERSHIP_BACKEND:
+- local (por defecto): siempre concede; correcto con un único worker.
+- redis: SET NX PX para adquirir, renovación y liberación con compare-and-set en Lua, de
+  modo que un worker nunca renueva ni borra un lease que ya no es suyo.
+
+SESSION_LEASE_SECONDS debe superar la duración del turno más largo: el lease se renueva
+antes de persistir, no durante la llamada al LLM.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import socket
+import time
+
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class SessionOwnedElsewhereError(RuntimeError):
+    """La partida está viva en otro worker; `owner` es su id (vacío si se desconoce)."""
+
+    def __init__(self, game_id: str, owner: str | None = None) -> None:
+        self.game_id = game_id
+        self.owner = owner or ""
+        super().__init__(f"Session {game_id} is owned by another worker")
+
+
+def current_worker_id() -> str:
+    """Id estable de este proceso: AGORA_WORKER_ID o host:pid."""
+    configured = os.getenv("AGORA_WORKER_ID", "").strip()
+    return configured or f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _lease_seconds() -> int:
+    try:
+        return max(1, int(os.getenv("SESSION_LEASE_SECONDS", "").strip() or 120))
+    except ValueError:
+        return 120
+
+
+def _handoff_wait_seconds() -> float:
+    try:
+        return max(0.0, float(os.getenv("SESSION_HANDOFF_WAIT_SECONDS", "").strip() or 5.0))
+    except ValueError:
+        return 5.0
+
+
+# La versión solo sirve para invalidar copias en memoria: si caduca se lee 0, no coincide
+# con ninguna copia y se rehidrata (nunca se sirve una copia desfasada).
+_VERSION_TTL_SECONDS = 7 * 86400
+
+
+class SessionOwnership:
+    """Contrato y backend local: un solo proceso, siempre es el dueño."""
+
+    backend = "local"
+
+    def __init__(self, worker_id: str | None = None, handoff_wait_seconds: float | None = None) -> None:
+        self.worker_id = worker_id or current_worker_id()
+        self._handoff_wait = (
+            handoff_wait_seconds if handoff_wait_seconds is not None else _handoff_wait_seconds()
+        )
+
+    def acquire(self, game_id: str) -> bool:
+        """Toma el lease si está libre (o ya es nuestro). False si lo tiene otro worker."""
+        return True
+
+    def claim(self, game_id: str) -> bool:
+        """acquire esperando hasta SESSION_HANDOFF_WAIT_SECONDS a que el dueño termine su escritura."""
+        deadline = time.monotonic() + self._handoff_wait
+        while not self.acquire(game_id):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    def renew(self, game_id: str) -> bool:
+        """Extiende el lease solo si sigue siendo nuestro."""
+        return True
+
+    def release(self, game_id: str) -> None:
+        """Libera el lease si es nuestro (no toca el de otro worker)."""
+
+    def owner_of(self, game_id: str) -> str | None:
+        return self.worker_id
+
+    def version(self, game_id: str) -> int:
+        """Versión persistida de la partida (escrituras completadas por cualquier worker)."""
+        return 0
+
+    def bump(self, game_id: str) -> int:
+        """Marca una escritura persistida y devuelve la versión nueva."""
+        return 0
+
+
+class RedisSessionOwnership(SessionOwnership):
+    """Leases en Redis con expiración; sobreviven a la caída del worker solo hasta el TTL."""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        worker_id: str | None = None,
+        lease_seconds: int | None = None,
+        handoff_wait_seconds: float | None = None,
+    ) -> None:
+        super().__init__(worker_id, handoff_wait_seconds)
+        self._redis_url = (redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")).strip()
+        try:
+            redis_module = importlib.import_module("redis")
+        except ModuleNotFoundError as exc:
+            raise RuntimeError("Falta dependencia 'redis' para SESSION_OWNERSHIP_BACKEND=redis") from exc
+        self._client = redis_module.Redis.from_url(self._redis_url, decode_responses=True)
+        self._lease_ms = (lease_seconds or _lease_seconds()) * 1000
+
+    @staticmethod
+    def _key(game_id: str) -> str:
+        return f"agora:session_owner:{game_id}"
+
+    @staticmethod
+    def _version_key(game_id: str) -> str:
+        return f"agora:session_version:{game_id}"
+
+    def acquire(self, game_id: str) -> bool:
+        key = self._key(game_id)
+        if self._client.set(key, self.worker_id, nx=True, px=self._lease_ms):
+            return True
+        return self.renew(game_id)
+
+    def renew(self, game_id: str) -> bool:
+        return bool(self._client.eval(_RENEW_SCRIPT, 1, self._key(game_id), self.worker_id, self._lease_ms))
+
+    def release(self, game_id: str) -> None:
+        self._client.eval(_RELEASE_SCRIPT, 1, self._key(game_id), self.worker_id)
+
+    def owner_of(self, game_id: str) -> str | None:
+        owner = self._client.get(self._key(game_id))
+        return str(owner) if owner else None
+
+    def version(self, game_id: str) -> int:
+        return int(self._client.get(self._version_key(game_id)) or 0)
+
+    def bump(self, game_id: str) -> int:
+        key = self._version_key(game_id)
+        pipe = self._client.pipeline()
+        pipe.incr(key)
+        pipe.expire(key, _VERSION_TTL_SECONDS)
+        version, _ = pipe.execute()
+        return int(version)
+
+
+def create_session_ownership() -> SessionOwnership:
+    backend = os.getenv("SESSION_OWNERSHIP_BACKEND", "local").strip().lower()
+    if backend == "redis":
+        return RedisSessionOwnership()
+    return SessionOwnership()
@@ -0,0 +1,167 @@
+"""Cerrojo de turno por partida: un solo turno en ejecución por game_id.
+
+Sin él, un doble clic en /game/turn lanza dos turnos completos en paralelo sobre el mismo
+ConversationManager (dos rondas de LLM pagadas, mensajes duplicados y carrera sobre
+persisted_messages).
+
+TURN_LOCK_POLICY:
+- reject (por defecto): si ya hay un turno en curso se lanza TurnInProgressError (409).
+- queue: se espera hasta TURN_LOCK_WAIT_SECONDS a que termine el turno anterior.
+
+TURN_LOCK_BACKEND:
+- local (por defecto): threading.Lock por partida dentro del proceso.
+- redis: además del cerrojo local, una clave con TTL (TURN_LOCK_TTL_SECONDS) en REDIS_URL
+  para serializar turnos entre procesos aunque no haya leases de sesión.
+"""
+
+from __future__ import annotations
+
+import importlib
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Iterator
+
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class TurnInProgressError(RuntimeError):
+    """Ya hay un turno ejecutándose para la partida."""
+
+    def __init__(self, game_id: str) -> None:
+        self.game_id = game_id
+        super().__init__(f"A turn is already in progress for session {game_id}")
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+class TurnLocks:
+    """Cerrojos por partida en memoria; se crean al usarse y se borran al quedar libres."""
+
+    backend = "local"
+
+    def __init__(self, policy: str | None = None, wait_seconds: float | None = None) -> None:
+        resolved = (policy or os.getenv("TURN_LOCK_POLICY", "reject")).strip().lower()
+        self.policy = resolved if resolved in ("reject", "queue") else "reject"
+        self._wait_seconds = wait_seconds if wait_seconds is not None else _float_env("TURN_LOCK_WAIT_SECONDS", 30.0)
+        self._guard = threading.Lock()
+        # game_id -> [cerrojo, usuarios (dueño + en espera)]
+        self._locks: dict[str, list] = {}
+
+    def _timeout(self, wait: bool = True) -> float:
+        return self._wait_seconds if wait and self.policy == "queue" else 0.0
+
+    def is_locked(self, game_id: str) -> bool:
+        with self._guard:
+            entry = self._locks.get(game_id)
+            return entry is not None and entry[0].locked()
+
+    def acquire(self, game_id: str, wait: bool = True) -> None:
+        """Toma el turno o lanza TurnInProgressError (en queue, tras esperar el máximo).
+
+        Con wait=False no espera nunca, sea cual sea la política.
+        """
+        with self._guard:
+            entry = self._locks.setdefault(game_id, [threading.Lock(), 0])
+            entry[1] += 1
+        timeout = self._timeout(wait)
+        acquired = entry[0].acquire(timeout=timeout) if timeout > 0 else entry[0].acquire(blocking=False)
+        if not acquired:
+            self._forget(game_id, entry)
+            raise TurnInProgressError(game_id)
+
+    def release(self, game_id: str) -> None:
+        """Libera el turno; puede llamarse desde otro hilo que el que lo tomó."""
+        with self._guard:
+            entry = self._locks.get(game_id)
+        if entry is None:
+            return
+        entry[0].release()
+        self._forget(game_id, entry)
+
+    def _forget(self, game_id: str, entry: list) -> None:
+        with self._guard:
+            entry[1] -= 1
+            if entry[1] <= 0 and self._locks.get(game_id) is entry:
+                del self._locks[game_id]
+
+    @contextmanager
+    def hold(self, game_id: str, wait: bool = True) -> Iterator[None]:
+        self.acquire(game_id, wait=wait)
+        try:
+            yield
+        finally:
+            self.release(game_id)
+
+
+class RedisTurnLocks(TurnLocks):
+    """Cerrojo local + clave SET NX PX en Redis con token propio (liberación compare-and-del)."""
+
+    backend = "redis"
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        policy: str | None = None,
+        wait_seconds: float | None = None,
+        ttl_seconds: float | None = None,
+    ) -> None:
+        super().__init__(policy=policy, wait_seconds=wait_seconds)
+        self._redis_url = (redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")).strip()
+        try:
+            redis_module = importlib.import_module("redis")
+        except ModuleNotFoundError as exc:
+            raise RuntimeError("Falta dependencia 'redis' para TURN_LOCK_BACKEND=redis") from exc
+        self._client = redis_module.Redis.from_url(self._redis_url, decode_responses=True)
+        ttl = ttl_seconds if ttl_seconds is not None else _float_env("TURN_LOCK_TTL_SECONDS", 300.0)
+        self._ttl_ms = max(1000, int(ttl * 1000))
+        self._tokens: dict[str, str] = {}
+
+    @staticmethod
+    def _key(game_id: str) -> str:
+        return f"agora:turn_lock:{game_id}"
+
+    def is_locked(self, game_id: str) -> bool:
+        return super().is_locked(game_id) or bool(self._client.get(self._key(game_id)))
+
+    def acquire(self, game_id: str, wait: bool = True) -> None:
+        super().acquire(game_id, wait=wait)
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self._timeout(wait)
+        try:
+            while not self._client.set(self._key(game_id), token, nx=True, px=self._ttl_ms):
+                if time.monotonic() >= deadline:
+                    raise TurnInProgressError(game_id)
+                time.sleep(0.1)
+        except BaseException:
+            # Redis caído o turno ajeno: el cerrojo local no puede quedar tomado.
+            super().release(game_id)
+            raise
+        self._tokens[game_id] = token
+
+    def release(self, game_id: str) -> None:
+        token = self._tokens.pop(game_id, None)
+        try:
+            if token is not None:
+                self._client.eval(_RELEASE_SCRIPT, 1, self._key(game_id), token)
+        finally:
+            super().release(game_id)
+
+
+def create_turn_locks() -> TurnLocks:
+    backend = os.getenv("TURN_LOCK_BACKEND", "local").strip().lower()
+    if backend == "redis":
+        return RedisTurnLocks()
+    return TurnLocks()
@@ -2,6 +2,7 @@
 
 import os
 import time
+from collections.abc import Mapping
 from typing import Literal, Any
 
 from ..state import ConversationState
@@ -52,7 +53,7 @@ def _messages_since_user(messages: list) -> int:
 
 def run_one_step(
     manager: ConversationManager,
-    character_agents: dict[str, Any],
+    character_agents: Mapping[str, Any],
     observer_agent: Any,
     max_turns: int,
     *,
@@ -70,7 +71,7 @@ def run_one_step(
 
     Args:
         manager: ConversationManager de la partida.
-        character_agents: Dict nombre -> CharacterAgent.
+        character_agents: Mapping nombre -> CharacterAgent (solo lectura).
         observer_agent: ObserverAgent.
         max_turns: Máximo de turnos de usuario.
         current_next_action: Fase actual ("character" o "user_input").
@@ -156,7 +157,10 @@ def run_one_step(
         manager.update_metadata("continuation_decision", obs_result["continuation_decision"])
     if obs_result.get("mission_evaluation") is not None:
         manager.update_metadata("last_mission_evaluation", obs_result["mission_evaluation"])
-        manager.update_metadata(f"turn_{state['turn']}_mission_evaluation", obs_result["mission_evaluation"])
+        if obs_result.get("mission_evaluated", True):
+            manager.update_metadata(f"turn_{state['turn']}_mission_evaluation", obs_result["mission_evaluation"])
+    if obs_result.get("mission_eval_cadence") is not None:
+        manager.update_metadata("mission_eval_cadence", obs_result["mission_eval_cadence"])
     if "game_ended" in obs_result:
         manager.update_metadata("game_ended", obs_result["game_ended"])
     if "game_ended_reason" in obs_result:
@@ -189,7 +193,7 @@ def run_one_step(
 
 def run_game_loop(
     manager: ConversationManager,
-    character_agents: dict[str, Any],
+    character_agents: Mapping[str, Any],
     observer_agent: Any,
     max_turns: int,
     *,
@@ -273,7 +277,10 @@ def run_game_loop(
             manager.update_metadata("continuation_decision", obs_result["continuation_decision"])
         if obs_result.get("mission_evaluation") is not None:
             manager.update_metadata("last_mission_evaluation", obs_result["mission_evaluation"])
-            manager.update_metadata(f"turn_{state['turn']}_mission_evaluation", obs_result["mission_evaluation"])
+            if obs_result.get("mission_evaluated", True):
+                manager.update_metadata(f"turn_{state['turn']}_mission_evaluation", obs_result["mission_evaluation"])
+        if obs_result.get("mission_eval_cadence") is not None:
+            manager.update_metadata("mission_eval_cadence", obs_result["mission_eval_cadence"])
         if "game_ended" in obs_result:
             manager.update_metadata("game_ended", obs_result["game_ended"])
         if "game_ended_reason" in obs_result:
@@ -1,8 +1,10 @@
 """ConversationManager - Orquestador del estado conversacional."""
 
 from datetime import datetime
-from typing import List, Dict, Any
-from .state import ConversationState, Message
+from typing import Any
+from .context_window import ContextWindow, pack_context_window
+from .message_log import MessageLog, MessageLogView
+from .state import ConversationState
 
 
 class ConversationManager:
@@ -11,7 +13,7 @@ class ConversationManager:
     def __init__(self):
         """Inicializa el manager con estado vacío."""
         self._state: ConversationState = {
-            "messages": [],
+            "messages": MessageLog(),
             "turn": 0,
             "metadata": {}
         }
@@ -31,34 +33,48 @@ class ConversationManager:
             content: Contenido del mensaje
             displayed: Si True, el mensaje ya fue mostrado (p. ej. por streaming) y el handler no debe reimprimirlo.
         """
-        message: Message = {
-            "author": author,
-            "content": content,
-            "timestamp": datetime.now(),
-            "turn": self._state["turn"],
-            "displayed": displayed,
-        }
-        self._state["messages"].append(message)
+        self._state["messages"].add(
+            author=author,
+            content=content,
+            timestamp=datetime.now(),
+            turn=self._state["turn"],
+            displayed=displayed,
+        )
     
-    def get_visible_history(self) -> List[Message]:
+    def get_visible_history(self) -> MessageLogView:
         """Retorna el historial visible para agentes actores.
         
         Por ahora, retorna todos los mensajes. En el futuro se puede
         filtrar para ocultar ciertos mensajes o metadata.
         
         Returns:
-            Lista de mensajes visibles
+            Vista de solo lectura (sin copia) de los mensajes actuales
         """
-        return self._state["messages"].copy()
+        return self._state["messages"].snapshot()
     
-    def get_full_history(self) -> List[Message]:
+    def get_full_history(self) -> MessageLogView:
         """Retorna el historial completo para observadores.
         
         Returns:
-            Lista completa de mensajes
+            Vista de solo lectura (sin copia) de todos los mensajes actuales
         """
-        return self._state["messages"].copy()
+        return self._state["messages"].snapshot()
     
+    def get_context_window(self, token_budget: int, min_recent: int = 2) -> ContextWindow:
+        """Retorna el contexto empaquetado a un presupuesto de tokens.
+
+        Combina los resúmenes jerárquicos de metadata["conversation_summary"] con los
+        mensajes más recientes que quepan (ver context_window.pack_context_window).
+
+        Args:
+            token_budget: Presupuesto máximo de tokens estimados
+            min_recent: Mensajes recientes que se incluyen aunque excedan el presupuesto
+
+        Returns:
+            ContextWindow con summary_text y messages
+        """
+        return pack_context_window(self._state, token_budget, min_recent=min_recent)
+
     def increment_turn(self) -> None:
         """Incrementa el contador de turnos."""
         self._state["turn"] += 1
@@ -87,7 +103,13 @@ class ConversationManager:
     def restore_state(self, state: ConversationState) -> None:
         """Restaura el estado conversacional desde persistencia de forma defensiva."""
         raw_messages = state.get("messages", []) if isinstance(state, dict) else []
-        messages = raw_messages if isinstance(raw_messages, list) else []
+        if isinstance(raw_messages, MessageLog) and raw_messages.archived:
+            # Log rehidratado con cola + archivo perezoso: copiarlo cargaría todo el historial.
+            messages = raw_messages
+        else:
+            messages = MessageLog.from_records(
+                raw_messages if isinstance(raw_messages, (list, MessageLog)) else []
+            )
 
         raw_turn = state.get("turn", 0) if isinstance(state, dict) else 0
         try:
@@ -0,0 +1,328 @@
+"""Registro compacto y append-only de los mensajes de una partida.
+
+En lugar de un dict (con su datetime) por mensaje, MessageLog guarda columnas: ids de
+autor internados, timestamps como enteros (microsegundos desde el primer mensaje),
+turnos, flags y contenidos. Cada mensaje se expone como MessageView, un Mapping de solo
+lectura con las claves de Message, de modo que agentes, API y director lo siguen leyendo
+como antes (msg["author"], msg.get("displayed"), ...).
+
+Al ser append-only, snapshot() devuelve una vista estable de los n primeros mensajes sin
+copiar nada.
+
+Un log rehidratado puede empezar solo con la cola de la partida (with_archive): los mensajes
+anteriores cuentan en len() y se cargan por páginas desde persistencia la primera vez que
+alguien los indexa (p. ej. /status sin `since`). Los índices son siempre absolutos. Esa
+carga puede ocurrir en el hilo de una petición mientras el turno añade mensajes: el cambio de
+columnas, add() y las lecturas de MessageView van bajo el lock del log.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+from array import array
+from collections.abc import Mapping, Sequence
+from datetime import datetime, timedelta
+from typing import Any, Callable, Iterator, overload
+
+MESSAGE_KEYS = ("author", "content", "timestamp", "turn", "displayed")
+# Marca de timestamp que no cabe como desplazamiento entero (None, tz distinta, texto...).
+_OTHER_TS = -(2**63)
+# (start, end) -> mensajes [start, end) de la partida en orden, como Mappings de Message.
+ArchiveLoader = Callable[[int, int], Sequence[Mapping]]
+
+
+class MessageView(Mapping):
+    """Mensaje del log presentado con la interfaz de Message (solo lectura)."""
+
+    __slots__ = ("_log", "_index")
+
+    def __init__(self, log: "MessageLog", index: int) -> None:
+        self._log = log
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        log = self._log
+        with log._lock:
+            index = self._index - log._archived
+            if key == "author":
+                return log._authors[log._author_ids[index]]
+            if key == "content":
+                return log._contents[index]
+            if key == "timestamp":
+                return log._timestamp(index)
+            if key == "turn":
+                return log._turns[index]
+            if key == "displayed":
+                return bool(log._displayed[index])
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(MESSAGE_KEYS)
+
+    def __len__(self) -> int:
+        return len(MESSAGE_KEYS)
+
+    def __repr__(self) -> str:
+        return f"MessageView({dict(self)!r})"
+
+    def cached_token_count(self, tokenizer: str) -> int | None:
+        return self._log._cached_tokens(self._index, tokenizer)
+
+    def cache_token_count(self, tokenizer: str, tokens: int) -> None:
+        self._log._cache_tokens(self._index, tokenizer, tokens)
+
+
+class _MessageSequence(Sequence):
+    """Acceso por índice/slice común al log y a sus vistas."""
+
+    __slots__ = ()
+
+    def _resolve(self) -> tuple["MessageLog", int]:
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        return self._resolve()[1]
+
+    @overload
+    def __getitem__(self, index: int) -> MessageView: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[MessageView]: ...
+
+    def __getitem__(self, index: int | slice) -> MessageView | list[MessageView]:
+        log, length = self._resolve()
+        if isinstance(index, slice):
+            indices = range(*index.indices(length))
+            if indices:
+                log._ensure_loaded(min(indices[0], indices[-1]))
+            return [MessageView(log, i) for i in indices]
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("message index out of range")
+        log._ensure_loaded(index)
+        return MessageView(log, index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def copy(self) -> list[MessageView]:
+        return self[:]
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """Mensajes como dicts planos (para serializar o depurar)."""
+        return [dict(view) for view in self]
+
+
+class MessageLogView(_MessageSequence):
+    """Vista de solo lectura de los primeros `length` mensajes de un log."""
+
+    __slots__ = ("_log", "_length")
+
+    def __init__(self, log: "MessageLog", length: int) -> None:
+        self._log = log
+        self._length = length
+
+    def _resolve(self) -> tuple["MessageLog", int]:
+        return self._log, self._length
+
+    def __repr__(self) -> str:
+        return f"MessageLogView(len={self._length})"
+
+
+class MessageLog(_MessageSequence):
+    """Columnas append-only con los mensajes de una conversación."""
+
+    __slots__ = (
+        "_authors",
+        "_author_index",
+        "_author_ids",
+        "_contents",
+        "_turns",
+        "_displayed",
+        "_ts_base",
+        "_ts_offsets",
+        "_ts_other",
+        "_tokens",
+        "_tokenizer",
+        "_archived",
+        "_archive_loader",
+        "_archive_page",
+        "_lock",
+    )
+
+    def __init__(self) -> None:
+        self._authors: list[str] = []
+        self._author_index: dict[str, int] = {}
+        self._author_ids = array("H")
+        self._contents: list[str] = []
+        self._turns = array("l")
+        self._displayed = bytearray()
+        self._ts_base: datetime | None = None
+        self._ts_offsets = array("q")
+        self._ts_other: dict[int, Any] = {}
+        self._tokens = array("l")
+        self._tokenizer: str | None = None
+        # Mensajes más antiguos que la cola cargada, aún sin leer de persistencia.
+        self._archived = 0
+        self._archive_loader: ArchiveLoader | None = None
+        self._archive_page = 1
+        self._lock = threading.RLock()
+
+    @classmethod
+    def from_records(cls, records: Sequence[Any]) -> "MessageLog":
+        """Construye el log desde mensajes en forma de dict (persistencia, tests); ignora no-Mappings."""
+        log = cls()
+        for record in records:
+            if isinstance(record, Mapping):
+                log.append(record)
+        return log
+
+    @classmethod
+    def with_archive(
+        cls,
+        tail: Sequence[Any],
+        archived: int,
+        loader: ArchiveLoader,
+        page_size: int = 100,
+    ) -> "MessageLog":
+        """Log con los `archived` primeros mensajes sin cargar; `loader` los trae al indexarlos."""
+        log = cls.from_records(tail)
+        log._archived = max(0, int(archived))
+        log._archive_loader = loader if log._archived else None
+        log._archive_page = max(1, int(page_size))
+        return log
+
+    @property
+    def archived(self) -> int:
+        """Mensajes antiguos aún no cargados en memoria."""
+        return self._archived
+
+    def _resolve(self) -> tuple["MessageLog", int]:
+        with self._lock:
+            return self, self._archived + len(self._contents)
+
+    def __repr__(self) -> str:
+        return (
+            f"MessageLog(len={self._archived + len(self._contents)}, "
+            f"archived={self._archived}, authors={len(self._authors)})"
+        )
+
+    def _ensure_loaded(self, index: int) -> None:
+        """Carga desde persistencia el tramo archivado [inicio de página, primer cargado).
+
+        La lectura de persistencia va fuera del lock; las columnas nuevas se construyen y se
+        sustituyen, junto con _archived, bajo el lock, para no perder mensajes añadidos a la
+        vez ni resolver vistas contra un desplazamiento viejo.
+        """
+        while True:
+            with self._lock:
+                archived = self._archived
+                loader = self._archive_loader
+            if index >= archived:
+                return
+            assert loader is not None
+            start = max(0, min(index, archived - self._archive_page))
+            records = [r for r in loader(start, archived) if isinstance(r, Mapping)]
+            if len(records) != archived - start:
+                raise RuntimeError(
+                    f"Archived messages changed: expected {archived - start}, got {len(records)}"
+                )
+            with self._lock:
+                if self._archived != archived:
+                    continue  # otro hilo ha cargado antes este tramo
+                current = (dict(MessageView(self, archived + i)) for i in range(len(self._contents)))
+                loaded = MessageLog.from_records([*records, *current])
+                tokens = array("l", [-1]) * len(records)
+                tokens.extend(self._tokens)
+                for slot in (
+                    "_authors",
+                    "_author_index",
+                    "_author_ids",
+                    "_contents",
+                    "_turns",
+                    "_displayed",
+                    "_ts_base",
+                    "_ts_offsets",
+                    "_ts_other",
+                ):
+                    setattr(self, slot, getattr(loaded, slot))
+                self._tokens = tokens
+                self._archived = start
+                if not start:
+                    self._archive_loader = None
+                return
+
+    def add(
+        self,
+        author: str,
+        content: str,
+        timestamp: Any = None,
+        turn: int = 0,
+        displayed: bool = False,
+    ) -> None:
+        author = str(author or "")
+        with self._lock:
+            author_id = self._author_index.get(author)
+            if author_id is None:
+                author_id = len(self._authors)
+                self._authors.append(sys.intern(author))
+                self._author_index[author] = author_id
+            self._author_ids.append(author_id)
+            self._contents.append(str(content or ""))
+            self._turns.append(int(turn or 0))
+            self._displayed.append(1 if displayed else 0)
+            self._ts_offsets.append(self._encode_timestamp(len(self._contents) - 1, timestamp))
+            self._tokens.append(-1)
+
+    def append(self, message: Mapping) -> None:
+        """Compatibilidad con el uso como lista de dicts Message."""
+        self.add(
+            author=message.get("author", ""),
+            content=message.get("content", ""),
+            timestamp=message.get("timestamp"),
+            turn=message.get("turn", 0),
+            displayed=bool(message.get("displayed", False)),
+        )
+
+    def snapshot(self) -> MessageLogView:
+        """Vista estable de los mensajes actuales (O(1), sin copia)."""
+        with self._lock:
+            return MessageLogView(self, self._archived + len(self._contents))
+
+    def _encode_timestamp(self, index: int, timestamp: Any) -> int:
+        if isinstance(timestamp, datetime):
+            if self._ts_base is None:
+                self._ts_base = timestamp
+            try:
+                return (timestamp - self._ts_base) // timedelta(microseconds=1)
+            except TypeError:
+                pass  # naive/aware mezclados: se guarda tal cual
+        self._ts_other[index] = timestamp
+        return _OTHER_TS
+
+    def _timestamp(self, index: int) -> Any:
+        offset = self._ts_offsets[index]
+        if offset == _OTHER_TS:
+            return self._ts_other.get(index)
+        assert self._ts_base is not None
+        return self._ts_base + timedelta(microseconds=offset)
+
+    def _cached_tokens(self, index: int, tokenizer: str) -> int | None:
+        with self._lock:
+            if tokenizer != self._tokenizer:
+                return None
+            tokens = self._tokens[index - self._archived]
+        return tokens if tokens >= 0 else None
+
+    def _cache_tokens(self, index: int, tokenizer: str, tokens: int) -> None:
+        with self._lock:
+            if tokenizer != self._tokenizer:
+                self._tokens = array("l", [-1]) * len(self._contents)
+                self._tokenizer = tokenizer
+            self._tokens[index - self._archived] = tokens
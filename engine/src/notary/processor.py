@@ -9,6 +9,7 @@ from abc import ABC, abstractmethod
 from typing import Any
 
 from ..agents.deepseek_adapter import send_message
+from ..context_window import pack_messages
 
 logger = logging.getLogger(__name__)
 
@@ -117,6 +118,10 @@ class LLMNotaryProcessor(NotaryProcessor):
             self._max_output_tokens = int(os.getenv("NOTARY_MAX_OUTPUT_TOKENS", "420"))
         except ValueError:
             self._max_output_tokens = 420
+        try:
+            self._context_tokens = int(os.getenv("NOTARY_CONTEXT_TOKENS", "0"))
+        except ValueError:
+            self._context_tokens = 0
 
     def _build_system_prompt(self) -> str:
         return """Eres el Notario de una escena narrativa conversacional.
@@ -285,6 +290,8 @@ Devuelve SOLO el JSON."""
         recent_messages: list[dict[str, Any]],
         player_mission: str = "",
     ) -> dict[str, Any]:
+        if self._context_tokens > 0:
+            recent_messages = pack_messages(list(recent_messages), self._context_tokens)
         llm_messages = [
             {"role": "system", "content": self._build_system_prompt()},
             {
@@ -300,6 +307,7 @@ Devuelve SOLO el JSON."""
             content = send_message(
                 llm_messages,
                 model=self._model,
+                role="notary",
                 temperature=self._temperature,
                 stream=False,
                 max_tokens=self._max_output_tokens,
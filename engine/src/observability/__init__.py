@@ -2,6 +2,7 @@
 
 from .runtime import (
     GenerationHandle,
+    current_user_id,
     end_generation,
     emit_event,
     flush_observability,
@@ -14,6 +15,7 @@ from .runtime import (
 
 __all__ = [
     "GenerationHandle",
+    "current_user_id",
     "trace_interaction",
     "trace_setup",
     "span_agent",
@@ -77,6 +77,13 @@ def _base_event(event_type: str, metadata: dict[str, Any] | None = None) -> dict
     }
 
 
+def current_user_id() -> str:
+    """user_id de la traza/span activos ("" fuera de una interacción)."""
+    trace = _current_trace.get() or {}
+    meta = _current_observation_metadata.get() or {}
+    return str(trace.get("user_id") or meta.get("user_id") or "")
+
+
 def flush_observability() -> None:
     flush_telemetry()
 
@@ -124,6 +131,7 @@ def end_generation(
     cost_details: dict[str, float] | None = None,
     level: str | None = None,
     status_message: str | None = None,
+    extra_fields: dict[str, Any] | None = None,
 ) -> None:
     if generation is None:
         return
@@ -156,6 +164,8 @@ def end_generation(
             "output_chars": len(str(output)) if output is not None else 0,
         }
     )
+    if extra_fields:
+        event.update(extra_fields)
     emit_telemetry_event(event)
 
 
@@ -0,0 +1,205 @@
+"""Hash y verificación de passwords fuera del hilo de la request.
+
+bcrypt_sha256 es deliberadamente caro en CPU; ejecutado en el threadpool de la API compite
+con los turnos y una ráfaga de logins lo agota. Aquí cada operación va a un pool acotado y,
+si ya hay AUTH_HASH_MAX_PENDING operaciones en curso o en cola, se rechaza al momento con
+PasswordHashingOverloadedError (la API responde 503) en lugar de encolar sin límite.
+Si el pool no responde en AUTH_HASH_TIMEOUT_SECONDS o un proceso muere se lanza
+PasswordHashingUnavailableError (también 503): nunca un 401 para un password correcto.
+
+AUTH_HASH_POOL:
+- process (por defecto): ProcessPoolExecutor (spawn) de AUTH_HASH_WORKERS procesos; no
+  comparte GIL con la API.
+- thread: ThreadPoolExecutor acotado (útil donde no se pueden crear procesos).
+- inline: en el hilo llamante, sin pool (tests, scripts).
+
+Cada operación emite el evento `password_hash` con operation, duration_ms, pending y status
+(ok, error, overloaded, timeout o broken).
+Este módulo solo importa passlib al cargarse: es lo que importan los procesos del pool.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from concurrent.futures.thread import BrokenThreadPool
+from typing import Any, Callable
+
+from passlib.context import CryptContext
+
+_PWD_CONTEXT = CryptContext(schemes=["bcrypt_sha256"], deprecated="auto")
+_logger = logging.getLogger(__name__)
+
+
+class PasswordHashingOverloadedError(RuntimeError):
+    """Demasiadas operaciones de hash en curso; reintentar más tarde."""
+
+
+class PasswordHashingUnavailableError(PasswordHashingOverloadedError):
+    """El pool no respondió a tiempo o se rompió; reintentar más tarde (503, no 401)."""
+
+
+def hash_password_inline(password: str) -> str:
+    return _PWD_CONTEXT.hash(password or "")
+
+
+def verify_password_inline(password: str, password_hash: str) -> bool:
+    return _PWD_CONTEXT.verify(password or "", password_hash)
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+class PasswordHashingPool:
+    """Pool acotado con control de profundidad de cola (operaciones en curso + en espera)."""
+
+    def __init__(
+        self,
+        mode: str | None = None,
+        workers: int | None = None,
+        max_pending: int | None = None,
+        timeout_seconds: float | None = None,
+    ) -> None:
+        resolved = (mode or os.getenv("AUTH_HASH_POOL", "process")).strip().lower()
+        self.mode = resolved if resolved in ("process", "thread", "inline") else "process"
+        self._workers = workers or _int_env("AUTH_HASH_WORKERS", 2)
+        self._max_pending = max_pending or _int_env("AUTH_HASH_MAX_PENDING", 16)
+        self._timeout = timeout_seconds or _float_env("AUTH_HASH_TIMEOUT_SECONDS", 10.0)
+        self._executor: Executor | None = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self._workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self._workers,
+                        thread_name_prefix="password-hash",
+                    )
+            return self._executor
+
+    def run(self, operation: str, fn: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta fn(*args) en el pool; PasswordHashingOverloadedError si la cola está llena."""
+        with self._lock:
+            if self._pending >= self._max_pending:
+                pending = self._pending
+                overloaded = True
+            else:
+                self._pending += 1
+                pending = self._pending
+                overloaded = False
+        if overloaded:
+            _emit_metric(operation, 0.0, pending, "overloaded")
+            raise PasswordHashingOverloadedError("Password hashing pool is saturated")
+        t0 = time.perf_counter()
+        status = "error"
+        future: Future | None = None
+        try:
+            if self.mode == "inline":
+                result = fn(*args)
+            else:
+                executor = self._get_executor()
+                try:
+                    future = executor.submit(fn, *args)
+                    result = future.result(timeout=self._timeout)
+                except FuturesTimeoutError:
+                    status = "timeout"
+                    raise PasswordHashingUnavailableError("Password hashing timed out") from None
+                except (BrokenProcessPool, BrokenThreadPool) as exc:
+                    status = "broken"
+                    self._discard_executor(executor)
+                    raise PasswordHashingUnavailableError("Password hashing pool is broken") from exc
+            status = "ok"
+            return result
+        finally:
+            # Una operación que venció el timeout sigue ocupando un worker: cuenta como
+            # pendiente hasta que termina de verdad (o se cancela si aún no había empezado).
+            if status == "timeout" and future is not None and not future.cancel():
+                future.add_done_callback(lambda _f: self._release())
+            else:
+                self._release()
+            _emit_metric(operation, (time.perf_counter() - t0) * 1000, pending, status)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _discard_executor(self, executor: Executor) -> None:
+        """Un pool roto no acepta más trabajo: se descarta para que el siguiente run cree otro."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        try:
+            executor.shutdown(wait=False, cancel_futures=True)
+        except Exception:
+            _logger.debug("Error cerrando pool de hashing roto", exc_info=True)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _emit_metric(operation: str, duration_ms: float, pending: int, status: str) -> None:
+    try:
+        from .observability import emit_event
+
+        emit_event(
+            "password_hash",
+            {
+                "operation": operation,
+                "duration_ms": int(duration_ms),
+                "pending": pending,
+                "status": status,
+            },
+        )
+    except Exception:
+        _logger.debug("No se pudo emitir métrica password_hash", exc_info=True)
+
+
+_pool: PasswordHashingPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_password_hashing_pool() -> PasswordHashingPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordHashingPool()
+        return _pool
+
+
+def shutdown_password_hashing_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
@@ -2,19 +2,48 @@
 
 from __future__ import annotations
 
+import hashlib
 import importlib
 import json
+import logging
 import os
 import uuid
 from contextlib import contextmanager
-from datetime import datetime, timezone
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 from ..core.game_setup_contract import validate_game_setup
+from .game_cursor import GAME_LIST_MAX_LIMIT, decode_game_cursor, encode_game_cursor
 from .provider import PersistenceProvider
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
+# Longitud de games.last_message_preview (VARCHAR(160) en la migración 009).
+GAME_PREVIEW_CHARS = 160
+# Clave de pg_advisory_xact_lock que serializa a quien aplica migraciones ("agor").
+MIGRATION_LOCK_KEY = 0x61676F72
+_logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: str
+    checksum: str
+    sql: str
+
+
+@lru_cache(maxsize=4)
+def load_migration_manifest(migrations_dir: Path) -> tuple[Migration, ...]:
+    """Migraciones ordenadas con su sha256; se leen del disco una vez por proceso."""
+    if not migrations_dir.exists():
+        return ()
+    manifest = []
+    for path in sorted(p for p in migrations_dir.glob("*.sql") if p.is_file()):
+        sql = path.read_text(encoding="utf-8")
+        manifest.append(Migration(path.name, hashlib.sha256(sql.encode("utf-8")).hexdigest(), sql))
+    return tuple(manifest)
 
 
 def _utc_now() -> datetime:
@@ -24,7 +53,13 @@ def _utc_now() -> datetime:
 class DatabasePersistenceProvider(PersistenceProvider):
     """Persistencia transaccional en PostgreSQL."""
 
-    def __init__(self, dsn: str | None = None, run_migrations: bool = True, ensure_user: bool = True) -> None:
+    def __init__(
+        self,
+        dsn: str | None = None,
+        run_migrations: bool = True,
+        ensure_user: bool = True,
+        bootstrap_templates: bool = True,
+    ) -> None:
         self._dsn = (dsn or os.getenv("DATABASE_URL", "")).strip()
         if not self._dsn:
             raise RuntimeError("DATABASE_URL no configurada para persistencia en PostgreSQL")
@@ -38,7 +73,8 @@ class DatabasePersistenceProvider(PersistenceProvider):
             self.apply_migrations()
         if ensure_user:
             self.ensure_default_user()
-        self.bootstrap_standard_templates_from_files()
+        if bootstrap_templates:
+            self.bootstrap_standard_templates_from_files()
 
     @contextmanager
     def _connection(self):
@@ -69,15 +105,51 @@ class DatabasePersistenceProvider(PersistenceProvider):
                 chunks.append(statement)
         return chunks
 
+    def _applied_migrations(self) -> dict[str, str | None] | None:
+        """version -> checksum ya aplicados, en una sola consulta; None si la tabla es antigua o no existe."""
+        try:
+            with self._connection() as conn:
+                with conn.cursor() as cur:
+                    cur.execute("SELECT version, checksum FROM schema_migrations")
+                    return {str(row[0]): row[1] for row in cur.fetchall()}
+        except Exception as exc:
+            sqlstate = getattr(exc, "sqlstate", None) or getattr(exc, "pgcode", None)
+            # 42P01: tabla inexistente; 42703: schema_migrations sin columna checksum.
+            if sqlstate in ("42P01", "42703"):
+                return None
+            raise
+
+    @staticmethod
+    def _report_drift(manifest: tuple[Migration, ...], applied: dict[str, str | None]) -> None:
+        for migration in manifest:
+            checksum = applied.get(migration.version)
+            if checksum and checksum != migration.checksum:
+                _logger.warning(
+                    "Migración %s modificada tras aplicarse (checksum %s != %s)",
+                    migration.version,
+                    checksum[:12],
+                    migration.checksum[:12],
+                )
+
     def apply_migrations(self) -> None:
-        migrations_dir = PROJECT_ROOT / "migrations"
-        if not migrations_dir.exists():
-            return
-        migration_files = sorted(p for p in migrations_dir.glob("*.sql") if p.is_file())
-        if not migration_files:
+        """Aplica migraciones pendientes.
+
+        Camino rápido: una consulta a schema_migrations comparada con el manifiesto en
+        memoria; si no hay nada pendiente no se toma ningún lock. Solo si falta algo (o hay
+        checksums sin registrar) se abre la transacción DDL bajo pg_advisory_xact_lock, de
+        modo que varios workers arrancando a la vez no se serializan en el caso normal.
+        """
+        manifest = load_migration_manifest(PROJECT_ROOT / "migrations")
+        if not manifest:
             return
+        applied = self._applied_migrations()
+        if applied is not None:
+            self._report_drift(manifest, applied)
+            if all(applied.get(m.version) for m in manifest):
+                return
         with self._connection() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
                 cur.execute(
                     """
                     CREATE TABLE IF NOT EXISTS schema_migrations (
@@ -86,17 +158,23 @@ class DatabasePersistenceProvider(PersistenceProvider):
                     );
                     """
                 )
-                for migration in migration_files:
-                    version = migration.name
-                    cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (version,))
-                    if cur.fetchone():
+                cur.execute("ALTER TABLE schema_migrations ADD COLUMN IF NOT EXISTS checksum VARCHAR(64)")
+                # Releer bajo el lock: otro worker puede haber aplicado lo pendiente.
+                cur.execute("SELECT version, checksum FROM schema_migrations")
+                applied = {str(row[0]): row[1] for row in cur.fetchall()}
+                for migration in manifest:
+                    if migration.version in applied:
+                        if not applied[migration.version]:
+                            cur.execute(
+                                "UPDATE schema_migrations SET checksum = %s WHERE version = %s",
+                                (migration.checksum, migration.version),
+                            )
                         continue
-                    sql_script = migration.read_text(encoding="utf-8")
-                    for statement in self._split_sql_script(sql_script):
+                    for statement in self._split_sql_script(migration.sql):
                         cur.execute(statement)
                     cur.execute(
-                        "INSERT INTO schema_migrations (version, applied_at) VALUES (%s, %s)",
-                        (version, _utc_now()),
+                        "INSERT INTO schema_migrations (version, applied_at, checksum) VALUES (%s, %s, %s)",
+                        (migration.version, _utc_now(), migration.checksum),
                     )
 
     def _get_user_id(self, cur, username: str) -> str:
@@ -297,7 +375,7 @@ class DatabasePersistenceProvider(PersistenceProvider):
                 if not cur.fetchone():
                     raise KeyError(f"Game not found: {game_id}")
                 now = _utc_now()
-                for msg in new_messages:
+                for position, msg in enumerate(new_messages):
                     turn_number = int(msg.get("turn", 0))
                     if turn_number < 0:
                         raise ValueError("turn_number debe ser >= 0")
@@ -321,7 +399,8 @@ class DatabasePersistenceProvider(PersistenceProvider):
                             str(msg.get("role") or "actor"),
                             str(msg.get("content", "")),
                             json.dumps(metadata_json, ensure_ascii=False),
-                            now,
+                            # created_at distinto por mensaje: el orden (turno, fecha) es total y paginable.
+                            now + timedelta(microseconds=position),
                         ),
                     )
                 cur.execute(
@@ -357,7 +436,20 @@ class DatabasePersistenceProvider(PersistenceProvider):
                             None,
                         ),
                     )
-                cur.execute("UPDATE games SET updated_at = %s WHERE id = %s", (now, game_id))
+                # Resumen del listado mantenido al escribir (no se calcula por request).
+                try:
+                    turn_count = max(0, int(state_json.get("turn") or 0))
+                except (TypeError, ValueError):
+                    turn_count = 0
+                preview = str(new_messages[-1].get("content", ""))[:GAME_PREVIEW_CHARS] if new_messages else None
+                cur.execute(
+                    """
+                    UPDATE games
+                    SET updated_at = %s, turn_count = %s, last_message_preview = COALESCE(%s, last_message_preview)
+                    WHERE id = %s
+                    """,
+                    (now, turn_count, preview, game_id),
+                )
 
     def enqueue_domain_event(
         self,
@@ -555,6 +647,32 @@ class DatabasePersistenceProvider(PersistenceProvider):
                     ),
                 )
 
+    def get_scene_snapshot(self, game_id: str) -> dict[str, Any] | None:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT s.version_turn, n.based_on_message_count, s.summary_text, s.facts_json,
+                           s.mission_progress_json, s.open_threads_json, s.updated_at
+                    FROM scene_snapshots s
+                    JOIN notary_entries n ON n.id = s.source_notary_entry_id
+                    WHERE s.game_id = %s
+                    """,
+                    (game_id,),
+                )
+                row = cur.fetchone()
+                if not row:
+                    return None
+                return {
+                    "version_turn": int(row[0]),
+                    "based_on_message_count": int(row[1]),
+                    "summary_text": row[2] or "",
+                    "facts_json": row[3] if isinstance(row[3], list) else [],
+                    "mission_progress_json": row[4] if isinstance(row[4], dict) else {},
+                    "open_threads_json": row[5] if isinstance(row[5], list) else [],
+                    "updated_at": row[6].isoformat() if hasattr(row[6], "isoformat") else row[6],
+                }
+
     def get_game(self, game_id: str) -> dict[str, Any]:
         with self._connection() as conn:
             with conn.cursor() as cur:
@@ -588,18 +706,37 @@ class DatabasePersistenceProvider(PersistenceProvider):
                     "state_json": row[11] or {},
                 }
 
+    def get_game_owner(self, game_id: str) -> dict[str, Any]:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT g.user_id::text, u.username
+                    FROM games g
+                    JOIN users u ON u.id = g.user_id
+                    WHERE g.id = %s
+                    """,
+                    (game_id,),
+                )
+                row = cur.fetchone()
+                if not row:
+                    raise KeyError(f"Game not found: {game_id}")
+                return {"user_id": row[0], "user": row[1]}
+
     def get_game_messages(self, game_id: str) -> list[dict[str, Any]]:
         with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("SELECT 1 FROM games WHERE id = %s", (game_id,))
                 if not cur.fetchone():
                     raise KeyError(f"Game not found: {game_id}")
+                # Filas legacy de un mismo lote comparten created_at: el timestamp del mensaje
+                # conserva su orden; el id (uuid4) solo desempata lo que quede.
                 cur.execute(
                     """
                     SELECT id::text, game_id::text, turn_number, author, role, content, metadata_json, created_at
                     FROM messages
                     WHERE game_id = %s
-                    ORDER BY turn_number ASC, created_at ASC
+                    ORDER BY turn_number ASC, created_at ASC, metadata_json->>'timestamp' ASC NULLS LAST, id ASC
                     """,
                     (game_id,),
                 )
@@ -632,10 +769,10 @@ class DatabasePersistenceProvider(PersistenceProvider):
                         SELECT id::text, game_id::text, turn_number, author, role, content, metadata_json, created_at
                         FROM messages
                         WHERE game_id = %s
-                        ORDER BY created_at DESC, id DESC
+                        ORDER BY created_at DESC, metadata_json->>'timestamp' DESC NULLS FIRST, id DESC
                         LIMIT %s
                     ) recent
-                    ORDER BY created_at ASC, id ASC
+                    ORDER BY created_at ASC, metadata_json->>'timestamp' ASC NULLS LAST, id ASC
                     """,
                     (game_id, safe_limit),
                 )
@@ -654,34 +791,189 @@ class DatabasePersistenceProvider(PersistenceProvider):
                     for r in rows
                 ]
 
-    def list_games_for_user(self, username: str) -> list[dict[str, Any]]:
+    def get_session_snapshot(self, game_id: str, tail_messages: int) -> dict[str, Any]:
+        """Partida + cola de mensajes en una consulta.
+
+        El total de mensajes sale de state_json.message_count (lo mantiene el engine al
+        persistir); solo las partidas antiguas sin ese campo pagan el COUNT.
+        """
+        tail = max(0, min(int(tail_messages), 500))
         with self._connection() as conn:
             with conn.cursor() as cur:
                 cur.execute(
                     """
-                    SELECT g.id::text, g.title, g.status, g.game_mode, g.standard_template_id, g.template_version, g.created_at, g.updated_at
+                    SELECT g.id::text, g.user_id::text, u.username, g.title, g.status, g.created_at, g.updated_at,
+                           g.game_mode, g.standard_template_id, g.template_version, gc.config_json, gs.state_json,
+                           COALESCE(
+                               (gs.state_json->>'message_count')::int,
+                               (SELECT COUNT(*) FROM messages m WHERE m.game_id = g.id)::int
+                           ),
+                           COALESCE(
+                               (
+                                   SELECT json_agg(
+                                       json_build_array(
+                                           t.id, t.turn_number, t.author, t.role, t.content, t.metadata_json, t.created_at
+                                       )
+                                       ORDER BY t.turn_number, t.created_at,
+                                                t.metadata_json->>'timestamp' ASC NULLS LAST, t.id
+                                   )
+                                   FROM (
+                                       SELECT id::text AS id, turn_number, author, role, content, metadata_json, created_at
+                                       FROM messages
+                                       WHERE game_id = g.id
+                                       ORDER BY turn_number DESC, created_at DESC,
+                                                metadata_json->>'timestamp' DESC NULLS FIRST, id DESC
+                                       LIMIT %s
+                                   ) t
+                               ),
+                               '[]'::json
+                           )
                     FROM games g
                     JOIN users u ON u.id = g.user_id
-                    WHERE u.username = %s
-                    ORDER BY g.updated_at DESC
+                    JOIN game_configs gc ON gc.game_id = g.id
+                    JOIN game_states gs ON gs.game_id = g.id
+                    WHERE g.id = %s
                     """,
-                    (username,),
+                    (tail, game_id),
+                )
+                row = cur.fetchone()
+                if not row:
+                    raise KeyError(f"Game not found: {game_id}")
+                game = {
+                    "id": row[0],
+                    "user_id": row[1],
+                    "user": row[2],
+                    "title": row[3],
+                    "status": row[4],
+                    "created_at": row[5].isoformat() if row[5] else None,
+                    "updated_at": row[6].isoformat() if row[6] else None,
+                    "game_mode": row[7] or "custom",
+                    "standard_template_id": row[8],
+                    "template_version": row[9],
+                    "config_json": row[10] or {},
+                    "state_json": row[11] or {},
+                }
+                messages = [
+                    {
+                        "id": m[0],
+                        "game_id": row[0],
+                        "turn_number": m[1],
+                        "author": m[2],
+                        "role": m[3],
+                        "content": m[4],
+                        "metadata_json": m[5] or {},
+                        "created_at": m[6],
+                    }
+                    for m in (row[13] or [])
+                ]
+                return {"game": game, "message_count": max(int(row[12] or 0), len(messages)), "messages": messages}
+
+    def get_game_messages_range(self, game_id: str, start: int, end: int) -> list[dict[str, Any]]:
+        safe_start = max(0, int(start))
+        limit = max(0, int(end) - safe_start)
+        if not limit:
+            return []
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT id::text, game_id::text, turn_number, author, role, content, metadata_json, created_at
+                    FROM messages
+                    WHERE game_id = %s
+                    ORDER BY turn_number ASC, created_at ASC, metadata_json->>'timestamp' ASC NULLS LAST, id ASC
+                    OFFSET %s
+                    LIMIT %s
+                    """,
+                    (game_id, safe_start, limit),
                 )
                 rows = cur.fetchall()
                 return [
                     {
                         "id": r[0],
-                        "title": r[1],
-                        "status": r[2],
-                        "game_mode": r[3] or "custom",
-                        "standard_template_id": r[4],
-                        "template_version": r[5],
-                        "created_at": r[6].isoformat() if r[6] else None,
-                        "updated_at": r[7].isoformat() if r[7] else None,
+                        "game_id": r[1],
+                        "turn_number": r[2],
+                        "author": r[3],
+                        "role": r[4],
+                        "content": r[5],
+                        "metadata_json": r[6] or {},
+                        "created_at": r[7].isoformat() if r[7] else None,
                     }
                     for r in rows
                 ]
 
+    def list_games_for_user(self, username: str) -> list[dict[str, Any]]:
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT g.id::text, g.title, g.status, g.game_mode, g.standard_template_id, g.template_version,
+                           g.created_at, g.updated_at, g.turn_count, g.last_message_preview
+                    FROM games g
+                    JOIN users u ON u.id = g.user_id
+                    WHERE u.username = %s
+                    ORDER BY g.updated_at DESC, g.id DESC
+                    """,
+                    (username,),
+                )
+                return [self._game_list_item(r) for r in cur.fetchall()]
+
+    @staticmethod
+    def _game_list_item(r: Any) -> dict[str, Any]:
+        return {
+            "id": r[0],
+            "title": r[1],
+            "status": r[2],
+            "game_mode": r[3] or "custom",
+            "standard_template_id": r[4],
+            "template_version": r[5],
+            "created_at": r[6].isoformat() if r[6] else None,
+            "updated_at": r[7].isoformat() if r[7] else None,
+            "turn_count": r[8],
+            "last_message_preview": r[9],
+        }
+
+    def list_games_page(
+        self,
+        username: str,
+        user_id: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Keyset sobre idx_games_user_updated_id: index-only scan, sin OFFSET ni JOIN a users."""
+        safe_limit = max(1, min(int(limit), GAME_LIST_MAX_LIMIT))
+        after = decode_game_cursor(cursor) if cursor else None
+        if after is not None:
+            try:
+                uuid.UUID(after[1])
+            except ValueError as exc:
+                raise ValueError("Invalid game list cursor") from exc
+        if user_id:
+            owner_clause, params = "g.user_id = %s", [user_id]
+        else:
+            owner_clause, params = "g.user_id = (SELECT id FROM users WHERE username = %s)", [username]
+        keyset_clause = ""
+        if after is not None:
+            keyset_clause = "AND (g.updated_at, g.id) < (%s, %s::uuid)"
+            params.extend(after)
+        params.append(safe_limit + 1)
+        with self._connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(
+                    f"""
+                    SELECT g.id::text, g.title, g.status, g.game_mode, g.standard_template_id, g.template_version,
+                           g.created_at, g.updated_at, g.turn_count, g.last_message_preview
+                    FROM games g
+                    WHERE {owner_clause} {keyset_clause}
+                    ORDER BY g.updated_at DESC, g.id DESC
+                    LIMIT %s
+                    """,
+                    params,
+                )
+                rows = cur.fetchall()
+        page = rows[:safe_limit]
+        next_cursor = encode_game_cursor(page[-1][7], page[-1][0]) if len(rows) > safe_limit else None
+        return {"games": [self._game_list_item(r) for r in page], "next_cursor": next_cursor}
+
     def create_feedback(self, game_id: str, user_id: str, feedback_text: str) -> str:
         text = str(feedback_text or "").strip()
         if not text:
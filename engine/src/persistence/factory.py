@@ -2,9 +2,25 @@
 
 from __future__ import annotations
 
+import os
+
 from .db_provider import DatabasePersistenceProvider
 from .provider import PersistenceProvider
 
 
-def create_persistence_provider() -> PersistenceProvider:
-    return DatabasePersistenceProvider()
+def storage_bootstrap_enabled() -> bool:
+    """DB_BOOTSTRAP_ON_START: migraciones, usuario por defecto y plantillas al arrancar.
+
+    Desactivar cuando el esquema se prepara aparte con INTERFACE_MODE=migrate.
+    """
+    raw = os.getenv("DB_BOOTSTRAP_ON_START", "true").strip().lower()
+    return raw in ("1", "true", "yes", "on")
+
+
+def create_persistence_provider(bootstrap: bool | None = None) -> PersistenceProvider:
+    """Provider PostgreSQL; con bootstrap=False solo conecta (workers, arranques en caliente)."""
+    if bootstrap is None:
+        bootstrap = storage_bootstrap_enabled()
+    if bootstrap:
+        return DatabasePersistenceProvider()
+    return DatabasePersistenceProvider(run_migrations=False, ensure_user=False, bootstrap_templates=False)
@@ -0,0 +1,47 @@
+"""Cursor opaco para paginar el listado de partidas por (updated_at, id) descendente."""
+
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime, timezone
+from typing import Any
+
+GAME_LIST_MAX_LIMIT = 200
+
+
+def encode_game_cursor(updated_at: Any, game_id: str) -> str:
+    """Cursor que apunta justo después de la partida indicada (última de la página)."""
+    stamp = updated_at.isoformat() if isinstance(updated_at, datetime) else str(updated_at or "")
+    raw = json.dumps([stamp, str(game_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_game_cursor(cursor: str) -> tuple[datetime, str]:
+    """(updated_at, game_id) del cursor. ValueError si no es un cursor válido."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        stamp, game_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        updated_at = datetime.fromisoformat(str(stamp).replace("Z", "+00:00"))
+    except Exception as exc:
+        raise ValueError("Invalid game list cursor") from exc
+    if not game_id:
+        raise ValueError("Invalid game list cursor")
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at, str(game_id)
+
+
+def game_sort_key(game: dict[str, Any]) -> tuple[datetime, str]:
+    """Clave (updated_at, id) de una partida del listado, para providers sin keyset en SQL."""
+    value = game.get("updated_at")
+    if isinstance(value, datetime):
+        updated_at = value
+    else:
+        try:
+            updated_at = datetime.fromisoformat(str(value or "").replace("Z", "+00:00"))
+        except ValueError:
+            updated_at = datetime.min
+    if updated_at.tzinfo is None:
+        updated_at = updated_at.replace(tzinfo=timezone.utc)
+    return updated_at, str(game.get("id") or "")
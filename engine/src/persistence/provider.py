@@ -5,6 +5,8 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from typing import Any
 
+from .game_cursor import GAME_LIST_MAX_LIMIT, decode_game_cursor, encode_game_cursor, game_sort_key
+
 
 class PersistenceProvider(ABC):
     """Interfaz de almacenamiento desacoplada del engine."""
@@ -48,6 +50,31 @@ class PersistenceProvider(ABC):
     def list_games_for_user(self, username: str) -> list[dict[str, Any]]:
         """Lista partidas de un usuario."""
 
+    def list_games_page(
+        self,
+        username: str,
+        user_id: str | None = None,
+        limit: int = 50,
+        cursor: str | None = None,
+    ) -> dict[str, Any]:
+        """Página de partidas del usuario por (updated_at, id) desc: {games, next_cursor}.
+
+        `cursor` es el next_cursor de la página anterior (ValueError si no es válido). Los
+        providers productivos filtran por user_id con keyset en SQL; esta versión por defecto
+        pagina en memoria sobre list_games_for_user.
+        """
+        _ = user_id
+        safe_limit = max(1, min(int(limit), GAME_LIST_MAX_LIMIT))
+        games = sorted(self.list_games_for_user(username), key=game_sort_key, reverse=True)
+        if cursor:
+            after = decode_game_cursor(cursor)
+            games = [g for g in games if game_sort_key(g) < after]
+        page = games[:safe_limit]
+        next_cursor = None
+        if len(games) > safe_limit:
+            next_cursor = encode_game_cursor(page[-1].get("updated_at"), str(page[-1].get("id")))
+        return {"games": page, "next_cursor": next_cursor}
+
     @abstractmethod
     def create_feedback(self, game_id: str, user_id: str, feedback_text: str) -> str:
         """Guarda feedback libre asociado a partida y usuario. Devuelve feedback_id."""
@@ -91,6 +118,11 @@ class PersistenceProvider(ABC):
                 payload_json=dict(event.get("payload_json") or {}),
             )
 
+    def get_game_owner(self, game_id: str) -> dict[str, Any]:
+        """Dueño de la partida ({user_id, user}) sin cargar config ni estado. KeyError si no existe."""
+        game = self.get_game(game_id)
+        return {"user_id": game.get("user_id"), "user": game.get("user")}
+
     def get_recent_game_messages(self, game_id: str, limit: int) -> list[dict[str, Any]]:
         """Recupera una ventana reciente de mensajes ordenada por antigüedad."""
         safe_limit = max(1, int(limit))
@@ -99,6 +131,25 @@ class PersistenceProvider(ABC):
             return messages
         return messages[-safe_limit:]
 
+    def get_session_snapshot(self, game_id: str, tail_messages: int) -> dict[str, Any]:
+        """Lo necesario para rehidratar una sesión: {game, message_count, messages}.
+
+        `game` tiene la forma de get_game y `messages` son los últimos tail_messages mensajes
+        (orden cronológico). Los providers productivos lo resuelven en una sola consulta.
+        """
+        game = self.get_game(game_id)
+        messages = self.get_game_messages(game_id)
+        tail = max(0, int(tail_messages))
+        return {
+            "game": game,
+            "message_count": len(messages),
+            "messages": messages[len(messages) - tail :] if tail else [],
+        }
+
+    def get_game_messages_range(self, game_id: str, start: int, end: int) -> list[dict[str, Any]]:
+        """Mensajes en posiciones [start, end) del historial ordenado (paginado de antiguos)."""
+        return self.get_game_messages(game_id)[max(0, int(start)) : max(0, int(end))]
+
     def enqueue_domain_event(
         self,
         event_type: str,
@@ -148,6 +199,11 @@ class PersistenceProvider(ABC):
         """Actualiza el snapshot materializado más reciente de la escena."""
         raise NotImplementedError("This persistence provider does not support scene snapshots")
 
+    def get_scene_snapshot(self, game_id: str) -> dict[str, Any] | None:
+        """Lee el snapshot de escena más reciente (con based_on_message_count de su entrada)."""
+        _ = game_id
+        return None
+
     def get_runtime_setting(self, key: str) -> dict[str, Any] | None:
         """Lee una configuración runtime persistida."""
         _ = key
@@ -0,0 +1,360 @@
+"""Canal de eventos por partida para empujar el estado al cliente (SSE).
+
+Cada evento publicado recibe un id entero creciente por partida; los suscriptores pueden
+reanudar con Last-Event-ID y reciben primero lo que se perdieron (si sigue en el buffer
+de GAME_EVENTS_BUFFER eventos) y después los eventos en vivo. Sin Last-Event-ID solo se
+reciben eventos nuevos. Si lo perdido ya no está en el buffer se emite un evento
+`resync` para que el cliente recargue /game/status.
+
+subscribe_async es la variante para el endpoint SSE: espera en el event loop en vez de
+ocupar un hilo del threadpool por cada pestaña abierta.
+
+GAME_EVENTS_BACKEND:
+- local (por defecto): buffer y espera en memoria; solo sirve con un worker. Las partidas
+  sin actividad ni suscriptores durante GAME_EVENTS_TTL_SECONDS se descartan.
+- redis: id con INCR, buffer en una lista acotada y difusión con pub/sub, de modo que
+  un cliente conectado a cualquier worker recibe los eventos de la partida.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Iterator
+
+logger = logging.getLogger(__name__)
+
+# (event_id, evento) o None cuando vence el keepalive sin eventos nuevos.
+ChannelItem = tuple[int, dict[str, Any]] | None
+
+
+def _int_env(name: str, default: int) -> int:
+    try:
+        return max(1, int(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def _float_env(name: str, default: float) -> float:
+    try:
+        return max(0.1, float(os.getenv(name, "").strip() or default))
+    except ValueError:
+        return default
+
+
+def parse_last_event_id(value: Any) -> int | None:
+    """Last-Event-ID como entero; None si no viene o no es válido (suscripción desde ahora)."""
+    try:
+        return max(0, int(str(value).strip()))
+    except (TypeError, ValueError):
+        return None
+
+
+def _with_gap_check(cursor: int, items: list[tuple[int, dict[str, Any]]]) -> list[tuple[int, dict[str, Any]]]:
+    """Antepone un evento resync si entre el cursor y lo disponible faltan eventos."""
+    if items and items[0][0] > cursor + 1:
+        return [(items[0][0] - 1, {"type": "resync"})] + items
+    return items
+
+
+def _start_cursor(latest: int, last_event_id: int | None) -> int:
+    """Sin Last-Event-ID (o uno del futuro, p. ej. tras reiniciar) se empieza desde ahora."""
+    if last_event_id is None or last_event_id > latest:
+        return latest
+    return last_event_id
+
+
+class GameEventChannel:
+    """Contrato: publish devuelve el id asignado; subscribe/subscribe_async iteran sin fin
+    (None = keepalive)."""
+
+    def publish(self, game_id: str, event: dict[str, Any]) -> int:
+        raise NotImplementedError
+
+    def subscribe(
+        self,
+        game_id: str,
+        last_event_id: int | None = None,
+        keepalive_seconds: float | None = None,
+    ) -> Iterator[ChannelItem]:
+        raise NotImplementedError
+
+    def subscribe_async(
+        self,
+        game_id: str,
+        last_event_id: int | None = None,
+        keepalive_seconds: float | None = None,
+    ) -> AsyncIterator[ChannelItem]:
+        raise NotImplementedError
+
+
+class LocalGameEventChannel(GameEventChannel):
+    """Buffer circular por partida con espera por Condition (hilos) o asyncio.Event (un solo
+    proceso). publish despierta a los suscriptores async con call_soon_threadsafe."""
+
+    def __init__(self, buffer_size: int | None = None, ttl_seconds: int | None = None) -> None:
+        self._buffer_size = buffer_size or _int_env("GAME_EVENTS_BUFFER", 256)
+        self._keepalive = _float_env("GAME_EVENTS_KEEPALIVE_SECONDS", 15.0)
+        self._ttl_seconds = ttl_seconds or _int_env("GAME_EVENTS_TTL_SECONDS", 86400)
+        self._buffers: dict[str, deque[tuple[int, dict[str, Any]]]] = {}
+        self._last_ids: dict[str, int] = {}
+        self._touched: dict[str, float] = {}
+        self._subscribers: dict[str, int] = {}
+        self._waiters: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Event]]] = {}
+        self._next_sweep = time.monotonic() + min(self._ttl_seconds, 60)
+        self._cond = threading.Condition()
+
+    def publish(self, game_id: str, event: dict[str, Any]) -> int:
+        now = time.monotonic()
+        with self._cond:
+            event_id = self._last_ids.get(game_id, 0) + 1
+            self._last_ids[game_id] = event_id
+            buffer = self._buffers.setdefault(game_id, deque(maxlen=self._buffer_size))
+            buffer.append((event_id, dict(event)))
+            self._touched[game_id] = now
+            self._cond.notify_all()
+            waiters = list(self._waiters.get(game_id, ()))
+            if now >= self._next_sweep:
+                self._evict_idle(now)
+        for loop, ready in waiters:
+            try:
+                loop.call_soon_threadsafe(ready.set)
+            except RuntimeError:
+                pass  # event loop ya cerrado; el suscriptor desaparece con él
+        return event_id
+
+    def _evict_idle(self, now: float) -> None:
+        """Descarta buffer e id de partidas sin publicaciones ni suscriptores en el TTL."""
+        cutoff = now - self._ttl_seconds
+        for game_id in [g for g, ts in self._touched.items() if ts < cutoff]:
+            if self._subscribers.get(game_id):
+                continue
+            self._buffers.pop(game_id, None)
+            self._last_ids.pop(game_id, None)
+            self._touched.pop(game_id, None)
+        self._next_sweep = now + min(self._ttl_seconds, 60)
+
+    def _attach(self, game_id: str) -> None:
+        self._subscribers[game_id] = self._subscribers.get(game_id, 0) + 1
+
+    def _detach(self, game_id: str) -> None:
+        remaining = self._subscribers.get(game_id, 0) - 1
+        if remaining > 0:
+            self._subscribers[game_id] = remaining
+        else:
+            self._subscribers.pop(game_id, None)
+        # El TTL cuenta desde que se va el último suscriptor.
+        self._touched[game_id] = time.monotonic()
+
+    def _pending(self, game_id: str, cursor: int) -> list[tuple[int, dict[str, Any]]]:
+        return _with_gap_check(cursor, [item for item in self._buffers.get(game_id, ()) if item[0] > cursor])
+
+    def subscribe(
+        self,
+        game_id: str,
+        last_event_id: int | None = None,
+        keepalive_seconds: float | None = None,
+    ) -> Iterator[ChannelItem]:
+        keepalive = keepalive_seconds or self._keepalive
+        with self._cond:
+            self._attach(game_id)
+            cursor = _start_cursor(self._last_ids.get(game_id, 0), last_event_id)
+            pending = self._pending(game_id, cursor) if last_event_id is not None else []
+        try:
+            while True:
+                if not pending:
+                    with self._cond:
+                        self._cond.wait_for(lambda: self._last_ids.get(game_id, 0) > cursor, timeout=keepalive)
+                        pending = self._pending(game_id, cursor)
+                    if not pending:
+                        yield None
+                        continue
+                for item in pending:
+                    cursor = max(cursor, item[0])
+                    yield item
+                pending = []
+        finally:
+            with self._cond:
+                self._detach(game_id)
+
+    async def subscribe_async(
+        self,
+        game_id: str,
+        last_event_id: int | None = None,
+        keepalive_seconds: float | None = None,
+    ) -> AsyncIterator[ChannelItem]:
+        keepalive = keepalive_seconds or self._keepalive
+        ready = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), ready)
+        with self._cond:
+            self._attach(game_id)
+            self._waiters.setdefault(game_id, set()).add(waiter)
+            cursor = _start_cursor(self._last_ids.get(game_id, 0), last_event_id)
+            pending = self._pending(game_id, cursor) if last_event_id is not None else []
+        try:
+            while True:
+                if not pending:
+                    try:
+                        await asyncio.wait_for(ready.wait(), timeout=keepalive)
+                    except asyncio.TimeoutError:
+                        pass
+                    # Limpiar antes de leer: lo publicado después vuelve a marcar el evento.
+                    ready.clear()
+                    with self._cond:
+                        pending = self._pending(game_id, cursor)
+                    if not pending:
+                        yield None
+                        continue
+                for item in pending:
+                    cursor = max(cursor, item[0])
+                    yield item
+                pending = []
+        finally:
+            with self._cond:
+                waiters = self._waiters.get(game_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        self._waiters.pop(game_id, None)
+                self._detach(game_id)
+
+
+class RedisGameEventChannel(GameEventChannel):
+    """Ids con INCR, replay desde una lista acotada y difusión en vivo con pub/sub."""
+
+    def __init__(self, redis_url: str | None = None, buffer_size: int | None = None) -> None:
+        self._redis_url = (redis_url or os.getenv("REDIS_URL", "redis://localhost:6379/0")).strip()
+        try:
+            redis_module = importlib.import_module("redis")
+        except ModuleNotFoundError as exc:
+            raise RuntimeError("Falta dependencia 'redis' para GAME_EVENTS_BACKEND=redis") from exc
+        self._client = redis_module.Redis.from_url(self._redis_url, decode_responses=True)
+        self._async_client: Any = None
+        self._buffer_size = buffer_size or _int_env("GAME_EVENTS_BUFFER", 256)
+        self._keepalive = _float_env("GAME_EVENTS_KEEPALIVE_SECONDS", 15.0)
+        self._ttl_seconds = _int_env("GAME_EVENTS_TTL_SECONDS", 86400)
+
+    @staticmethod
+    def _keys(game_id: str) -> tuple[str, str, str]:
+        base = f"agora:game_events:{game_id}"
+        return f"{base}:seq", f"{base}:buffer", f"{base}:live"
+
+    def publish(self, game_id: str, event: dict[str, Any]) -> int:
+        seq_key, buffer_key, channel = self._keys(game_id)
+        event_id = int(self._client.incr(seq_key))
+        payload = json.dumps({"id": event_id, "event": event}, ensure_ascii=False, default=str)
+        pipe = self._client.pipeline()
+        pipe.rpush(buffer_key, payload)
+        pipe.ltrim(buffer_key, -self._buffer_size, -1)
+        pipe.expire(buffer_key, self._ttl_seconds)
+        pipe.expire(seq_key, self._ttl_seconds)
+        pipe.publish(channel, payload)
+        pipe.execute()
+        return event_id
+
+    def subscribe(
+        self,
+        game_id: str,
+        last_event_id: int | None = None,
+        keepalive_seconds: float | None = None,
+    ) -> Iterator[ChannelItem]:
+        keepalive = keepalive_seconds or self._keepalive
+        seq_key, buffer_key, channel = self._keys(game_id)
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        # Suscribirse antes de leer el buffer: lo publicado entre ambos pasos llega por
+        # pub/sub y se descarta por id si ya salió del replay.
+        pubsub.subscribe(channel)
+        try:
+            cursor = _start_cursor(int(self._client.get(seq_key) or 0), last_event_id)
+            if last_event_id is not None:
+                for item in self._replay(cursor, self._client.lrange(buffer_key, 0, -1)):
+                    cursor = max(cursor, item[0])
+                    yield item
+            while True:
+                deadline = time.monotonic() + keepalive
+                item = None
+                while item is None and time.monotonic() < deadline:
+                    message = pubsub.get_message(timeout=max(0.0, deadline - time.monotonic()))
+                    if message and message.get("type") == "message":
+                        decoded = self._decode(message.get("data"))
+                        if decoded is not None and decoded[0] > cursor:
+                            item = decoded
+                if item is None:
+                    yield None
+                    continue
+                cursor = item[0]
+                yield item
+        finally:
+            try:
+                pubsub.close()
+            except Exception:
+                logger.debug("Error cerrando pubsub de %s", channel, exc_info=True)
+
+    def _get_async_client(self) -> Any:
+        if self._async_client is None:
+            redis_asyncio = importlib.import_module("redis.asyncio")
+            self._async_client = redis_asyncio.Redis.from_url(self._redis_url, decode_responses=True)
+        return self._async_client
+
+    async def subscribe_async(
+        self,
+        game_id: str,
+        last_event_id: int | None = None,
+        keepalive_seconds: float | None = None,
+    ) -> AsyncIterator[ChannelItem]:
+        keepalive = keepalive_seconds or self._keepalive
+        seq_key, buffer_key, channel = self._keys(game_id)
+        client = self._get_async_client()
+        pubsub = client.pubsub(ignore_subscribe_messages=True)
+        # Mismo orden que subscribe: primero pub/sub, después replay del buffer.
+        await pubsub.subscribe(channel)
+        try:
+            cursor = _start_cursor(int(await client.get(seq_key) or 0), last_event_id)
+            if last_event_id is not None:
+                for item in self._replay(cursor, await client.lrange(buffer_key, 0, -1)):
+                    cursor = max(cursor, item[0])
+                    yield item
+            while True:
+                deadline = time.monotonic() + keepalive
+                item = None
+                while item is None and time.monotonic() < deadline:
+                    message = await pubsub.get_message(timeout=max(0.0, deadline - time.monotonic()))
+                    if message and message.get("type") == "message":
+                        decoded = self._decode(message.get("data"))
+                        if decoded is not None and decoded[0] > cursor:
+                            item = decoded
+                if item is None:
+                    yield None
+                    continue
+                cursor = item[0]
+                yield item
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                logger.debug("Error cerrando pubsub de %s", channel, exc_info=True)
+
+    def _replay(self, cursor: int, raw_items: list[Any]) -> list[tuple[int, dict[str, Any]]]:
+        replay = [self._decode(raw) for raw in raw_items]
+        return _with_gap_check(cursor, [item for item in replay if item is not None and item[0] > cursor])
+
+    @staticmethod
+    def _decode(raw: Any) -> tuple[int, dict[str, Any]] | None:
+        try:
+            data = json.loads(raw)
+            return int(data["id"]), dict(data["event"])
+        except (TypeError, ValueError, KeyError):
+            return None
+
+
+def create_game_event_channel() -> GameEventChannel:
+    backend = os.getenv("GAME_EVENTS_BACKEND", "local").strip().lower()
+    if backend == "redis":
+        return RedisGameEventChannel()
+    return LocalGameEventChannel()
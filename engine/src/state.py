@@ -1,6 +1,6 @@
 """Estado de conversación para LangGraph."""
 
-from typing import TypedDict, List, Dict, Any, NotRequired
+from typing import TypedDict, Sequence, Dict, Any, NotRequired
 from datetime import datetime
 
 
@@ -11,6 +11,8 @@ class Message(TypedDict):
     timestamp: datetime
     turn: int
     displayed: NotRequired[bool]
+    token_count: NotRequired[int]
+    tokenizer: NotRequired[str]
 
 
 class ConversationState(TypedDict):
@@ -18,6 +20,6 @@ class ConversationState(TypedDict):
     
     Este es el estado que se pasa entre nodos del grafo LangGraph.
     """
-    messages: List[Message]
+    messages: Sequence[Message]
     turn: int
     metadata: Dict[str, Any]
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import logging
 import re
 from typing import Any
 
@@ -30,6 +31,8 @@ AGENT_OUTPUT_MAX_CHARS = 280
 
 _SENTENCE_SPLIT_RE = re.compile(r"[.!?…]+")
 _WORD_RE = re.compile(r"\S+")
+_SENTENCE_END = ".!?…"
+_logger = logging.getLogger(__name__)
 
 
 def normalize_text(value: Any) -> str:
@@ -176,3 +179,108 @@ def truncate_agent_output(
     if last_space >= 40:
         clipped = clipped[:last_space].rstrip()
     return clipped.rstrip(".!?… ")
+
+
+class StreamingOutputTruncator:
+    """Versión incremental de truncate_agent_output para respuestas en streaming.
+
+    Acumula solo el cuerpo ya limpio (acotado por max_chars), cuenta frases sobre
+    cada fragmento nuevo y emite deltas que son prefijo garantizado del texto final:
+    la última palabra y la puntuación final se retienen hasta saber si sobreviven
+    al recorte. `done` pasa a True al alcanzar el límite de frases o caracteres;
+    a partir de ahí el stream de origen puede cerrarse.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_sentences: int = AGENT_OUTPUT_MAX_SENTENCES,
+        max_chars: int = AGENT_OUTPUT_MAX_CHARS,
+    ) -> None:
+        self._max_sentences = max_sentences
+        self._max_chars = max_chars
+        self._buffer = ""
+        self._sentences = 0
+        self._emitted = ""
+        self._final: str | None = None
+
+    @property
+    def done(self) -> bool:
+        return self._final is not None
+
+    @property
+    def text(self) -> str:
+        """Texto final (tras `finish` o al alcanzar el límite); si no, lo emitido hasta ahora."""
+        return self._final if self._final is not None else self._emitted
+
+    def feed(self, piece: str) -> str:
+        """Añade un fragmento y devuelve el delta seguro a emitir (puede ser vacío)."""
+        if self._final is not None or not piece:
+            return ""
+        if not self._buffer:
+            piece = piece.lstrip()
+            if not piece:
+                return ""
+        limit_reached = False
+        for idx, char in enumerate(piece):
+            if char in ".!?…":
+                self._sentences += 1
+                if self._sentences >= self._max_sentences:
+                    piece = piece[: idx + 1]
+                    limit_reached = True
+                    break
+        self._buffer += piece
+        if limit_reached or len(self._buffer) > self._max_chars:
+            return self._finalize()
+        return self._emit(self._safe_prefix())
+
+    def finish(self) -> str:
+        """Cierra el stream y devuelve el delta pendiente hasta el texto final."""
+        if self._final is not None:
+            return ""
+        return self._finalize()
+
+    def _safe_prefix(self) -> str:
+        """Prefijo que sobrevive a cualquier continuación del stream.
+
+        truncate_agent_output solo recorta por espacio (" "): el corte final cae en el último
+        espacio de los max_chars primeros caracteres o, si está antes de la posición 40, en
+        max_chars. En ambos casos queda a la derecha del último espacio ya recibido, así que
+        ese espacio es el único punto de corte seguro (no saltos de línea ni tabuladores).
+        """
+        body = self._buffer.rstrip()
+        idx = body.rfind(" ")
+        if idx <= 0:
+            return ""
+        prefix = body[:idx]
+        # Lo que el recorte final podría quitar por la derecha: espacios y puntuación de cierre.
+        end = len(prefix)
+        while end and (prefix[end - 1].isspace() or prefix[end - 1] in _SENTENCE_END):
+            end -= 1
+        return prefix[:end]
+
+    def _emit(self, candidate: str) -> str:
+        if len(candidate) <= len(self._emitted):
+            return ""
+        delta = candidate[len(self._emitted):]
+        self._emitted = candidate
+        return delta
+
+    def _finalize(self) -> str:
+        final = truncate_agent_output(
+            self._buffer,
+            max_sentences=self._max_sentences,
+            max_chars=self._max_chars,
+        )
+        if not final.startswith(self._emitted):
+            # No debería ocurrir: lo emitido ya no se puede retirar, así que se guarda tal
+            # cual para que el mensaje persistido coincida con lo que vio el cliente.
+            _logger.warning(
+                "Stream truncado divergente: emitido=%d chars, final=%d chars",
+                len(self._emitted),
+                len(final),
+            )
+            self._final = self._emitted
+            return ""
+        self._final = final
+        return self._emit(final)
@@ -0,0 +1,140 @@
+"""Conteo de tokens para dimensionar prompts.
+
+Con LLM_TOKENIZER_PATH apuntando a un tokenizer.json local (formato Hugging Face de BPE a
+nivel de byte, p. ej. el publicado con los modelos DeepSeek) se cuenta con el vocabulario
+real, sin red ni dependencias: el fichero se carga una vez por proceso y las palabras ya
+tokenizadas se cachean. Sin fichero (o si no se puede cargar) se usa una estimación de
+~4 caracteres por token.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Pre-tokenización estilo GPT-2 adaptada a `re` (sin clases \p{...}).
+_PRETOKENIZE_RE = re.compile(
+    r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d{1,3}| ?[^\s\w]+|\s+(?!\S)|\s+""",
+    re.UNICODE,
+)
+_WORD_CACHE_SIZE = 20000
+
+
+def _bytes_to_unicode() -> Dict[int, str]:
+    """Tabla byte -> carácter imprimible usada por los vocabularios BPE a nivel de byte."""
+    printable = (
+        list(range(ord("!"), ord("~") + 1))
+        + list(range(ord("¡"), ord("¬") + 1))
+        + list(range(ord("®"), ord("ÿ") + 1))
+    )
+    chars = printable[:]
+    extra = 0
+    for byte in range(256):
+        if byte not in printable:
+            printable.append(byte)
+            chars.append(256 + extra)
+            extra += 1
+    return dict(zip(printable, (chr(c) for c in chars)))
+
+
+_BYTE_ENCODER = _bytes_to_unicode()
+
+
+class HeuristicTokenizer:
+    """Estimación barata (~4 caracteres por token)."""
+
+    name = "heuristic"
+
+    def count(self, text: str) -> int:
+        return math.ceil(len(text or "") / 4)
+
+
+class BPETokenizer:
+    """BPE a nivel de byte leído de un tokenizer.json (solo cuenta, no decodifica)."""
+
+    def __init__(self, vocab: Dict[str, int], merges: List[Tuple[str, str]], name: str = "bpe") -> None:
+        self.name = name
+        self._vocab = vocab
+        self._ranks = {pair: rank for rank, pair in enumerate(merges)}
+        self._cache: OrderedDict[str, int] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_file(cls, path: str) -> "BPETokenizer":
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        model = data.get("model", data)
+        vocab = model.get("vocab")
+        raw_merges = model.get("merges")
+        if not isinstance(vocab, dict) or not isinstance(raw_merges, list):
+            raise ValueError(f"tokenizer.json sin vocab/merges BPE: {path}")
+        merges = [
+            tuple(item.split(" ", 1)) if isinstance(item, str) else tuple(item)
+            for item in raw_merges
+        ]
+        return cls(vocab, [m for m in merges if len(m) == 2], name=f"bpe:{os.path.basename(path)}")
+
+    def count(self, text: str) -> int:
+        return sum(self._count_word(word) for word in _PRETOKENIZE_RE.findall(text or ""))
+
+    def _count_word(self, word: str) -> int:
+        with self._lock:
+            cached = self._cache.get(word)
+            if cached is not None:
+                self._cache.move_to_end(word)
+                return cached
+        count = len(self._bpe("".join(_BYTE_ENCODER[b] for b in word.encode("utf-8"))))
+        with self._lock:
+            self._cache[word] = count
+            if len(self._cache) > _WORD_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return count
+
+    def _bpe(self, token: str) -> List[str]:
+        if token in self._vocab:
+            return [token]
+        parts = list(token)
+        while len(parts) > 1:
+            best_rank, best_index = None, -1
+            for index in range(len(parts) - 1):
+                rank = self._ranks.get((parts[index], parts[index + 1]))
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank, best_index = rank, index
+            if best_rank is None:
+                break
+            parts[best_index : best_index + 2] = [parts[best_index] + parts[best_index + 1]]
+        return parts
+
+
+_tokenizer: HeuristicTokenizer | BPETokenizer | None = None
+_tokenizer_path: str | None = None
+_tokenizer_lock = threading.Lock()
+
+
+def get_tokenizer() -> HeuristicTokenizer | BPETokenizer:
+    """Tokenizer del proceso; se recarga solo si cambia LLM_TOKENIZER_PATH."""
+    global _tokenizer, _tokenizer_path
+    path = os.getenv("LLM_TOKENIZER_PATH", "").strip()
+    with _tokenizer_lock:
+        if _tokenizer is not None and path == _tokenizer_path:
+            return _tokenizer
+        tokenizer: HeuristicTokenizer | BPETokenizer = HeuristicTokenizer()
+        if path:
+            try:
+                tokenizer = BPETokenizer.from_file(path)
+            except Exception as exc:
+                logger.warning("No se pudo cargar LLM_TOKENIZER_PATH=%s, se estima por caracteres: %s", path, exc)
+        _tokenizer, _tokenizer_path = tokenizer, path
+        return tokenizer
+
+
+def count_tokens(text: str) -> int:
+    return get_tokenizer().count(text)
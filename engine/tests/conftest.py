@@ -1,10 +1,21 @@
 """Fixtures compartidos para tests."""
 
+import sys
+
 import pytest
 from src.manager import ConversationManager
 from src.state import ConversationState
 
 
+@pytest.fixture(autouse=True)
+def _clear_auth_user_cache():
+    """La caché de usuarios de auth es global al proceso: no debe filtrarse entre tests."""
+    yield
+    auth = sys.modules.get("src.api.auth")
+    if auth is not None:
+        auth.invalidate_user_cache()
+
+
 @pytest.fixture
 def manager():
     """ConversationManager vacío."""
@@ -19,3 +19,15 @@ def test_factory_ignores_legacy_mode_env(monkeypatch):
     monkeypatch.setattr(persistence_factory, "DatabasePersistenceProvider", _DummyDbProvider)
     provider = persistence_factory.create_persistence_provider()
     assert isinstance(provider, _DummyDbProvider)
+
+
+def test_factory_skips_bootstrap_when_disabled(monkeypatch):
+    captured = {}
+    monkeypatch.setattr(persistence_factory, "DatabasePersistenceProvider", lambda **kwargs: captured.update(kwargs))
+    persistence_factory.create_persistence_provider(bootstrap=False)
+    assert captured == {"run_migrations": False, "ensure_user": False, "bootstrap_templates": False}
+
+    captured.clear()
+    monkeypatch.setenv("DB_BOOTSTRAP_ON_START", "false")
+    persistence_factory.create_persistence_provider()
+    assert captured["run_migrations"] is False
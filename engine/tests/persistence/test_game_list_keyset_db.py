@@ -0,0 +1,48 @@
+"""Keyset (updated_at, id) del listado de partidas en Postgres."""
+
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.persistence.db_provider import DatabasePersistenceProvider
+
+
+@pytest.fixture
+def provider():
+    dsn = os.getenv("DATABASE_URL_TEST") or os.getenv("DATABASE_URL")
+    if not dsn:
+        pytest.skip("No DATABASE_URL_TEST/DATABASE_URL disponible para test de DB.")
+    try:
+        return DatabasePersistenceProvider(dsn=dsn, run_migrations=True, ensure_user=True)
+    except Exception as exc:
+        pytest.skip(f"Dependencia/DB no disponible: {exc}")
+
+
+def test_list_games_page_walks_tied_updated_at_without_gaps(provider):
+    username = f"keyset_{uuid.uuid4().hex[:12]}"
+    provider.ensure_default_user(username)
+    game_ids = [provider.create_game(f"Partida {i}", {"actors": []}, username=username) for i in range(5)]
+    tied_at = datetime(2026, 3, 1, 10, tzinfo=timezone.utc)
+    # Tres partidas comparten updated_at: solo el id las desempata entre páginas.
+    stamps = [tied_at, tied_at, tied_at, tied_at - timedelta(days=1), tied_at - timedelta(days=2)]
+    with provider._connection() as conn:
+        with conn.cursor() as cur:
+            for game_id, stamp in zip(game_ids, stamps):
+                cur.execute("UPDATE games SET updated_at = %s WHERE id = %s", (stamp, game_id))
+
+    seen: list[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        page = provider.list_games_page(username, limit=2, cursor=cursor)
+        seen.extend(g["id"] for g in page["games"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    tied = sorted(game_ids[:3], key=uuid.UUID, reverse=True)
+    assert seen == [*tied, game_ids[3], game_ids[4]]
+    assert pages == 3
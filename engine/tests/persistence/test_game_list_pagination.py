@@ -0,0 +1,66 @@
+"""Paginación por cursor (updated_at, id) del listado de partidas."""
+
+import pytest
+
+from src.persistence.game_cursor import decode_game_cursor, encode_game_cursor
+from src.persistence.provider import PersistenceProvider
+
+
+class _ListingProvider(PersistenceProvider):
+    def __init__(self, games):
+        self._games = games
+
+    def list_games_for_user(self, username):
+        return [dict(g) for g in self._games if g["user"] == username]
+
+    def create_game(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def save_game_state(self, game_id, state_json):
+        raise NotImplementedError
+
+    def append_message(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def get_game(self, game_id):
+        raise KeyError(game_id)
+
+    def get_game_messages(self, game_id):
+        raise KeyError(game_id)
+
+    def create_feedback(self, game_id, user_id, feedback_text):
+        raise NotImplementedError
+
+    def list_feedback(self, limit=500):
+        return []
+
+
+def _games():
+    # Dos partidas comparten updated_at: el id desempata sin saltos ni duplicados.
+    stamps = ["2026-03-01T10:00:00+00:00"] * 2 + [f"2026-02-{day:02d}T10:00:00+00:00" for day in range(1, 6)]
+    return [{"id": f"g{i}", "user": "alice", "updated_at": stamp} for i, stamp in enumerate(stamps)] + [
+        {"id": "x", "user": "bob", "updated_at": "2026-04-01T00:00:00+00:00"}
+    ]
+
+
+def test_pages_walk_every_game_once_in_recency_order():
+    provider = _ListingProvider(_games())
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = provider.list_games_page("alice", limit=3, cursor=cursor)
+        seen.extend(g["id"] for g in page["games"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen == ["g1", "g0", "g6", "g5", "g4", "g3", "g2"]
+
+
+def test_cursor_roundtrip_and_invalid_cursor():
+    stamp, game_id = decode_game_cursor(encode_game_cursor("2026-03-01T10:00:00+00:00", "g1"))
+    assert (stamp.isoformat(), game_id) == ("2026-03-01T10:00:00+00:00", "g1")
+    with pytest.raises(ValueError):
+        decode_game_cursor("no-es-un-cursor")
+    with pytest.raises(ValueError):
+        _ListingProvider(_games()).list_games_page("alice", cursor="%%%")
@@ -0,0 +1,47 @@
+"""Orden de mensajes legacy: filas de un mismo lote comparten created_at."""
+
+import json
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from src.persistence.db_provider import DatabasePersistenceProvider
+
+
+@pytest.fixture
+def provider():
+    dsn = os.getenv("DATABASE_URL_TEST") or os.getenv("DATABASE_URL")
+    if not dsn:
+        pytest.skip("No DATABASE_URL_TEST/DATABASE_URL disponible para test de DB.")
+    try:
+        return DatabasePersistenceProvider(dsn=dsn, run_migrations=True, ensure_user=True)
+    except Exception as exc:
+        pytest.skip(f"Dependencia/DB no disponible: {exc}")
+
+
+def test_legacy_batch_keeps_insertion_order_despite_uuid_ids(provider):
+    game_id = provider.create_game("Orden legacy", {"actors": [{"name": "Alice"}]})
+    batch_at = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    # Ids en orden inverso al de inserción: el desempate por id solo desordenaría.
+    rows = [
+        ("ffffffff-0000-4000-8000-000000000000", "uno", "2025-01-01T00:00:00.000001"),
+        ("88888888-0000-4000-8000-000000000000", "dos", "2025-01-01T00:00:00.000002"),
+        ("00000000-0000-4000-8000-000000000000", "tres", "2025-01-01T00:00:00.000003"),
+    ]
+    with provider._connection() as conn:
+        with conn.cursor() as cur:
+            for message_id, content, timestamp in rows:
+                cur.execute(
+                    """
+                    INSERT INTO messages (id, game_id, turn_number, author, role, content, metadata_json, created_at)
+                    VALUES (%s, %s, 1, 'Alice', 'actor_alice', %s, %s::jsonb, %s)
+                    """,
+                    (message_id, game_id, content, json.dumps({"timestamp": timestamp}), batch_at),
+                )
+
+    expected = ["uno", "dos", "tres"]
+    assert [m["content"] for m in provider.get_game_messages(game_id)] == expected
+    assert [m["content"] for m in provider.get_game_messages_range(game_id, 1, 3)] == expected[1:]
+    assert [m["content"] for m in provider.get_session_snapshot(game_id, tail_messages=2)["messages"]] == expected[1:]
+    assert [m["content"] for m in provider.get_recent_game_messages(game_id, 2)] == expected[1:]
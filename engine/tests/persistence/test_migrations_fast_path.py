@@ -0,0 +1,139 @@
+"""Comprobación de migraciones al arrancar: una consulta y sin lock si todo está aplicado."""
+
+import logging
+
+import pytest
+
+import src.persistence.db_provider as db_module
+from src.persistence.db_provider import DatabasePersistenceProvider, Migration
+
+
+class _UndefinedColumn(Exception):
+    sqlstate = "42703"
+
+
+class _FakeCursor:
+    def __init__(self, db):
+        self._db = db
+        self._rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def execute(self, sql, params=None):
+        sql = " ".join(sql.split())
+        self._db.executed.append(sql)
+        if sql.startswith("SELECT version, checksum FROM schema_migrations"):
+            if not self._db.has_checksum_column:
+                raise _UndefinedColumn("column checksum does not exist")
+            self._rows = list(self._db.applied.items())
+        elif sql.startswith("ALTER TABLE schema_migrations ADD COLUMN"):
+            self._db.has_checksum_column = True
+        elif sql.startswith("INSERT INTO schema_migrations"):
+            self._db.applied[params[0]] = params[2]
+        elif sql.startswith("UPDATE schema_migrations SET checksum"):
+            self._db.applied[params[1]] = params[0]
+
+    def fetchall(self):
+        return self._rows
+
+
+class _FakeConnection:
+    def __init__(self, db):
+        self._db = db
+
+    def cursor(self):
+        return _FakeCursor(self._db)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class _FakeDatabase:
+    def __init__(self, applied=None, has_checksum_column=True):
+        self.applied = dict(applied or {})
+        self.has_checksum_column = has_checksum_column
+        self.executed: list[str] = []
+        self.connections = 0
+
+    def connect(self, _dsn, autocommit=False):
+        self.connections += 1
+        return _FakeConnection(self)
+
+
+MANIFEST = (
+    Migration("001_init.sql", "a" * 64, "CREATE TABLE t1 (id INT);"),
+    Migration("002_more.sql", "b" * 64, "CREATE TABLE t2 (id INT);\nCREATE INDEX i2 ON t2 (id);"),
+)
+
+
+def _provider(monkeypatch, db):
+    monkeypatch.setattr(db_module, "load_migration_manifest", lambda _path: MANIFEST)
+    provider = DatabasePersistenceProvider.__new__(DatabasePersistenceProvider)
+    provider._psycopg = db
+    provider._dsn = "postgresql://fake"
+    return provider
+
+
+def test_all_applied_costs_one_query_and_no_lock(monkeypatch):
+    db = _FakeDatabase({m.version: m.checksum for m in MANIFEST})
+    _provider(monkeypatch, db).apply_migrations()
+    assert db.connections == 1
+    assert db.executed == ["SELECT version, checksum FROM schema_migrations"]
+
+
+def test_pending_migration_is_applied_under_advisory_lock(monkeypatch):
+    db = _FakeDatabase({"001_init.sql": "a" * 64})
+    _provider(monkeypatch, db).apply_migrations()
+    ddl = db.executed[1:]
+    assert ddl[0].startswith("SELECT pg_advisory_xact_lock")
+    assert "CREATE TABLE t1 (id INT);" not in ddl
+    assert ddl[-3:-1] == ["CREATE TABLE t2 (id INT);", "CREATE INDEX i2 ON t2 (id);"]
+    assert ddl[-1].startswith("INSERT INTO schema_migrations")
+    assert db.applied["002_more.sql"] == "b" * 64
+
+
+def test_legacy_table_without_checksums_is_backfilled(monkeypatch):
+    db = _FakeDatabase({m.version: None for m in MANIFEST}, has_checksum_column=False)
+    provider = _provider(monkeypatch, db)
+    provider.apply_migrations()
+    assert db.applied == {m.version: m.checksum for m in MANIFEST}
+    assert not any(sql.startswith("CREATE TABLE t") for sql in db.executed)
+
+    db.executed.clear()
+    provider.apply_migrations()
+    assert db.executed == ["SELECT version, checksum FROM schema_migrations"]
+
+
+def test_checksum_drift_is_reported_without_reapplying(monkeypatch, caplog):
+    db = _FakeDatabase({"001_init.sql": "f" * 64, "002_more.sql": "b" * 64})
+    with caplog.at_level(logging.WARNING, logger=db_module.__name__):
+        _provider(monkeypatch, db).apply_migrations()
+    assert "001_init.sql" in caplog.text
+    assert len(db.executed) == 1
+
+
+def test_manifest_reads_real_migrations_with_checksums():
+    manifest = db_module.load_migration_manifest(db_module.PROJECT_ROOT / "migrations")
+    assert [m.version for m in manifest] == sorted(m.version for m in manifest)
+    assert all(len(m.checksum) == 64 for m in manifest)
+    assert manifest is db_module.load_migration_manifest(db_module.PROJECT_ROOT / "migrations")
+
+
+def test_other_database_errors_are_not_swallowed(monkeypatch):
+    class _ConnectionRefused(Exception):
+        sqlstate = "08001"
+
+    db = _FakeDatabase()
+    db.connect = lambda *_a, **_k: (_ for _ in ()).throw(_ConnectionRefused())
+    with pytest.raises(_ConnectionRefused):
+        _provider(monkeypatch, db).apply_migrations()
@@ -27,8 +27,17 @@ def assert_provider_contract(provider):
     feedback_id = provider.create_feedback(game_id=game_id, user_id=game["user_id"], feedback_text="todo bien")
 
     assert game["id"] == game_id
+    assert provider.get_game_owner(game_id) == {"user_id": game["user_id"], "user": game["user"]}
     assert len(msgs) == 1
+    snapshot = provider.get_session_snapshot(game_id, tail_messages=5)
+    assert snapshot["game"]["id"] == game_id
+    assert snapshot["message_count"] == 1
+    assert [m["content"] for m in snapshot["messages"]] == ["hola"]
+    assert [m["content"] for m in provider.get_game_messages_range(game_id, 0, 1)] == ["hola"]
     assert any(g["id"] == game_id for g in games)
+    page = provider.list_games_page("usuario", user_id=game["user_id"], limit=1)
+    assert page["games"][0]["id"] == games[0]["id"]
+    assert page["next_cursor"] is None or len(games) > 1
     assert feedback_id
 
 
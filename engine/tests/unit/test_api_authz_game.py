@@ -12,18 +12,19 @@ class _EngineListDummy:
     def __init__(self):
         self.called_with = None
 
-    def list_games(self, username: str):
-        self.called_with = username
-        return []
+    def list_games_page(self, username: str, user_id=None, limit=None, cursor=None):
+        self.called_with = (username, user_id)
+        return {"games": [], "next_cursor": None}
 
 
 class _EngineListByUserDummy:
-    def list_games(self, username: str):
+    def list_games_page(self, username: str, user_id=None, limit=None, cursor=None):
+        assert user_id == f"u-{username}"
         if username == "alice":
-            return [{"id": "g-alice", "title": "Partida Alice", "status": "active"}]
+            return {"games": [{"id": "g-alice", "title": "Partida Alice", "status": "active"}]}
         if username == "bob":
-            return [{"id": "g-bob", "title": "Partida Bob", "status": "active"}]
-        return []
+            return {"games": [{"id": "g-bob", "title": "Partida Bob", "status": "active"}]}
+        return {"games": []}
 
 
 class _EngineOwnershipDummy:
@@ -57,7 +58,7 @@ def test_game_list_uses_authenticated_username():
     try:
         res = client.get("/game/list")
         assert res.status_code == 200
-        assert engine.called_with == "alice"
+        assert engine.called_with == ("alice", "u-alice")
     finally:
         app.dependency_overrides.clear()
 
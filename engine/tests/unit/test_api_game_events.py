@@ -0,0 +1,109 @@
+"""Tests unitarios para GET /game/events (canal SSE de la partida)."""
+
+import json
+
+from fastapi.testclient import TestClient
+
+from src.api import routes as routes_module
+from src.api.app import app
+from src.api.schemas import AuthUserResponse
+
+
+class _FiniteChannel:
+    """Canal con una lista fija de items: el stream termina y TestClient puede leerlo entero."""
+
+    def __init__(self, items):
+        self._items = items
+        self.calls = []
+        self.closed = False
+
+    async def subscribe_async(self, game_id, last_event_id=None, keepalive_seconds=None):
+        self.calls.append((game_id, last_event_id))
+        try:
+            for item in self._items:
+                yield item
+        finally:
+            self.closed = True
+
+
+class _DummyEngine:
+    def __init__(self, channel, owner="alice"):
+        self.event_channel = channel
+        self._owner = owner
+
+    def game_belongs_to_user(self, _session_id: str, username: str):
+        return username == self._owner
+
+
+def _client_with_engine(engine):
+    app.dependency_overrides[routes_module.get_engine] = lambda: engine
+    app.dependency_overrides[routes_module.get_current_user] = lambda: AuthUserResponse(
+        id="u1",
+        username="alice",
+        is_active=True,
+    )
+    return TestClient(app)
+
+
+def _parse_sse(body: str) -> list[dict]:
+    frames = []
+    for block in body.split("\n\n"):
+        if not block.strip():
+            continue
+        frame = {}
+        for line in block.split("\n"):
+            key, _, value = line.partition(": ")
+            frame[key] = value
+        frames.append(frame)
+    return frames
+
+
+def test_events_streams_ids_and_resumes_from_last_event_id_header():
+    channel = _FiniteChannel(
+        [
+            (4, {"type": "resync"}),
+            (5, {"type": "message_delta", "delta": "Hola"}),
+            None,
+            (6, {"type": "game_ended"}),
+        ]
+    )
+    client = _client_with_engine(_DummyEngine(channel))
+    try:
+        res = client.get("/game/events", params={"session_id": "sid-1"}, headers={"Last-Event-ID": "3"})
+        assert res.status_code == 200
+        assert res.headers["content-type"].startswith("text/event-stream")
+        frames = _parse_sse(res.text)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert channel.calls == [("sid-1", 3)]
+    assert channel.closed is True
+    assert frames[0] == {"retry": "3000"}
+    assert frames[1]["id"] == "4" and frames[1]["event"] == "resync"
+    assert frames[2]["id"] == "5"
+    assert json.loads(frames[2]["data"]) == {"type": "message_delta", "delta": "Hola"}
+    assert frames[3] == {"": "keepalive"}  # comentario SSE
+    assert frames[4]["id"] == "6" and frames[4]["event"] == "game_ended"
+
+
+def test_events_ignores_invalid_last_event_id():
+    channel = _FiniteChannel([])
+    client = _client_with_engine(_DummyEngine(channel))
+    try:
+        res = client.get("/game/events", params={"session_id": "sid-1"}, headers={"Last-Event-ID": "abc"})
+        assert res.status_code == 200
+    finally:
+        app.dependency_overrides.clear()
+    assert channel.calls == [("sid-1", None)]
+
+
+def test_events_rejects_games_of_other_users():
+    channel = _FiniteChannel([(1, {"type": "status"})])
+    client = _client_with_engine(_DummyEngine(channel, owner="bob"))
+    try:
+        res = client.get("/game/events", params={"session_id": "sid-1"})
+        assert res.status_code == 404
+    finally:
+        app.dependency_overrides.clear()
+    assert channel.calls == []
+
@@ -8,12 +8,18 @@ from src.api.schemas import AuthUserResponse
 
 
 class _DummyEngine:
-    def __init__(self, games):
+    def __init__(self, games, next_cursor=None):
         self._games = games
+        self._next_cursor = next_cursor
+        self.calls = []
 
-    def list_games(self, username: str):
+    def list_games_page(self, username: str, user_id=None, limit=None, cursor=None):
         assert username == "usuario"
-        return self._games
+        assert user_id == "u1"
+        if cursor == "roto":
+            raise ValueError("Invalid game list cursor")
+        self.calls.append({"limit": limit, "cursor": cursor})
+        return {"games": self._games, "next_cursor": self._next_cursor}
 
 
 def _client_with_engine(engine):
@@ -56,6 +62,23 @@ def test_game_list_empty():
     try:
         res = client.get("/game/list")
         assert res.status_code == 200
-        assert res.json() == {"games": []}
+        assert res.json() == {"games": [], "next_cursor": None}
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_game_list_forwards_cursor_and_limit():
+    engine = _DummyEngine([{"id": "g2", "turn_count": 4, "last_message_preview": "Hola"}], next_cursor="c2")
+    client = _client_with_engine(engine)
+    try:
+        res = client.get("/game/list", params={"limit": 1, "cursor": "c1"})
+        assert res.status_code == 200
+        body = res.json()
+        assert body["next_cursor"] == "c2"
+        assert body["games"][0]["turn_count"] == 4
+        assert body["games"][0]["last_message_preview"] == "Hola"
+        assert engine.calls == [{"limit": 1, "cursor": "c1"}]
+        assert client.get("/game/list", params={"cursor": "roto"}).status_code == 400
+        assert client.get("/game/list", params={"limit": 0}).status_code == 422
     finally:
         app.dependency_overrides.clear()
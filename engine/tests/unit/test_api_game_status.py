@@ -46,3 +46,46 @@ def test_status_uses_authenticated_username_for_player_messages():
         assert body["messages"][1]["author"] == "Livia"
     finally:
         app.dependency_overrides.clear()
+
+
+def test_status_since_returns_only_new_messages_with_cursor():
+    client = _client_with_engine(_DummyEngine())
+    try:
+        res = client.get("/game/status", params={"session_id": "sid-1", "since": 1})
+        assert res.status_code == 200
+        body = res.json()
+        assert [m["content"] for m in body["messages"]] == ["Te escucho."]
+        assert body["messages_from"] == 1
+        assert body["message_count"] == 2
+
+        res = client.get("/game/status", params={"session_id": "sid-1", "since": 5})
+        assert res.json()["messages"] == []
+        assert res.json()["messages_from"] == 2
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_status_unchanged_poll_returns_304_with_etag():
+    engine = _DummyEngine()
+    client = _client_with_engine(engine)
+    try:
+        first = client.get("/game/status", params={"session_id": "sid-1", "since": 2})
+        etag = first.headers["ETag"]
+        again = client.get(
+            "/game/status",
+            params={"session_id": "sid-1", "since": 2},
+            headers={"If-None-Match": etag},
+        )
+        assert again.status_code == 304
+        assert again.content == b""
+
+        # Otro cursor es otra representación: no se reutiliza el ETag.
+        other = client.get(
+            "/game/status",
+            params={"session_id": "sid-1", "since": 0},
+            headers={"If-None-Match": etag},
+        )
+        assert other.status_code == 200
+        assert other.headers["ETag"] != etag
+    finally:
+        app.dependency_overrides.clear()
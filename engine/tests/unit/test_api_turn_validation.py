@@ -21,6 +21,9 @@ class _DummyEngine:
             "messages": [],
         }
 
+    def check_turn_available(self, _session_id):
+        return None
+
     def execute_turn_stream(self, _session_id, _text, user_exit=False):
         _ = user_exit
         yield {"type": "observer_thinking"}
@@ -0,0 +1,60 @@
+"""Tests de la caché de usuarios autenticados."""
+
+from types import SimpleNamespace
+
+from src.api import auth as auth_module
+from src.api import dependencies as dependencies_module
+
+
+def _counting_loader(calls, role="user"):
+    def _load(username):
+        calls.append(username)
+        return {"id": "u1", "username": username, "is_active": True, "role": role}
+
+    return _load
+
+
+def test_cached_user_hits_loader_once_per_token(monkeypatch):
+    monkeypatch.setenv("AUTH_USER_CACHE_TTL_SECONDS", "60")
+    calls = []
+    loader = _counting_loader(calls)
+
+    assert auth_module.cached_user("Alice", 100, loader)["username"] == "Alice"
+    assert auth_module.cached_user("alice", 100, loader)["id"] == "u1"
+    assert calls == ["Alice"]
+
+    auth_module.cached_user("alice", 200, loader)  # token nuevo (otro login)
+    assert len(calls) == 2
+
+    auth_module.invalidate_user_cache("ALICE")
+    auth_module.cached_user("alice", 100, loader)
+    assert len(calls) == 3
+
+
+def test_cache_can_be_disabled_and_skips_missing_users(monkeypatch):
+    calls = []
+    monkeypatch.setenv("AUTH_USER_CACHE_TTL_SECONDS", "0")
+    loader = _counting_loader(calls)
+    auth_module.cached_user("alice", 1, loader)
+    auth_module.cached_user("alice", 1, loader)
+    assert len(calls) == 2
+
+    monkeypatch.setenv("AUTH_USER_CACHE_TTL_SECONDS", "60")
+    missing = []
+    assert auth_module.cached_user("ghost", 1, lambda u: missing.append(u)) is None
+    assert auth_module.cached_user("ghost", 1, lambda u: missing.append(u)) is None
+    assert missing == ["ghost", "ghost"]
+
+
+def test_get_current_user_reuses_cached_user(monkeypatch):
+    monkeypatch.setenv("AUTH_USER_CACHE_TTL_SECONDS", "60")
+    calls = []
+    monkeypatch.setattr(dependencies_module, "get_user_by_username", _counting_loader(calls, role="admin"))
+    token = auth_module.create_access_token("alice")
+    request = SimpleNamespace(cookies={auth_module.auth_cookie_name(): token})
+
+    first = dependencies_module.get_current_user(request)
+    second = dependencies_module.get_current_user(request)
+
+    assert first.role == second.role == "admin"
+    assert calls == ["alice"]
@@ -134,3 +134,37 @@ def test_character_build_messages_uses_player_name_in_prompt_and_history(
 
     assert 'El jugador presente en la escena se llama "alice".' in messages[0]["content"]
     assert messages[1]["content"] == "[alice] Hola."
+
+
+def test_character_stream_stops_upstream_once_limit_reached(
+    agent: CharacterAgent, sample_state: ConversationState
+):
+    consumed: list[str] = []
+
+    def fake_stream():
+        for chunk in ["Uno. ", "Dos. ", "Tres. ", "Cuatro. ", "Cinco."]:
+            consumed.append(chunk)
+            yield chunk
+
+    sink: list[str] = []
+    with patch("src.agents.character.send_message", return_value=fake_stream()):
+        result = agent.process(sample_state, stream=True, stream_sink=sink.append)
+
+    assert result["message"] == "Uno. Dos. Tres."
+    assert consumed == ["Uno. ", "Dos. ", "Tres. "]
+    assert "".join(sink) == "Uno. Dos. Tres.\n"
+
+
+def test_character_stream_deltas_match_char_limited_message(
+    agent: CharacterAgent, sample_state: ConversationState
+):
+    words = ["palabra"] * 60
+    chunks = ["Test: "] + [f"{w} " for w in words]
+    sink: list[str] = []
+    with patch("src.agents.character.send_message", return_value=iter(chunks)):
+        result = agent.process(sample_state, stream=True, stream_sink=sink.append)
+
+    expected = agent._sanitize_response_content("".join(chunks))
+    assert result["message"] == expected
+    assert len(expected) <= 280
+    assert "".join(sink) == expected + "\n"
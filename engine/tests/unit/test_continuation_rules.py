@@ -0,0 +1,116 @@
+"""Tests del pre-clasificador por reglas y la caché de continuación del observer."""
+
+from unittest.mock import patch
+
+from src.agents import continuation_rules
+from src.agents.continuation_rules import ContinuationCache, classify_continuation
+from src.agents.observer import ObserverAgent
+from src.player_identity import INTERNAL_PLAYER_AUTHOR
+
+
+def _msg(author, content):
+    return {"author": author, "content": content, "timestamp": None, "turn": 1}
+
+
+def _state(*messages):
+    return {"messages": list(messages), "turn": 1, "metadata": {"player_name": "alice"}}
+
+
+def test_classify_direct_question_to_named_actor():
+    decision = classify_continuation(
+        [_msg(INTERNAL_PLAYER_AUTHOR, "Y tú, ¿qué opinas, Bérénice?")],
+        ["Marco", "Berenice"],
+        "alice",
+    )
+    assert decision["needs_response"] is True
+    assert decision["who_should_respond"] == "Berenice"
+
+
+def test_classify_vocative_and_single_actor_normalization():
+    vocative = classify_continuation(
+        [_msg(INTERNAL_PLAYER_AUTHOR, "Marco, cuéntame lo del puerto.")],
+        ["Marco", "Berenice"],
+        "alice",
+    )
+    assert vocative["who_should_respond"] == "Marco"
+
+    single = classify_continuation(
+        [_msg(INTERNAL_PLAYER_AUTHOR, "¿Dónde estabas anoche?")],
+        ["Marco"],
+        "alice",
+    )
+    assert single["who_should_respond"] == "character"
+
+
+def test_classify_actor_question_to_player_or_other_actor():
+    to_player = classify_continuation(
+        [_msg("Marco", "¿Y tú qué harías, Alice?")],
+        ["Marco", "Berenice"],
+        "alice",
+    )
+    assert to_player["who_should_respond"] == "user"
+
+    to_actor = classify_continuation(
+        [_msg("Marco", "¿No es así, Berenice?")],
+        ["Marco", "Berenice"],
+        "alice",
+    )
+    assert to_actor["who_should_respond"] == "Berenice"
+
+
+def test_classify_returns_none_when_uncertain():
+    assert classify_continuation(
+        [_msg(INTERNAL_PLAYER_AUTHOR, "¿Qué pensáis Marco y Berenice?")],
+        ["Marco", "Berenice"],
+        "alice",
+    ) is None
+    assert classify_continuation(
+        [_msg(INTERNAL_PLAYER_AUTHOR, "Me quedo pensando en silencio.")],
+        ["Marco", "Berenice"],
+        "alice",
+    ) is None
+
+
+def test_rules_on_mode_skips_llm(monkeypatch):
+    monkeypatch.setenv("OBSERVER_CONTINUATION_RULES", "on")
+    agent = ObserverAgent(actor_names=["Marco", "Berenice"])
+    with patch("src.agents.observer.send_message") as mocked_send:
+        decision = agent.evaluate_continuation(_state(_msg(INTERNAL_PLAYER_AUTHOR, "Marco, ¿vienes?")))
+    mocked_send.assert_not_called()
+    assert decision["who_should_respond"] == "Marco"
+
+
+def test_shadow_mode_calls_llm_and_records_agreement(monkeypatch):
+    monkeypatch.setenv("OBSERVER_CONTINUATION_RULES", "shadow")
+    stats = continuation_rules.ShadowStats()
+    monkeypatch.setattr("src.agents.observer.shadow_stats", stats)
+    agent = ObserverAgent(actor_names=["Marco", "Berenice"])
+    llm_answer = '{"needs_response": true, "who_should_respond": "Marco", "reason": "Le pregunta a él."}'
+    with patch("src.agents.observer.send_message", return_value=llm_answer) as mocked_send:
+        decision = agent.evaluate_continuation(_state(_msg(INTERNAL_PLAYER_AUTHOR, "Marco, ¿vienes?")))
+    assert mocked_send.call_count == 1
+    assert decision["reason"] == "Le pregunta a él."
+    assert stats.compared == 1
+    assert stats.agreement_rate == 1.0
+
+
+def test_llm_decisions_are_cached_per_normalized_window(monkeypatch):
+    monkeypatch.setenv("OBSERVER_CONTINUATION_RULES", "off")
+    agent = ObserverAgent(actor_names=["Marco", "Berenice"])
+    llm_answer = '{"needs_response": true, "who_should_respond": "Berenice", "reason": "Turno de Berenice."}'
+    with patch("src.agents.observer.send_message", return_value=llm_answer) as mocked_send:
+        first = agent.evaluate_continuation(_state(_msg(INTERNAL_PLAYER_AUTHOR, "Hablemos del  puerto.")))
+        second = agent.evaluate_continuation(_state(_msg(INTERNAL_PLAYER_AUTHOR, "hablemos del puerto")))
+    assert mocked_send.call_count == 1
+    assert first == second
+
+
+def test_continuation_cache_is_bounded():
+    cache = ContinuationCache(max_size=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, {"who_should_respond": key})
+    assert cache.get("a") is None
+    assert cache.get("c") == {"who_should_respond": "c"}
+    disabled = ContinuationCache(max_size=0)
+    disabled.put("a", {"x": 1})
+    assert disabled.get("a") is None
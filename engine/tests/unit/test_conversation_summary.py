@@ -0,0 +1,123 @@
+"""Tests del resumen jerárquico de la conversación y la ventana de contexto por tokens."""
+
+from src.agents import conversation_summarizer as cs
+from src.agents.conversation_summarizer import ConversationSummarizer, SummaryConfig
+from src.agents.scene_prompt_context import select_context_messages
+from src.context_window import SUMMARY_METADATA_KEY, message_tokens, summary_nodes
+from src.manager import ConversationManager
+from src.player_identity import INTERNAL_PLAYER_AUTHOR
+
+
+def _manager(count: int) -> ConversationManager:
+    manager = ConversationManager()
+    manager.update_metadata("player_name", "alice")
+    authors = [INTERNAL_PLAYER_AUTHOR, "Marco"]
+    for i in range(count):
+        manager.add_message(authors[i % 2], f"Mensaje número {i}. Detalle adicional.")
+    return manager
+
+
+def _summarizer(mode: str = "heuristic") -> ConversationSummarizer:
+    return ConversationSummarizer(SummaryConfig(mode=mode, chunk_messages=4, keep_recent=4, fanin=2))
+
+
+def test_summarizer_off_does_nothing():
+    manager = _manager(30)
+    assert ConversationSummarizer(SummaryConfig(mode="off")).update(manager.state) == 0
+    assert SUMMARY_METADATA_KEY not in manager.state["metadata"]
+
+
+def test_summarizer_builds_hierarchy_and_keeps_recent_raw():
+    manager = _manager(20)
+    _summarizer().update(manager.state, player_name="alice")
+
+    nodes = summary_nodes(manager.state)
+    # 16 mensajes resumibles en bloques de 4 con fan-in 2 -> un único nodo de nivel 2.
+    assert [(n["level"], n["start"], n["end"]) for n in nodes] == [(2, 0, 16)]
+    assert manager.state["metadata"][SUMMARY_METADATA_KEY]["covered_until"] == 16
+    assert "alice: Mensaje número 0." in nodes[0]["text"]
+
+    # Crece de forma incremental sin rehacer lo ya resumido.
+    for i in range(4):
+        manager.add_message("Marco", f"Nuevo {i}.")
+    assert _summarizer().update(manager.state) == 1
+    assert [(n["level"], n["start"], n["end"]) for n in summary_nodes(manager.state)] == [(2, 0, 16), (0, 16, 20)]
+
+
+def test_llm_mode_uses_notary_role_and_falls_back(monkeypatch):
+    calls = []
+
+    def fake_send(messages, **kwargs):
+        calls.append(kwargs)
+        if len(calls) == 2:
+            raise RuntimeError("boom")
+        return "Resumen del notario."
+
+    monkeypatch.setattr(cs, "send_message", fake_send)
+    manager = _manager(12)
+    _summarizer("llm").update(manager.state)
+
+    assert all(call["role"] == "notary" for call in calls)
+    nodes = summary_nodes(manager.state)
+    assert len(nodes) == 1 and nodes[0]["level"] == 1
+    assert nodes[0]["text"] == "Resumen del notario."
+
+
+def test_context_window_packs_summary_and_tail_within_budget():
+    manager = _manager(40)
+    _summarizer().update(manager.state)
+
+    window = manager.get_context_window(300)
+    assert window.summary_text.startswith("Resumen de la conversación anterior:")
+    assert window.messages == manager.state["messages"][window.first_message_index :]
+    assert window.tokens <= 300
+    assert len(window.messages) < 40
+    # Sin hueco entre el último resumen y el primer mensaje crudo.
+    nodes = summary_nodes(manager.state)
+    assert any(int(n["end"]) >= window.first_message_index for n in nodes)
+
+
+def test_context_window_without_summaries_is_newest_first():
+    manager = _manager(10)
+    per_message = message_tokens(manager.state["messages"][-1])
+    window = manager.get_context_window(per_message * 3)
+    assert window.summary_text == ""
+    assert window.messages == manager.state["messages"][-3:]
+    # min_recent se respeta aunque el presupuesto sea mínimo.
+    assert len(manager.get_context_window(1).messages) == 2
+
+
+def test_select_context_messages_uses_token_budget(monkeypatch):
+    monkeypatch.delenv("AGENT_CONTEXT_MODE", raising=False)
+    manager = _manager(40)
+    _summarizer().update(manager.state)
+    block, messages = select_context_messages(manager.state, 12, token_budget=200)
+    assert block.startswith("Resumen de la conversación anterior:")
+    assert messages and messages[-1] == manager.state["messages"][-1]
+
+    block, messages = select_context_messages(manager.state, 12)
+    assert block == ""
+    assert len(messages) == 12
+
+
+def test_summarizer_caps_chunks_per_update_and_catches_up(monkeypatch):
+    calls = []
+    monkeypatch.setattr(cs, "send_message", lambda messages, **kwargs: calls.append(kwargs) or "Resumen.")
+    manager = _manager(20)
+    summarizer = _summarizer("llm")
+
+    assert summarizer.update(manager.state, max_chunks=1) == 1
+    assert [(n["level"], n["start"], n["end"]) for n in summary_nodes(manager.state)] == [(0, 0, 4)]
+    assert len(calls) == 1
+
+    while summarizer.update(manager.state, max_chunks=1):
+        pass
+    # Mismo resultado final que resumirlo todo de una vez, repartido entre llamadas.
+    assert [(n["level"], n["start"], n["end"]) for n in summary_nodes(manager.state)] == [(2, 0, 16)]
+
+
+def test_summary_config_reads_chunks_per_persist(monkeypatch):
+    monkeypatch.setenv("CONVERSATION_SUMMARY_MAX_CHUNKS_PER_PERSIST", "3")
+    assert SummaryConfig.from_env().max_chunks_per_persist == 3
+    monkeypatch.delenv("CONVERSATION_SUMMARY_MAX_CHUNKS_PER_PERSIST")
+    assert SummaryConfig.from_env().max_chunks_per_persist == 1
@@ -2,7 +2,17 @@
 
 from types import SimpleNamespace
 
+import pytest
+
 from src.agents import deepseek_adapter as da
+from src.agents.llm_resilience import ResilienceConfig, ResilientCaller
+
+
+@pytest.fixture(autouse=True)
+def _fast_resilience(monkeypatch):
+    caller = ResilientCaller(ResilienceConfig(base_delay_seconds=0.0), sleep=lambda _s: None)
+    monkeypatch.setattr(da, "_resilience", caller)
+    return caller
 
 
 def test_send_message_non_stream_reports_usage_and_cost(monkeypatch):
@@ -31,7 +41,7 @@ def test_send_message_non_stream_reports_usage_and_cost(monkeypatch):
     class FakeClient:
         chat = SimpleNamespace(completions=FakeCompletions())
 
-    monkeypatch.setattr(da, "_get_client", lambda: FakeClient())
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
 
     out = da.send_message(
         [{"role": "user", "content": "hola"}],
@@ -77,7 +87,7 @@ def test_send_message_stream_reports_usage_and_output(monkeypatch):
     class FakeClient:
         chat = SimpleNamespace(completions=FakeCompletions())
 
-    monkeypatch.setattr(da, "_get_client", lambda: FakeClient())
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
 
     out = "".join(
         da.send_message(
@@ -109,7 +119,7 @@ def test_send_message_passes_timeout_to_provider(monkeypatch):
     class FakeClient:
         chat = SimpleNamespace(completions=FakeCompletions())
 
-    monkeypatch.setattr(da, "_get_client", lambda: FakeClient())
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
     monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-timeout")
     monkeypatch.setattr(da, "end_generation", lambda *args, **kwargs: None)
 
@@ -134,7 +144,7 @@ def test_send_message_normalizes_provider_timeout(monkeypatch):
     class FakeClient:
         chat = SimpleNamespace(completions=FakeCompletions())
 
-    monkeypatch.setattr(da, "_get_client", lambda: FakeClient())
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
     monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-timeout-error")
     monkeypatch.setattr(da, "end_generation", lambda *args, **kwargs: None)
 
@@ -143,3 +153,246 @@ def test_send_message_normalizes_provider_timeout(monkeypatch):
         assert False, "Expected TimeoutError"
     except TimeoutError as exc:
         assert "provider timeout" in str(exc)
+
+
+def _content_chunk(text):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(delta=SimpleNamespace(content=text))],
+        usage=None,
+    )
+
+
+class _ClosableStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        chunk = next(self._chunks)
+        self.consumed += 1
+        return chunk
+
+    def close(self):
+        self.closed = True
+
+
+def test_send_message_stop_when_closes_stream_and_reports_savings(monkeypatch):
+    calls = []
+    stream = _ClosableStream([_content_chunk("Uno. "), _content_chunk("Dos. "), _content_chunk("Tres.")])
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**_kwargs):
+            return stream
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-stop")
+    monkeypatch.setattr(da, "end_generation", lambda generation, **kwargs: calls.append(kwargs))
+
+    out = "".join(
+        da.send_message(
+            [{"role": "user", "content": "hola"}],
+            stream=True,
+            max_tokens=120,
+            stop_when=lambda piece: piece.startswith("Dos"),
+        )
+    )
+
+    assert out == "Uno. Dos. "
+    assert stream.consumed == 2
+    assert stream.closed is True
+    extra = calls[0]["extra_fields"]
+    assert extra["early_stop"] is True
+    assert extra["output_tokens_saved_estimate"] == 120 - extra["output_tokens_estimate"]
+
+
+def test_send_message_non_stream_with_stop_when_streams_internally(monkeypatch):
+    captured = {}
+    stream = _ClosableStream([_content_chunk("Hola. "), _content_chunk("Adios.")])
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**kwargs):
+            captured.update(kwargs)
+            return stream
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-budget")
+    monkeypatch.setattr(da, "end_generation", lambda *args, **kwargs: None)
+
+    out = da.send_message(
+        [{"role": "user", "content": "hola"}],
+        stream=False,
+        stop_when=lambda piece: "." in piece,
+    )
+
+    assert out == "Hola. "
+    assert captured["stream"] is True
+    assert stream.closed is True
+
+
+def test_send_message_retries_transient_errors_and_reports_attempts(monkeypatch):
+    calls = []
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-retry")
+    monkeypatch.setattr(da, "end_generation", lambda generation, **kwargs: calls.append(kwargs))
+
+    class APIConnectionError(Exception):
+        pass
+
+    attempts = {"n": 0}
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+        usage=None,
+    )
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**_kwargs):
+            attempts["n"] += 1
+            if attempts["n"] < 3:
+                raise APIConnectionError("connection reset")
+            return response
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+
+    out = da.send_message([{"role": "user", "content": "hola"}], stream=False)
+
+    assert out == "ok"
+    assert attempts["n"] == 3
+    fields = calls[-1]["extra_fields"]
+    assert fields["llm_attempts"] == 3
+    assert fields["llm_retries"] == 2
+    assert fields["llm_breaker_state"] == "closed"
+
+
+def test_send_message_does_not_retry_client_errors(monkeypatch):
+    calls = []
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-400")
+    monkeypatch.setattr(da, "end_generation", lambda generation, **kwargs: calls.append(kwargs))
+
+    class BadRequestError(Exception):
+        status_code = 400
+
+    attempts = {"n": 0}
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**_kwargs):
+            attempts["n"] += 1
+            raise BadRequestError("bad request")
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+
+    with pytest.raises(BadRequestError):
+        da.send_message([{"role": "user", "content": "hola"}], stream=False)
+
+    assert attempts["n"] == 1
+    assert calls[-1]["level"] == "ERROR"
+    assert calls[-1]["extra_fields"]["llm_attempts"] == 1
+
+
+def test_send_message_releases_concurrency_slot_after_stream(monkeypatch):
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-slot")
+    monkeypatch.setattr(da, "end_generation", lambda generation, **kwargs: None)
+    caller = ResilientCaller(
+        ResilienceConfig(max_concurrency=1, concurrency_wait_seconds=0.0),
+        sleep=lambda _s: None,
+    )
+    monkeypatch.setattr(da, "_resilience", caller)
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**_kwargs):
+            return iter([_content_chunk("hola")])
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+
+    for _ in range(2):
+        assert "".join(da.send_message([{"role": "user", "content": "x"}], stream=True)) == "hola"
+    assert caller.limiter.try_acquire()
+
+
+
+def test_stream_never_iterated_releases_slot_on_close_or_gc(monkeypatch):
+    ended = []
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-abandon")
+    monkeypatch.setattr(da, "end_generation", lambda generation, **kwargs: ended.append(kwargs))
+    caller = ResilientCaller(
+        ResilienceConfig(max_concurrency=1, concurrency_wait_seconds=0.0),
+        sleep=lambda _s: None,
+    )
+    monkeypatch.setattr(da, "_resilience", caller)
+    closed = []
+
+    class FakeResponse:
+        def __iter__(self):
+            return iter([_content_chunk("hola")])
+
+        def close(self):
+            closed.append(True)
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**_kwargs):
+            return FakeResponse()
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+
+    stream = da.send_message([{"role": "user", "content": "x"}], stream=True)
+    stream.close()
+    assert closed == [True]
+    assert ended[-1]["status_message"] == "Stream descartado sin consumir"
+
+    da.send_message([{"role": "user", "content": "x"}], stream=True)  # descartado sin cerrar
+    assert caller.limiter.try_acquire()
+    caller.limiter.release()
+    assert len(closed) == 2
+
+def test_send_message_reports_scheduler_priority_and_queue_wait(monkeypatch):
+    from src.agents.llm_scheduler import LLMScheduler, SchedulerConfig
+
+    calls = []
+    monkeypatch.setattr(da, "start_generation", lambda **kwargs: "gen-sched")
+    monkeypatch.setattr(da, "end_generation", lambda generation, **kwargs: calls.append(kwargs))
+    monkeypatch.setattr(da, "_scheduler", LLMScheduler(SchedulerConfig(requests_per_minute=60)))
+
+    class FakeCompletions:
+        @staticmethod
+        def create(**_kwargs):
+            return SimpleNamespace(
+                choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+                usage=None,
+            )
+
+    class FakeClient:
+        chat = SimpleNamespace(completions=FakeCompletions())
+
+    monkeypatch.setattr(da, "_get_client", lambda _backend: FakeClient())
+
+    assert da.send_message([{"role": "user", "content": "hola"}], role="notary") == "ok"
+    fields = calls[-1]["extra_fields"]
+    assert fields["llm_priority"] == 3
+    assert fields["llm_queue_depth"] == 0
+    assert fields["llm_queue_wait_ms"] >= 0
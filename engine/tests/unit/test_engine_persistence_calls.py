@@ -0,0 +1,148 @@
+"""Presupuesto de llamadas a persistencia por turno: una escritura y ninguna lectura."""
+
+import uuid
+
+import pytest
+
+import src.core.engine as engine_module
+from src.core.engine import GameEngine
+from src.persistence.provider import PersistenceProvider
+from src.queueing.game_channel import LocalGameEventChannel
+
+
+class _InMemoryProvider(PersistenceProvider):
+    def __init__(self):
+        self.games: dict[str, dict] = {}
+        self.messages: dict[str, list[dict]] = {}
+
+    def create_game(self, title, config_json, username=None, game_mode="custom", **_kwargs) -> str:
+        game_id = str(uuid.uuid4())
+        self.games[game_id] = {
+            "id": game_id,
+            "title": title,
+            "user": username or "usuario",
+            "user_id": "u1",
+            "game_mode": game_mode,
+            "config_json": dict(config_json),
+            "state_json": {"turn": 0, "metadata": {}, "next_action": "character"},
+        }
+        self.messages[game_id] = []
+        return game_id
+
+    def save_game_state(self, game_id, state_json):
+        self.games[game_id]["state_json"] = dict(state_json)
+
+    def append_message(self, game_id, turn_number, role, content, metadata_json=None):
+        self.messages[game_id].append(
+            {"turn_number": turn_number, "role": role, "content": content, "metadata_json": metadata_json or {}}
+        )
+
+    def get_game(self, game_id):
+        if game_id not in self.games:
+            raise KeyError(game_id)
+        return dict(self.games[game_id])
+
+    def get_game_messages(self, game_id):
+        return list(self.messages[game_id])
+
+    def list_games_for_user(self, username):
+        return [g for g in self.games.values() if g.get("user") == username]
+
+    def create_feedback(self, game_id, user_id, feedback_text):
+        return str(uuid.uuid4())
+
+    def list_feedback(self, limit=500):
+        return []
+
+    def enqueue_domain_event(self, event_type, aggregate_type, aggregate_id, payload_json):
+        return str(uuid.uuid4())
+
+    def get_runtime_setting(self, key):
+        return None
+
+
+class _CountingProvider:
+    """Registra las llamadas que hace el motor (no las internas del provider)."""
+
+    def __init__(self, inner):
+        self._inner = inner
+        self.calls: list[str] = []
+
+    def __getattr__(self, name):
+        attr = getattr(self._inner, name)
+        if not callable(attr):
+            return attr
+
+        def _counted(*args, **kwargs):
+            self.calls.append(name)
+            return attr(*args, **kwargs)
+
+        return _counted
+
+
+def _fake_run_one_step(manager, *_args, pending_user_text=None, **kwargs):
+    if pending_user_text:
+        manager.add_message("Usuario", pending_user_text)
+        return {"next_action": "character", "events": [], "game_ended": False}
+    manager.add_message("Livia", "Respondo.")
+    sink = kwargs.get("event_sink")
+    if sink:
+        sink({"type": "message", "message": {"author": "Livia", "content": "Respondo."}})
+    return {"next_action": "user_input", "events": [], "game_ended": False}
+
+
+@pytest.fixture
+def engine_with_counter(monkeypatch):
+    monkeypatch.delenv("AGENT_CONTEXT_MODE", raising=False)
+    monkeypatch.delenv("CONVERSATION_SUMMARY_MODE", raising=False)
+    monkeypatch.setattr(engine_module, "create_character_agent", lambda **_: object())
+    monkeypatch.setattr(engine_module, "create_observer_agent", lambda **_: object())
+    monkeypatch.setattr(engine_module, "run_one_step", _fake_run_one_step)
+    provider = _CountingProvider(_InMemoryProvider())
+    engine = GameEngine(persistence_provider=provider, event_channel=LocalGameEventChannel())
+    setup = {
+        "titulo": "Partida",
+        "descripcion_breve": "Breve",
+        "ambientacion": "Roma",
+        "contexto_problema": "Intriga",
+        "relevancia_jugador": "Clave",
+        "player_mission": "Descubrir",
+        "narrativa_inicial": "Inicio",
+        "actors": [
+            {
+                "name": "Livia",
+                "personality": "Calculadora",
+                "mission": "Ocultar",
+                "background": "Senadora",
+                "presencia_escena": "Foro",
+            }
+        ],
+    }
+    game_id, _ = engine.create_game_from_setup(setup, username="alice", game_mode="custom")
+    return engine, provider, game_id
+
+
+def test_creation_reads_owner_once(engine_with_counter):
+    engine, provider, game_id = engine_with_counter
+    assert provider.calls.count("get_game_owner") == 1
+    assert "get_game" not in provider.calls
+    session = engine._registry[game_id]
+    assert (session.user_id, session.username, session.game_mode) == ("u1", "alice", "custom")
+
+
+@pytest.mark.parametrize("flow", ["player_input", "execute_turn_stream", "tick"])
+def test_steady_state_turn_does_one_write_and_no_reads(engine_with_counter, flow):
+    engine, provider, game_id = engine_with_counter
+    if flow == "tick":
+        engine._registry[game_id].next_action = "character"
+    assert engine.game_belongs_to_user(game_id, "alice")
+    provider.calls.clear()
+
+    if flow == "player_input":
+        engine.player_input(game_id, "hola")
+    elif flow == "execute_turn_stream":
+        list(engine.execute_turn_stream(game_id, "hola"))
+    else:
+        engine.tick(game_id)
+
+    assert provider.calls == ["persist_game_progress"]
@@ -220,5 +220,118 @@ def test_engine_rehydrate_preserves_actor_prompt_template_from_snapshot(monkeypa
     captured_templates.clear()
 
     engine.resume_game(game_id)
+    assert captured_templates == []  # los agentes se construyen al primer uso
 
+    assert engine._registry[game_id].character_agents["Livia"] is not None
     assert captured_templates == [prompt_a]
+
+
+def test_game_owner_lookups_are_cached(monkeypatch):
+    monkeypatch.setattr(engine_module, "create_character_agent", lambda **_: object())
+    monkeypatch.setattr(engine_module, "create_observer_agent", lambda **_: object())
+
+    provider = _InMemoryProvider()
+    game_id = provider.create_game("Partida", _build_config(), username="alice")
+    owner_calls: list[str] = []
+    original = provider.get_game_owner
+    monkeypatch.setattr(provider, "get_game_owner", lambda gid: owner_calls.append(gid) or original(gid))
+
+    engine = GameEngine(persistence_provider=provider)
+    assert engine.game_belongs_to_user(game_id, "alice") is True
+    assert engine.game_belongs_to_user(game_id, "mallory") is False
+    assert owner_calls == [game_id]
+
+    # Rehidratar siembra la caché: la autorización posterior no consulta persistencia.
+    resumed_engine = GameEngine(persistence_provider=provider)
+    resumed_engine.resume_game(game_id)
+    assert resumed_engine.game_belongs_to_user(game_id, "alice") is True
+    assert owner_calls == [game_id]
+
+
+def test_snapshot_rehydration_loads_only_the_tail(monkeypatch):
+    monkeypatch.setattr(engine_module, "create_character_agent", lambda **_: object())
+    monkeypatch.setattr(engine_module, "create_observer_agent", lambda **_: object())
+    monkeypatch.setenv("SESSION_REHYDRATE_TAIL_MESSAGES", "5")
+
+    provider = _InMemoryProvider()
+    game_id = provider.create_game("Partida larga", _build_config())
+    for i in range(30):
+        provider.append_message(game_id, turn_number=i // 2, role="actor", content=f"m{i}", metadata_json={"author": "Livia"})
+    provider.save_game_state(game_id, {"turn": 15, "metadata": {}, "next_action": "user_input", "message_count": 30})
+
+    ranges: list[tuple[int, int]] = []
+    original_range = provider.get_game_messages_range
+    monkeypatch.setattr(
+        provider,
+        "get_game_messages_range",
+        lambda gid, start, end: ranges.append((start, end)) or original_range(gid, start, end),
+    )
+
+    engine = GameEngine(persistence_provider=provider)
+    engine.resume_game(game_id)
+    session = engine._registry[game_id]
+    messages = session.manager.state["messages"]
+    assert session.persisted_messages == 30
+    assert messages.archived == 25
+    assert messages[-1]["content"] == "m29"
+    assert ranges == []
+
+    # /status sin `since` pide el historial entero: se pagina desde persistencia.
+    status = engine.get_status(game_id)
+    assert [m["content"] for m in status["messages"]] == [f"m{i}" for i in range(30)]
+    assert ranges == [(0, 25)]
+
+    engine._persist_session_state(game_id, session)
+    assert len(provider.get_game_messages(game_id)) == 30
+    assert provider.get_game(game_id)["state_json"]["message_count"] == 30
+
+
+def test_full_rehydration_mode_replays_every_message(monkeypatch):
+    monkeypatch.setattr(engine_module, "create_character_agent", lambda **_: object())
+    monkeypatch.setattr(engine_module, "create_observer_agent", lambda **_: object())
+    monkeypatch.setenv("SESSION_REHYDRATE_MODE", "full")
+
+    provider = _InMemoryProvider()
+    game_id = provider.create_game("Partida", _build_config())
+    for i in range(3):
+        provider.append_message(game_id, turn_number=i, role="actor", content=f"m{i}", metadata_json={"author": "Livia"})
+
+    engine = GameEngine(persistence_provider=provider)
+    engine.resume_game(game_id)
+    messages = engine._registry[game_id].manager.state["messages"]
+    assert messages.archived == 0
+    assert [m["content"] for m in messages] == ["m0", "m1", "m2"]
+
+
+def test_resume_for_status_does_not_build_agents(monkeypatch):
+    built: list[str] = []
+    monkeypatch.setattr(engine_module, "create_character_agent", lambda **kw: built.append(kw["name"]) or object())
+    monkeypatch.setattr(engine_module, "create_observer_agent", lambda **_: built.append("observer") or object())
+
+    provider = _InMemoryProvider()
+    config = _build_config()
+    config["actors"].append({"name": "Marco", "personality": "Leal"})
+    game_id = provider.create_game("Partida", config)
+
+    engine = GameEngine(persistence_provider=provider)
+    engine.resume_game(game_id)
+    engine.get_status(game_id)
+    session = engine._registry[game_id]
+    assert built == []
+    assert list(session.character_agents) == ["Livia", "Marco"]
+    assert "Marco" in session.character_agents and built == []
+
+    session.character_agents["Marco"]
+    session.character_agents["Marco"]
+    assert built == ["Marco"]
+    assert session.observer_agent.resolve() is session.observer_agent.resolve()
+    assert built == ["Marco", "observer"]
+
+    # Otra partida con la misma configuración comparte las specs de actor.
+    other_id = provider.create_game("Partida", config)
+    engine.resume_game(other_id)
+    assert engine._registry[other_id].character_agents._specs == session.character_agents._specs
+    assert (
+        engine._registry[other_id].character_agents._specs["Livia"]
+        is session.character_agents._specs["Livia"]
+    )
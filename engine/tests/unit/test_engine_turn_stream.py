@@ -8,6 +8,7 @@ import src.core.engine as engine_module
 from src.core.engine import GameEngine, GameSession
 from src.manager import ConversationManager
 from src.persistence.provider import PersistenceProvider
+from src.queueing.game_channel import LocalGameEventChannel
 
 
 def _utc_now_iso():
@@ -182,3 +183,80 @@ def test_execute_turn_stream_emits_actor_messages_before_next_actor_starts(monke
     assert events[4]["message"]["author"] == "Livia"
     assert events[5]["author"] == "Marco"
     assert events[7]["message"]["author"] == "Marco"
+
+
+def test_execute_turn_stream_publishes_events_and_status_to_channel(monkeypatch):
+    provider = _InMemoryProvider()
+    channel = LocalGameEventChannel()
+    engine = GameEngine(provider, event_channel=channel)
+    game_id = provider.create_game("Partida", {"actors": [{"name": "Livia"}]})
+    engine._registry[game_id] = GameSession(
+        manager=ConversationManager(),
+        character_agents={"Livia": object()},
+        observer_agent=object(),
+        setup={"actors": [{"name": "Livia"}]},
+        max_turns=10,
+        next_action="user_input",
+    )
+    monkeypatch.setattr(engine_module, "trace_interaction", _no_trace)
+
+    def fake_run_one_step(manager, *_args, character_stream_sink=None, event_sink=None, **_kwargs):
+        event_sink({"type": "message_start", "author": "Livia"})
+        character_stream_sink("Ave")
+        manager.add_message("Livia", "Ave, viajero")
+        return {
+            "next_action": "user_input",
+            "game_ended": False,
+            "events": [{"type": "message", "message": dict(manager.state["messages"][-1])}],
+        }
+
+    monkeypatch.setattr(engine_module, "run_one_step", fake_run_one_step)
+    list(engine.execute_turn_stream(game_id, "Hola"))
+
+    # Un cliente que reanuda desde el id 0 recibe todo lo publicado en orden.
+    replay = channel.subscribe(game_id, last_event_id=0, keepalive_seconds=0.1)
+    published = [next(replay) for _ in range(4)]
+    assert [event_id for event_id, _ in published] == [1, 2, 3, 4]
+    assert [event["type"] for _, event in published] == ["message_start", "message_delta", "message", "status"]
+    assert isinstance(published[2][1]["message"]["timestamp"], str)
+    assert published[3][1]["player_can_write"] is True
+    assert published[3][1]["message_count"] == 1
+    assert next(replay) is None
+
+
+def test_status_publish_failure_does_not_fail_committed_turn(monkeypatch):
+    provider = _InMemoryProvider()
+
+    class _StatusFailingChannel(LocalGameEventChannel):
+        def publish(self, game_id, event):
+            if event.get("type") == "status":
+                raise RuntimeError("redis caído")
+            return super().publish(game_id, event)
+
+    engine = GameEngine(provider, event_channel=_StatusFailingChannel())
+    game_id = provider.create_game("Partida", {"actors": [{"name": "Livia"}]})
+    engine._registry[game_id] = GameSession(
+        manager=ConversationManager(),
+        character_agents={"Livia": object()},
+        observer_agent=object(),
+        setup={"actors": [{"name": "Livia"}]},
+        max_turns=10,
+        next_action="user_input",
+    )
+
+    monkeypatch.setattr(engine_module, "trace_interaction", _no_trace)
+
+    def fake_run_one_step(manager, *_args, **_kwargs):
+        manager.add_message("Livia", "Ave, viajero")
+        return {"next_action": "user_input", "game_ended": False, "events": []}
+
+    monkeypatch.setattr(engine_module, "run_one_step", fake_run_one_step)
+    lookups = []
+    get_session = engine._get_session
+    monkeypatch.setattr(engine, "_get_session", lambda gid: lookups.append(gid) or get_session(gid))
+
+    events = list(engine.execute_turn_stream(game_id, "Hola"))
+    assert all(event["type"] != "error" for event in events)
+    assert [m["content"] for m in provider.messages[game_id]] == ["Ave, viajero"]
+    # El evento status se arma desde la sesión: no relee la versión del lease.
+    assert lookups == [game_id]
@@ -0,0 +1,246 @@
+"""Tests del canal de eventos por partida (SSE)."""
+
+import asyncio
+import json
+import threading
+
+from src.queueing import game_channel as gc
+from src.queueing.game_channel import LocalGameEventChannel, RedisGameEventChannel, parse_last_event_id
+
+
+def test_parse_last_event_id():
+    assert parse_last_event_id("7") == 7
+    assert parse_last_event_id(None) is None
+    assert parse_last_event_id("abc") is None
+
+
+def test_local_channel_resumes_from_last_event_id():
+    channel = LocalGameEventChannel(buffer_size=10)
+    for i in range(3):
+        channel.publish("g1", {"type": "message_delta", "delta": str(i)})
+    channel.publish("g2", {"type": "status"})
+
+    items = channel.subscribe("g1", last_event_id=1, keepalive_seconds=0.05)
+    assert next(items) == (2, {"type": "message_delta", "delta": "1"})
+    assert next(items) == (3, {"type": "message_delta", "delta": "2"})
+    assert next(items) is None  # keepalive
+
+
+def test_local_channel_without_last_event_id_only_sees_new_events():
+    channel = LocalGameEventChannel()
+    channel.publish("g1", {"type": "status"})
+    items = channel.subscribe("g1", keepalive_seconds=2)
+    threading.Timer(0.05, lambda: channel.publish("g1", {"type": "game_ended"})).start()
+    assert next(items) == (2, {"type": "game_ended"})
+
+
+def test_local_channel_signals_resync_when_buffer_overflowed():
+    channel = LocalGameEventChannel(buffer_size=2)
+    for i in range(5):
+        channel.publish("g1", {"type": "message_delta", "delta": str(i)})
+    items = channel.subscribe("g1", last_event_id=1, keepalive_seconds=0.05)
+    assert next(items) == (3, {"type": "resync"})
+    assert next(items)[0] == 4
+
+
+class _FakePubSub:
+    def __init__(self, redis):
+        self._redis = redis
+        self.queue = []
+
+    def subscribe(self, channel):
+        self._redis.subscribers.setdefault(channel, []).append(self)
+
+    def get_message(self, timeout=0.0):
+        return self.queue.pop(0) if self.queue else None
+
+    def close(self):
+        pass
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def __getattr__(self, name):
+        return lambda *args: self._ops.append((name, args))
+
+    def execute(self):
+        for name, args in self._ops:
+            getattr(self._redis, name)(*args)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.lists = {}
+        self.subscribers = {}
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def rpush(self, key, value):
+        self.lists.setdefault(key, []).append(value)
+
+    def ltrim(self, key, start, end):
+        self.lists[key] = self.lists[key][start:] if end == -1 else self.lists[key][start : end + 1]
+
+    def lrange(self, key, start, end):
+        return list(self.lists.get(key, []))
+
+    def expire(self, key, seconds):
+        pass
+
+    def publish(self, channel, payload):
+        for sub in self.subscribers.get(channel, []):
+            sub.queue.append({"type": "message", "data": payload})
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        return _FakePubSub(self)
+
+
+class _FakeRedisModule:
+    def __init__(self, client):
+        self.Redis = type("Redis", (), {"from_url": staticmethod(lambda *_a, **_k: client)})
+
+
+def test_redis_channel_replays_buffer_then_streams_live(monkeypatch):
+    client = _FakeRedis()
+    monkeypatch.setattr(gc.importlib, "import_module", lambda _name: _FakeRedisModule(client))
+    publisher = RedisGameEventChannel(buffer_size=3)
+    subscriber = RedisGameEventChannel(buffer_size=3)  # otro worker
+
+    for i in range(4):
+        publisher.publish("g1", {"type": "message_delta", "delta": str(i)})
+    assert len(client.lists["agora:game_events:g1:buffer"]) == 3
+
+    items = subscriber.subscribe("g1", last_event_id=2, keepalive_seconds=0.05)
+    assert next(items) == (3, {"type": "message_delta", "delta": "2"})
+    assert next(items) == (4, {"type": "message_delta", "delta": "3"})
+
+    publisher.publish("g1", {"type": "game_ended"})
+    assert next(items) == (5, {"type": "game_ended"})
+    assert next(items) is None
+
+    stale = subscriber.subscribe("g1", last_event_id=0, keepalive_seconds=0.05)
+    assert next(stale) == (2, {"type": "resync"})
+    assert json.loads(client.lists["agora:game_events:g1:buffer"][0])["id"] == 3
+
+
+def test_local_channel_async_subscriber_is_woken_by_publish_from_thread():
+    channel = LocalGameEventChannel(buffer_size=10)
+    channel.publish("g1", {"type": "status"})
+
+    async def scenario():
+        items = channel.subscribe_async("g1", last_event_id=0, keepalive_seconds=2)
+        assert await items.__anext__() == (1, {"type": "status"})
+        threading.Timer(0.05, lambda: channel.publish("g1", {"type": "game_ended"})).start()
+        assert await items.__anext__() == (2, {"type": "game_ended"})
+        await items.aclose()
+
+    asyncio.run(scenario())
+    assert channel._waiters == {}
+    assert channel._subscribers == {}
+
+
+def test_local_channel_async_keepalive_and_resync():
+    channel = LocalGameEventChannel(buffer_size=2)
+    for i in range(5):
+        channel.publish("g1", {"type": "message_delta", "delta": str(i)})
+
+    async def scenario():
+        items = channel.subscribe_async("g1", last_event_id=1, keepalive_seconds=0.05)
+        got = [await items.__anext__() for _ in range(4)]
+        await items.aclose()
+        return got
+
+    got = asyncio.run(scenario())
+    assert got[0] == (3, {"type": "resync"})
+    assert [item[0] for item in got[1:3]] == [4, 5]
+    assert got[3] is None
+
+
+def test_local_channel_evicts_idle_games_without_subscribers(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(gc.time, "monotonic", lambda: clock[0])
+    channel = LocalGameEventChannel(ttl_seconds=60)
+    channel.publish("idle", {"type": "status"})
+    channel.publish("watched", {"type": "status"})
+    watcher = channel.subscribe("watched", keepalive_seconds=0.01)
+    next(watcher)  # registra el suscriptor
+
+    clock[0] += 120
+    channel.publish("active", {"type": "status"})
+
+    assert "idle" not in channel._buffers and "idle" not in channel._last_ids
+    assert "watched" in channel._last_ids
+    assert "active" in channel._last_ids
+
+    watcher.close()
+    clock[0] += 120
+    channel.publish("active", {"type": "status"})
+    assert "watched" not in channel._last_ids
+
+
+class _AsyncFakePubSub(_FakePubSub):
+    async def subscribe(self, channel):
+        super().subscribe(channel)
+
+    async def get_message(self, timeout=0.0):
+        if not self.queue:
+            await asyncio.sleep(min(timeout, 0.01))
+        return self.queue.pop(0) if self.queue else None
+
+    async def aclose(self):
+        self.closed = True
+
+
+class _AsyncFakeRedis:
+    def __init__(self, sync_client):
+        self._sync = sync_client
+        self.pubsubs = []
+
+    async def get(self, key):
+        return self._sync.get(key)
+
+    async def lrange(self, key, start, end):
+        return self._sync.lrange(key, start, end)
+
+    def pubsub(self, ignore_subscribe_messages=True):
+        pubsub = _AsyncFakePubSub(self._sync)
+        self.pubsubs.append(pubsub)
+        return pubsub
+
+
+def test_redis_channel_async_subscriber_replays_then_streams(monkeypatch):
+    client = _FakeRedis()
+    async_client = _AsyncFakeRedis(client)
+    modules = {"redis": _FakeRedisModule(client), "redis.asyncio": _FakeRedisModule(async_client)}
+    monkeypatch.setattr(gc.importlib, "import_module", lambda name: modules[name])
+    publisher = RedisGameEventChannel(buffer_size=3)
+    subscriber = RedisGameEventChannel(buffer_size=3)
+    for i in range(2):
+        publisher.publish("g1", {"type": "message_delta", "delta": str(i)})
+
+    async def scenario():
+        items = subscriber.subscribe_async("g1", last_event_id=1, keepalive_seconds=0.05)
+        first = await items.__anext__()
+        publisher.publish("g1", {"type": "game_ended"})
+        second = await items.__anext__()
+        third = await items.__anext__()
+        await items.aclose()
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert first == (2, {"type": "message_delta", "delta": "1"})
+    assert second == (3, {"type": "game_ended"})
+    assert third is None
+    assert async_client.pubsubs[0].closed is True
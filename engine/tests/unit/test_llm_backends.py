@@ -0,0 +1,114 @@
+"""Tests del registro de backends LLM por rol y del servidor mock de replays."""
+
+import json
+
+import pytest
+
+from src.agents import deepseek_adapter as da
+from src.agents.llm_backends import DEFAULT_BASE_URL, resolve_backend
+from src.agents.llm_resilience import ResilienceConfig, ResilientCaller
+from src.agents.mock_llm_server import MockLLMServer, load_recordings
+
+
+@pytest.fixture(autouse=True)
+def _clean_llm_env(monkeypatch):
+    for name in ("LLM_BASE_URL", "LLM_API_KEY", "LLM_PROVIDER", "LLM_RECORD_PATH"):
+        monkeypatch.delenv(name, raising=False)
+    for role in ("CHARACTER", "OBSERVER", "GUIONISTA", "NOTARY"):
+        for suffix in ("BASE_URL", "API_KEY", "MODEL", "PROVIDER"):
+            monkeypatch.delenv(f"LLM_{role}_{suffix}", raising=False)
+    monkeypatch.setattr(da, "_resilience", ResilientCaller(ResilienceConfig(), sleep=lambda _s: None))
+
+
+def test_resolve_backend_defaults_to_deepseek(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "sk-test")
+    backend = resolve_backend("character")
+    assert backend.base_url == DEFAULT_BASE_URL
+    assert backend.api_key == "sk-test"
+    assert backend.provider == "deepseek"
+    assert backend.model is None
+
+
+def test_resolve_backend_role_overrides_default(monkeypatch):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "sk-test")
+    monkeypatch.setenv("LLM_BASE_URL", "http://shared:9000/v1/")
+    monkeypatch.setenv("LLM_OBSERVER_BASE_URL", "http://fast:9001/v1")
+    monkeypatch.setenv("LLM_OBSERVER_MODEL", "tiny-model")
+
+    observer = resolve_backend("observer")
+    assert observer.base_url == "http://fast:9001/v1"
+    assert observer.model == "tiny-model"
+    assert observer.provider == "openai_compatible"
+    assert observer.api_key == "not-needed"
+
+    character = resolve_backend("character")
+    assert character.base_url == "http://shared:9000/v1"
+    assert character.model is None
+
+
+def test_resolve_backend_rejects_unknown_role():
+    with pytest.raises(ValueError):
+        resolve_backend("narrador")
+
+
+
+def test_missing_key_error_names_backend_and_role_env_vars(monkeypatch):
+    monkeypatch.delenv("DEEPSEEK_API_KEY", raising=False)
+    backend = resolve_backend("observer")
+    with pytest.raises(ValueError) as exc:
+        da._get_client(backend)
+    message = str(exc.value)
+    assert backend.name in message
+    assert "LLM_OBSERVER_API_KEY o LLM_API_KEY o DEEPSEEK_API_KEY" in message
+
+def test_send_message_routes_role_to_mock_server_and_records(monkeypatch, tmp_path):
+    server = MockLLMServer(
+        [
+            {"model": "tiny-model", "content": "Observador rápido."},
+            {"model": "other", "content": "No debería salir."},
+        ]
+    ).start()
+    record_path = tmp_path / "recorded.jsonl"
+    try:
+        monkeypatch.setenv("LLM_OBSERVER_BASE_URL", server.base_url)
+        monkeypatch.setenv("LLM_OBSERVER_MODEL", "tiny-model")
+        monkeypatch.setenv("LLM_RECORD_PATH", str(record_path))
+
+        out = da.send_message([{"role": "user", "content": "hola"}], role="observer")
+        streamed = "".join(
+            da.send_message([{"role": "user", "content": "hola"}], role="observer", stream=True)
+        )
+    finally:
+        server.stop()
+
+    assert out == "Observador rápido."
+    assert streamed == "Observador rápido."
+    assert server.requests_served == 2
+    recorded = load_recordings(record_path)
+    assert [item["content"] for item in recorded] == ["Observador rápido.", "Observador rápido."]
+    assert recorded[0]["role"] == "observer"
+    assert recorded[0]["model"] == "tiny-model"
+
+
+def test_mock_server_honours_max_tokens_and_replays_round_robin(monkeypatch, tmp_path):
+    recordings_path = tmp_path / "rec.jsonl"
+    recordings_path.write_text(
+        "\n".join(
+            [
+                json.dumps({"content": "uno dos tres cuatro"}),
+                "no es json",
+                json.dumps({"content": "cinco"}),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    server = MockLLMServer(load_recordings(recordings_path)).start()
+    try:
+        monkeypatch.setenv("LLM_BASE_URL", server.base_url)
+        first = da.send_message([{"role": "user", "content": "x"}], max_tokens=2)
+        second = da.send_message([{"role": "user", "content": "x"}])
+    finally:
+        server.stop()
+
+    assert first == "uno dos "
+    assert second == "cinco"
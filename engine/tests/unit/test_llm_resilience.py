@@ -0,0 +1,152 @@
+"""Tests de la capa de resiliencia LLM (reintentos, breaker, hedging)."""
+
+import threading
+import time
+
+import pytest
+
+from src.agents.llm_resilience import (
+    CallStats,
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilienceConfig,
+    ResilientCaller,
+    backoff_delay,
+    is_retryable_error,
+)
+from src.observability import current_user_id, trace_interaction
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_is_retryable_error_classifies_status_and_names():
+    class RateLimitError(Exception):
+        status_code = 429
+
+    class BadRequestError(Exception):
+        status_code = 400
+
+    class APITimeoutError(Exception):
+        pass
+
+    assert is_retryable_error(RateLimitError())
+    assert is_retryable_error(APITimeoutError())
+    assert is_retryable_error(ConnectionError())
+    assert not is_retryable_error(BadRequestError())
+    assert not is_retryable_error(ValueError("x"))
+    assert not is_retryable_error(CircuitOpenError("open"))
+
+
+def test_backoff_delay_is_capped_full_jitter():
+    for attempt in range(1, 8):
+        delay = backoff_delay(attempt, base=0.5, cap=2.0)
+        assert 0.0 <= delay <= min(2.0, 0.5 * 2 ** (attempt - 1))
+
+
+def test_circuit_breaker_opens_then_allows_single_probe():
+    clock = _Clock()
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.now = 10.0
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_caller_stops_retrying_when_breaker_opens():
+    caller = ResilientCaller(
+        ResilienceConfig(max_attempts=5, breaker_failure_threshold=2, breaker_reset_seconds=60),
+        sleep=lambda _s: None,
+    )
+    attempts = {"n": 0}
+
+    def failing():
+        attempts["n"] += 1
+        raise TimeoutError("slow")
+
+    stats = CallStats()
+    with pytest.raises(TimeoutError):
+        caller.call("m", failing, stream=False, stats=stats)
+    assert attempts["n"] == 2
+    assert stats.breaker_state == "open"
+
+    with pytest.raises(CircuitOpenError):
+        caller.call("m", failing, stream=False, stats=CallStats())
+    assert attempts["n"] == 2
+
+
+def test_caller_hedges_slow_calls_after_percentile():
+    caller = ResilientCaller(
+        ResilienceConfig(hedging_enabled=True, hedge_min_samples=3, max_concurrency=4),
+        sleep=lambda _s: None,
+    )
+    tracker = caller.latency_for("m")
+    for _ in range(5):
+        tracker.record(0.01)
+
+    release_primary = threading.Event()
+    calls = {"n": 0}
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            calls["n"] += 1
+            n = calls["n"]
+        if n == 1:
+            release_primary.wait(2)
+            return "primary"
+        return "hedge"
+
+    stats = CallStats()
+    t0 = time.perf_counter()
+    result = caller.call("m", fn, stream=False, stats=stats)
+    release_primary.set()
+
+    assert result == "hedge"
+    assert stats.hedged and stats.hedge_won
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_hedged_calls_run_in_the_caller_context():
+    caller = ResilientCaller(
+        ResilienceConfig(hedging_enabled=True, hedge_min_samples=3, max_concurrency=4),
+        sleep=lambda _s: None,
+    )
+    tracker = caller.latency_for("m")
+    for _ in range(5):
+        tracker.record(0.01)
+
+    release_primary = threading.Event()
+    seen = []
+    lock = threading.Lock()
+
+    def fn():
+        with lock:
+            seen.append(current_user_id())
+            first = len(seen) == 1
+        if first:
+            release_primary.wait(2)
+            return "primary"
+        return "hedge"
+
+    with trace_interaction("g1", "user-42", "g1:turn:1"):
+        result = caller.call("m", fn, stream=False, stats=CallStats())
+    release_primary.set()
+
+    assert result == "hedge"
+    assert seen == ["user-42", "user-42"]
@@ -0,0 +1,163 @@
+"""Tests del rate limiter global y la planificación justa de llamadas LLM."""
+
+import threading
+import time
+
+import pytest
+
+from src.agents.llm_scheduler import (
+    LLMScheduler,
+    LocalRateBudget,
+    RedisRateBudget,
+    SchedulerConfig,
+    estimate_request_tokens,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _GateBudget:
+    """Budget que no concede nada hasta que el test abre cupo."""
+
+    def __init__(self):
+        self.allowed = 0
+        self.lock = threading.Lock()
+
+    def try_acquire(self, requests, tokens):
+        with self.lock:
+            if self.allowed > 0:
+                self.allowed -= 1
+                return 0.0
+        return 0.01
+
+
+def _scheduler(budget):
+    return LLMScheduler(SchedulerConfig(requests_per_minute=60), budget_factory=lambda _key: budget)
+
+
+def _wait_for_depth(scheduler, depth):
+    for _ in range(200):
+        if scheduler.queue_depth("k") == depth:
+            return
+        time.sleep(0.005)
+    raise AssertionError(f"queue depth never reached {depth}")
+
+
+def _enqueue_in_order(scheduler, requests):
+    order = []
+    threads = []
+    for idx, (role, user) in enumerate(requests):
+        def run(role=role, user=user):
+            scheduler.acquire("k", role=role, user_id=user, tokens=10, timeout=2)
+            order.append((role, user))
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        threads.append(thread)
+        _wait_for_depth(scheduler, idx + 1)
+    return order, threads
+
+
+def test_local_budget_refills_per_minute():
+    clock = _Clock()
+    budget = LocalRateBudget(requests_per_minute=2, tokens_per_minute=100, clock=clock)
+    assert budget.try_acquire(1, 40) == 0.0
+    assert budget.try_acquire(1, 40) == 0.0
+    wait = budget.try_acquire(1, 10)
+    assert wait == pytest.approx(30.0)
+
+    clock.now = 30.0
+    assert budget.try_acquire(1, 10) == 0.0
+    # Más tokens que la capacidad se recortan a la capacidad para no bloquear para siempre.
+    clock.now = 90.0
+    assert budget.try_acquire(1, 10_000) == 0.0
+
+
+def test_scheduler_prefers_interactive_roles():
+    budget = _GateBudget()
+    scheduler = _scheduler(budget)
+    order, threads = _enqueue_in_order(
+        scheduler,
+        [("notary", "u1"), ("observer", "u1"), ("character", "u1")],
+    )
+    budget.allowed = 3
+    for thread in threads:
+        thread.join(timeout=2)
+    assert [role for role, _ in order] == ["character", "observer", "notary"]
+
+
+def test_scheduler_is_fair_across_users_within_priority():
+    budget = _GateBudget()
+    scheduler = _scheduler(budget)
+    order, threads = _enqueue_in_order(
+        scheduler,
+        [("observer", "busy"), ("observer", "busy"), ("observer", "busy"), ("observer", "quiet")],
+    )
+    budget.allowed = 4
+    for thread in threads:
+        thread.join(timeout=2)
+    assert [user for _, user in order][:2] == ["busy", "quiet"]
+
+
+def test_scheduler_times_out_and_leaves_queue():
+    scheduler = _scheduler(_GateBudget())
+    with pytest.raises(TimeoutError):
+        scheduler.acquire("k", role="notary", user_id="u", tokens=1, timeout=0.05)
+    assert scheduler.queue_depth("k") == 0
+
+
+def test_scheduler_disabled_without_limits_and_reports_priority():
+    scheduler = LLMScheduler(SchedulerConfig())
+    ticket = scheduler.acquire("k", role="character", user_id="u", tokens=10_000)
+    assert ticket.as_fields() == {"llm_priority": 0, "llm_queue_depth": 0, "llm_queue_wait_ms": 0}
+
+
+
+class _SlowBudget:
+    """Budget que tarda en responder, como un Redis lento."""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def try_acquire(self, requests, tokens):
+        self.release.wait(2)
+        return 0.0
+
+
+def test_slow_budget_does_not_block_other_lanes_or_deadlines():
+    slow = _SlowBudget()
+    budgets = {"slow": slow, "fast": LocalRateBudget(60, 0)}
+    scheduler = LLMScheduler(SchedulerConfig(requests_per_minute=60), budget_factory=budgets.__getitem__)
+    head = threading.Thread(
+        target=lambda: scheduler.acquire("slow", role="character", user_id="u", tokens=1, timeout=5)
+    )
+    head.start()
+    time.sleep(0.05)
+    try:
+        t0 = time.monotonic()
+        scheduler.acquire("fast", role="character", user_id="u", tokens=1, timeout=1)
+        with pytest.raises(TimeoutError):
+            scheduler.acquire("slow", role="notary", user_id="v", tokens=1, timeout=0.1)
+        assert time.monotonic() - t0 < 1.0
+    finally:
+        slow.release.set()
+        head.join(timeout=2)
+    assert scheduler.queue_depth("slow") == 0
+
+
+def test_redis_budget_falls_back_to_local_bucket_when_redis_is_down():
+    pytest.importorskip("redis")
+    budget = RedisRateBudget("redis://127.0.0.1:1/0", "k", 1, 0, timeout_seconds=0.2)
+    assert budget.try_acquire(1, 1) == 0.0
+    assert budget.try_acquire(1, 1) > 0
+
+def test_estimate_request_tokens_counts_prompt_and_output_budget():
+    messages = [{"role": "user", "content": "x" * 40}]
+    assert estimate_request_tokens(messages, 100) == 110
+    assert estimate_request_tokens(messages, None) == 10 + 512
@@ -59,14 +59,17 @@ def test_update_metadata_and_get_metadata(manager: ConversationManager):
     assert manager.get_metadata("missing", "default") == "default"
 
 
-def test_get_visible_history_returns_copy(manager: ConversationManager):
-    """get_visible_history() no es la misma lista que state['messages']."""
+def test_get_visible_history_returns_read_only_snapshot(manager: ConversationManager):
+    """get_visible_history() es una vista de solo lectura estable frente a nuevos mensajes."""
     manager.add_message("A", "msg1")
     visible = manager.get_visible_history()
     assert visible == manager.state["messages"]
     assert visible is not manager.state["messages"]
-    visible.append({"author": "X", "content": "fake", "timestamp": None, "turn": 0})
-    assert len(manager.state["messages"]) == 1
+    with pytest.raises(AttributeError):
+        visible.append({"author": "X", "content": "fake", "timestamp": None, "turn": 0})
+    manager.add_message("B", "msg2")
+    assert len(visible) == 1
+    assert len(manager.state["messages"]) == 2
 
 
 def test_restore_state_replaces_manager_state(manager: ConversationManager):
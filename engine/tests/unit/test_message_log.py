@@ -0,0 +1,141 @@
+"""Tests del registro compacto de mensajes."""
+
+import threading
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from src.context_window import message_tokens
+from src.manager import ConversationManager
+from src.message_log import MessageLog
+
+
+def test_views_present_the_message_interface():
+    log = MessageLog()
+    ts = datetime(2026, 1, 1, 12, 0, 0)
+    log.add("Marco", "hola", timestamp=ts, turn=2, displayed=True)
+    log.append({"author": "Usuario", "content": "adiós", "timestamp": None, "turn": 3})
+
+    first = log[0]
+    assert first["author"] == "Marco"
+    assert first.get("displayed") is True
+    assert first["timestamp"] == ts
+    assert dict(log[-1]) == {
+        "author": "Usuario",
+        "content": "adiós",
+        "timestamp": None,
+        "turn": 3,
+        "displayed": False,
+    }
+    assert [m["content"] for m in log[-2:]] == ["hola", "adiós"]
+    assert log.to_records()[1]["author"] == "Usuario"
+
+
+def test_timestamps_roundtrip_as_integer_offsets():
+    log = MessageLog()
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    stamps = [base, base + timedelta(seconds=3, microseconds=7), datetime(2026, 1, 1), "raro"]
+    for stamp in stamps:
+        log.add("A", "x", timestamp=stamp)
+    assert [m["timestamp"] for m in log] == stamps
+
+
+def test_authors_are_interned_once():
+    log = MessageLog()
+    for i in range(100):
+        log.add("Marco" if i % 2 else "Usuario", str(i))
+    assert len(log._authors) == 2
+    assert log[99]["author"] == "Marco"
+
+
+def test_token_counts_are_cached_in_the_log(monkeypatch):
+    monkeypatch.delenv("LLM_TOKENIZER_PATH", raising=False)
+    log = MessageLog()
+    log.add("A", "x" * 40)
+    tokens = message_tokens(log[0])
+    assert log[0].cached_token_count("heuristic") == tokens
+    assert log[0].cached_token_count("otro") is None
+
+
+def test_manager_restore_state_builds_a_log_with_equal_messages():
+    manager = ConversationManager()
+    records = [{"author": "B", "content": "msg2", "timestamp": None, "turn": 2, "displayed": False}]
+    manager.restore_state({"messages": records, "turn": 2, "metadata": {}})
+    assert isinstance(manager.state["messages"], MessageLog)
+    assert manager.state["messages"] == records
+
+
+def test_log_uses_less_memory_than_message_dicts():
+    contents = [f"contenido {i}" for i in range(2000)]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    dicts = [
+        {"author": "Marco", "content": c, "timestamp": datetime.now(), "turn": i, "displayed": False}
+        for i, c in enumerate(contents)
+    ]
+    dict_bytes = tracemalloc.get_traced_memory()[0] - before
+
+    before = tracemalloc.get_traced_memory()[0]
+    log = MessageLog()
+    for i, c in enumerate(contents):
+        log.add("Marco", c, timestamp=datetime.now(), turn=i)
+    log_bytes = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    assert len(dicts) == len(log)
+    assert log_bytes * 3 < dict_bytes
+
+
+def test_archived_prefix_is_paged_in_only_when_indexed():
+    history = [{"author": "A", "content": str(i), "timestamp": None, "turn": i} for i in range(10)]
+    calls = []
+
+    def _load(start, end):
+        calls.append((start, end))
+        return history[start:end]
+
+    log = MessageLog.with_archive(history[7:], archived=7, loader=_load, page_size=3)
+    assert len(log) == 10
+    assert [m["content"] for m in log[-3:]] == ["7", "8", "9"]
+    log.add("B", "10")
+    assert calls == []
+
+    assert log[5]["content"] == "5"
+    assert calls == [(4, 7)] and log.archived == 4
+    assert [m["content"] for m in log] == [str(i) for i in range(11)]
+    assert calls == [(4, 7), (0, 4)] and log.archived == 0
+
+
+def test_manager_keeps_a_lazily_archived_log():
+    log = MessageLog.with_archive([{"author": "A", "content": "z"}], archived=5, loader=lambda s, e: [])
+    manager = ConversationManager()
+    manager.restore_state({"messages": log, "turn": 1, "metadata": {}})
+    assert manager.state["messages"] is log
+    assert len(manager.get_full_history()) == 6
+
+
+
+def test_paging_in_the_archive_keeps_messages_added_meanwhile():
+    log = None
+    armed = False
+    writers = []
+
+    class _Record(dict):
+        def get(self, key, default=None):
+            if key == "author" and armed and not writers:
+                # El turno escribe desde otro hilo mientras se reconstruyen las columnas.
+                writer = threading.Thread(target=log.add, args=("B", "nuevo"))
+                writers.append(writer)
+                writer.start()
+                writer.join(0.2)
+            return super().get(key, default)
+
+    history = [_Record(author="A", content=str(i), timestamp=None, turn=i) for i in range(6)]
+    log = MessageLog.with_archive(history[3:], archived=3, loader=lambda s, e: history[s:e])
+    view = log[4]
+    armed = True
+    assert log[0]["content"] == "0"
+    writers[0].join()
+    assert log.archived == 0
+    assert [m["content"] for m in log] == [*map(str, range(6)), "nuevo"]
+    assert view["content"] == "4"
@@ -0,0 +1,76 @@
+"""Tests de la cadencia adaptativa de evaluación de misión del observer."""
+
+from unittest.mock import patch
+
+from src.agents.mission_cadence import MissionEvalCadence, updated_cadence_stats
+from src.agents.observer import ObserverAgent
+from src.player_identity import INTERNAL_PLAYER_AUTHOR
+
+_MISSION = "Conseguir que Marco revele la contraseña del archivo"
+
+
+def _state(turn, content="Hace frío esta noche.", metadata=None):
+    return {
+        "messages": [{"author": INTERNAL_PLAYER_AUTHOR, "content": content, "timestamp": None, "turn": turn}],
+        "turn": turn,
+        "metadata": dict(metadata or {}),
+    }
+
+
+def test_always_mode_evaluates_every_turn():
+    assert MissionEvalCadence().decide(_state(0), _MISSION) == (True, "always")
+
+
+def test_adaptive_skips_early_turns_and_follows_cadence():
+    cadence = MissionEvalCadence(mode="adaptive", min_turn=3, every=2)
+    assert cadence.decide(_state(1), _MISSION) == (False, "before_min_turn")
+    assert cadence.decide(_state(3), _MISSION) == (True, "cadence")
+    evaluated_at_3 = {"mission_eval_cadence": {"last_evaluated_turn": 3}}
+    assert cadence.decide(_state(4, metadata=evaluated_at_3), _MISSION) == (False, "cadence_wait")
+    assert cadence.decide(_state(5, metadata=evaluated_at_3), _MISSION) == (True, "cadence")
+
+
+def test_adaptive_signals_force_early_evaluation():
+    cadence = MissionEvalCadence(mode="adaptive", min_turn=5, every=3)
+    notary = {"notary_mission_progress": {"status": "advanced"}}
+    assert cadence.decide(_state(1, metadata=notary), _MISSION) == (True, "notary_progress")
+    assert cadence.decide(_state(1, "Marco, dime ya la contrasena del archivo"), _MISSION) == (
+        True,
+        "mission_keywords",
+    )
+
+
+def test_cadence_stats_track_detection_delay():
+    stats = updated_cadence_stats(None, evaluated=False, turn=1)
+    stats = updated_cadence_stats(stats, evaluated=False, turn=2)
+    stats = updated_cadence_stats(stats, evaluated=True, turn=3)
+    assert stats == {
+        "evaluated": 1,
+        "skipped": 2,
+        "skipped_since_eval": 0,
+        "last_evaluated_turn": 3,
+        "detection_delay_turns": 2,
+    }
+
+
+def test_observer_process_skips_mission_call_and_reuses_last_evaluation(monkeypatch):
+    monkeypatch.setenv("OBSERVER_MISSION_EVAL_CADENCE", "adaptive")
+    monkeypatch.setenv("OBSERVER_MISSION_EVAL_MIN_TURN", "3")
+    monkeypatch.setenv("OBSERVER_PARALLEL_EVAL", "false")
+    agent = ObserverAgent(actor_names=["Marco"], player_mission=_MISSION)
+    monkeypatch.setattr(
+        agent,
+        "evaluate_continuation",
+        lambda _state: {"needs_response": True, "who_should_respond": "character", "reason": "ok"},
+    )
+    previous = {"player_mission_achieved": False, "reasoning": "Nada aún."}
+    with patch.object(agent, "evaluate_missions") as mocked_missions, patch(
+        "src.agents.observer.emit_event"
+    ) as mocked_emit:
+        out = agent.process(_state(1, metadata={"last_mission_evaluation": previous}))
+
+    mocked_missions.assert_not_called()
+    assert out["mission_evaluation"] == previous
+    assert out["mission_evaluated"] is False
+    assert out["mission_eval_cadence"]["skipped"] == 1
+    assert mocked_emit.call_args.kwargs["metadata"]["status"] == "skipped"
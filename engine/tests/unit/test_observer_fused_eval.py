@@ -0,0 +1,80 @@
+"""Tests de la evaluación fusionada (continuación + misión en una llamada) del ObserverAgent."""
+
+import json
+from unittest.mock import patch
+
+from src.agents.observer import ObserverAgent
+from src.player_identity import INTERNAL_PLAYER_AUTHOR
+
+
+def _state(content="Hablemos del puerto."):
+    return {
+        "messages": [{"author": INTERNAL_PLAYER_AUTHOR, "content": content, "timestamp": None, "turn": 1}],
+        "turn": 1,
+        "metadata": {"player_name": "alice"},
+    }
+
+
+def _agent(monkeypatch):
+    monkeypatch.setenv("OBSERVER_FUSED_EVAL", "true")
+    monkeypatch.setenv("OBSERVER_CONTINUATION_RULES", "off")
+    return ObserverAgent(actor_names=["Marco", "Berenice"], player_mission="Conseguir el mapa")
+
+
+def test_process_fused_uses_single_llm_call(monkeypatch):
+    agent = _agent(monkeypatch)
+    fused = json.dumps(
+        {
+            "continuation": {"needs_response": True, "who_should_respond": "Berenice", "reason": "Le toca."},
+            "mission": {"player_mission_achieved": False, "reasoning": "Aún no tiene el mapa."},
+        }
+    )
+    with patch("src.agents.observer.send_message", return_value=f"```json\n{fused}\n```") as mocked_send:
+        out = agent.process(_state())
+
+    assert mocked_send.call_count == 1
+    assert mocked_send.call_args.kwargs["max_tokens"] == agent._max_output_tokens * 2
+    prompt = mocked_send.call_args.args[0]
+    assert "Conseguir el mapa" in prompt[1]["content"]
+    assert out["continuation_decision"]["who_should_respond"] == "Berenice"
+    assert out["mission_evaluation"] == {
+        "player_mission_achieved": False,
+        "reasoning": "Aún no tiene el mapa.",
+    }
+
+
+def test_fused_invalid_part_falls_back_to_individual_call(monkeypatch):
+    agent = _agent(monkeypatch)
+    fused = json.dumps({"continuation": {"needs_response": False, "who_should_respond": "none", "reason": "Pausa."}})
+    mission = json.dumps({"player_mission_achieved": True, "reasoning": "Tiene el mapa."})
+    with patch("src.agents.observer.send_message", side_effect=[fused, mission]) as mocked_send:
+        continuation, evaluation = agent.evaluate_turn(_state())
+
+    assert mocked_send.call_count == 2
+    assert continuation["who_should_respond"] == "none"
+    assert evaluation["player_mission_achieved"] is True
+
+
+def test_fused_unparseable_response_uses_both_individual_calls(monkeypatch):
+    agent = _agent(monkeypatch)
+    continuation = json.dumps({"needs_response": True, "who_should_respond": "Marco", "reason": "Marco."})
+    mission = json.dumps({"player_mission_achieved": False, "reasoning": "No."})
+    with patch("src.agents.observer.send_message", side_effect=["no es json", continuation, mission]) as mocked_send:
+        decision, evaluation = agent.evaluate_turn(_state())
+
+    assert mocked_send.call_count == 3
+    assert decision["who_should_respond"] == "Marco"
+    assert evaluation["reasoning"] == "No."
+
+
+def test_fused_skips_llm_for_locally_resolved_continuation(monkeypatch):
+    agent = _agent(monkeypatch)
+    monkeypatch.setenv("OBSERVER_CONTINUATION_RULES", "on")
+    mission = json.dumps({"player_mission_achieved": False, "reasoning": "No."})
+    with patch("src.agents.observer.send_message", return_value=mission) as mocked_send:
+        decision, evaluation = agent.evaluate_turn(_state("Marco, ¿tienes el mapa?"))
+
+    assert mocked_send.call_count == 1
+    assert "continuation" not in mocked_send.call_args.args[0][0]["content"]
+    assert decision["who_should_respond"] == "Marco"
+    assert evaluation["reasoning"] == "No."
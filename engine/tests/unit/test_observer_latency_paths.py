@@ -1,6 +1,7 @@
 """Tests de rutas rápidas de latencia del ObserverAgent."""
 
 from src.agents.observer import ObserverAgent
+from src.observability import current_user_id, trace_interaction
 
 
 def test_evaluate_continuation_fast_path_non_user(monkeypatch):
@@ -45,3 +46,31 @@ def test_process_user_message_combines_continuation_and_mission(monkeypatch):
     assert out["continuation_decision"]["who_should_respond"] == "Alice"
     assert out["mission_evaluation"]["player_mission_achieved"] is False
     assert out["game_ended"] is False
+
+
+def test_parallel_eval_threads_keep_trace_user_id(monkeypatch):
+    agent = ObserverAgent(actor_names=["Alice"], player_mission="x")
+    monkeypatch.setenv("OBSERVER_PARALLEL_EVAL", "true")
+    monkeypatch.delenv("OBSERVER_FUSED_EVAL", raising=False)
+    seen = {}
+
+    def _continuation(_state):
+        seen["continuation"] = current_user_id()
+        return {"needs_response": True, "who_should_respond": "Alice", "reason": "ok"}
+
+    def _missions(_state):
+        seen["missions"] = current_user_id()
+        return {"player_mission_achieved": False, "reasoning": "pendiente"}
+
+    monkeypatch.setattr(agent, "evaluate_continuation", _continuation)
+    monkeypatch.setattr(agent, "evaluate_missions", _missions)
+    state = {
+        "messages": [{"author": "Usuario", "content": "¿Qué pasa?", "timestamp": None, "turn": 1}],
+        "turn": 1,
+        "metadata": {},
+    }
+    with trace_interaction("g1", "user-42", "g1:turn:1"):
+        agent.process(state)
+
+    # El scheduler de LLM lee user_id del contexto para repartir de forma justa.
+    assert seen == {"continuation": "user-42", "missions": "user-42"}
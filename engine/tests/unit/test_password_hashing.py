@@ -0,0 +1,121 @@
+"""Tests del pool acotado de hashing de passwords."""
+
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import password_hashing as ph
+from src.api import routes as routes_module
+from src.api.app import app
+from src.api import auth as auth_module
+from src.password_hashing import (
+    PasswordHashingOverloadedError,
+    PasswordHashingPool,
+    PasswordHashingUnavailableError,
+)
+
+
+def test_process_pool_hashes_and_verifies():
+    pool = PasswordHashingPool(mode="process", workers=1, max_pending=2)
+    try:
+        hashed = pool.run("hash", ph.hash_password_inline, "secret123")
+        assert pool.run("verify", ph.verify_password_inline, "secret123", hashed) is True
+        assert pool.run("verify", ph.verify_password_inline, "otra", hashed) is False
+        assert pool.pending == 0
+    finally:
+        pool.shutdown()
+
+
+def test_pool_rejects_when_queue_is_full(monkeypatch):
+    metrics = []
+    monkeypatch.setattr(ph, "_emit_metric", lambda *args: metrics.append(args))
+    pool = PasswordHashingPool(mode="thread", workers=1, max_pending=1)
+    started, release = threading.Event(), threading.Event()
+
+    def _slow():
+        started.set()
+        release.wait(2)
+        return "ok"
+
+    worker = threading.Thread(target=lambda: pool.run("hash", _slow))
+    worker.start()
+    started.wait(2)
+    try:
+        with pytest.raises(PasswordHashingOverloadedError):
+            pool.run("verify", lambda: True)
+    finally:
+        release.set()
+        worker.join()
+        pool.shutdown()
+    assert [(m[0], m[3]) for m in metrics] == [("verify", "overloaded"), ("hash", "ok")]
+    assert pool.pending == 0
+
+
+def test_timed_out_operation_keeps_counting_until_it_finishes(monkeypatch):
+    metrics = []
+    monkeypatch.setattr(ph, "_emit_metric", lambda *args: metrics.append(args))
+    pool = PasswordHashingPool(mode="thread", workers=1, max_pending=2, timeout_seconds=0.1)
+    release = threading.Event()
+    try:
+        with pytest.raises(PasswordHashingUnavailableError):
+            pool.run("verify", lambda: release.wait(2))
+        assert pool.pending == 1  # el worker sigue ocupado
+        release.set()
+        deadline = time.monotonic() + 2
+        while pool.pending and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert pool.pending == 0
+    finally:
+        release.set()
+        pool.shutdown()
+    assert metrics[0][3] == "timeout"
+
+
+def test_broken_pool_is_replaced_and_reported_as_unavailable(monkeypatch):
+    monkeypatch.setattr(ph, "_emit_metric", lambda *args: None)
+    pool = PasswordHashingPool(mode="thread", workers=1, max_pending=2)
+
+    class _BrokenExecutor:
+        def submit(self, *_args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, **_kwargs):
+            pass
+
+    pool._executor = _BrokenExecutor()
+    try:
+        with pytest.raises(PasswordHashingUnavailableError):
+            pool.run("verify", lambda: True)
+        assert pool.pending == 0
+        assert pool.run("verify", lambda: True) is True  # pool nuevo
+    finally:
+        pool.shutdown()
+
+
+def test_verify_password_propagates_unavailable_instead_of_false(monkeypatch):
+    class _TimedOutPool:
+        def run(self, *_args):
+            raise PasswordHashingUnavailableError("timeout")
+
+    monkeypatch.setattr(auth_module, "get_password_hashing_pool", lambda: _TimedOutPool())
+    with pytest.raises(PasswordHashingOverloadedError):
+        auth_module.verify_password("secret123", "$bcrypt-sha256$whatever")
+
+
+def test_verify_password_returns_false_for_malformed_hash(monkeypatch):
+    monkeypatch.setattr(ph, "_emit_metric", lambda *args: None)
+    monkeypatch.setattr(auth_module, "get_password_hashing_pool", lambda: PasswordHashingPool(mode="inline"))
+    assert auth_module.verify_password("secret123", "not-a-hash") is False
+
+
+def test_login_answers_503_when_hashing_is_saturated(monkeypatch):
+    def _overloaded(_username, _password):
+        raise PasswordHashingOverloadedError("busy")
+
+    monkeypatch.setattr(routes_module, "authenticate_user", _overloaded)
+    res = TestClient(app).post("/auth/login", json={"username": "alice", "password": "secret123"})
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
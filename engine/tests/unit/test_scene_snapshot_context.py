@@ -0,0 +1,87 @@
+"""Tests del modo de contexto basado en snapshots del notario."""
+
+from src.agents.character import CharacterAgent
+from src.agents.observer import ObserverAgent
+from src.agents.scene_prompt_context import build_scene_snapshot_block, select_context_messages
+from src.player_identity import INTERNAL_PLAYER_AUTHOR
+
+_SNAPSHOT = {
+    "version_turn": 3,
+    "based_on_message_count": 8,
+    "summary_text": "Marco y el jugador discuten sobre el puerto.",
+    "facts_json": [
+        {"kind": "fact", "summary": "Marco esconde una llave."},
+        {"kind": "mission_signal", "summary": "El jugador se acerca al mapa."},
+    ],
+    "mission_progress_json": {"status": "advanced", "reason": "Ya sabe dónde está el mapa."},
+    "open_threads_json": ["¿Quién robó el barco?"],
+}
+
+
+def _state(count, snapshot=_SNAPSHOT):
+    authors = [INTERNAL_PLAYER_AUTHOR, "Marco"]
+    messages = [
+        {"author": authors[i % 2], "content": f"mensaje {i}", "timestamp": None, "turn": i // 2}
+        for i in range(count)
+    ]
+    metadata = {"player_name": "alice"}
+    if snapshot is not None:
+        metadata["scene_snapshot"] = snapshot
+    return {"messages": messages, "turn": count // 2, "metadata": metadata}
+
+
+def test_raw_mode_ignores_snapshot(monkeypatch):
+    monkeypatch.delenv("AGENT_CONTEXT_MODE", raising=False)
+    block, messages = select_context_messages(_state(20), 12)
+    assert block == ""
+    assert len(messages) == 12
+
+
+def test_snapshot_mode_sends_summary_and_tail_only(monkeypatch):
+    monkeypatch.setenv("AGENT_CONTEXT_MODE", "snapshot")
+    block, messages = select_context_messages(_state(11), 12)
+    assert "Marco y el jugador discuten" in block
+    assert "Marco esconde una llave." in block
+    assert "mission_signal" not in block and "mapa" not in block
+    assert [m["content"] for m in messages] == ["mensaje 8", "mensaje 9", "mensaje 10"]
+
+
+def test_snapshot_mode_keeps_min_recent_and_caps_stale_tail(monkeypatch):
+    monkeypatch.setenv("AGENT_CONTEXT_MODE", "snapshot")
+    _, fresh = select_context_messages(_state(8), 12)
+    assert [m["content"] for m in fresh] == ["mensaje 6", "mensaje 7"]
+    _, stale = select_context_messages(_state(40), 12)
+    assert len(stale) == 12
+
+
+def test_snapshot_mode_falls_back_without_valid_snapshot(monkeypatch):
+    monkeypatch.setenv("AGENT_CONTEXT_MODE", "snapshot")
+    block, messages = select_context_messages(_state(5, snapshot=None), 3)
+    assert block == "" and len(messages) == 3
+    ahead = dict(_SNAPSHOT, based_on_message_count=50)
+    block, messages = select_context_messages(_state(5, snapshot=ahead), 3)
+    assert block == "" and len(messages) == 3
+
+
+def test_observer_block_includes_mission_progress():
+    block = build_scene_snapshot_block(_SNAPSHOT, include_mission_progress=True)
+    assert "El jugador se acerca al mapa." in block
+    assert "Progreso de la misión del jugador: advanced" in block
+
+
+def test_character_prompt_uses_snapshot_block(monkeypatch):
+    monkeypatch.setenv("AGENT_CONTEXT_MODE", "snapshot")
+    agent = CharacterAgent(name="Marco", personality="Desconfiado")
+    messages = agent._build_messages(_state(10))
+    assert messages[1]["role"] == "system"
+    assert messages[1]["content"].startswith("Resumen de la escena")
+    assert len(messages) == 2 + 2
+
+
+def test_observer_mission_context_uses_snapshot(monkeypatch):
+    monkeypatch.setenv("AGENT_CONTEXT_MODE", "snapshot")
+    agent = ObserverAgent(actor_names=["Marco"], player_mission="Conseguir el mapa")
+    context_text, player_name = agent._mission_context(_state(10))
+    assert player_name == "alice"
+    assert "Progreso de la misión del jugador: advanced" in context_text
+    assert "mensaje 7" not in context_text and "mensaje 9" in context_text
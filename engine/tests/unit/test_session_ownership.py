@@ -0,0 +1,260 @@
+"""Tests de propiedad de sesiones entre workers (leases por partida)."""
+
+import threading
+import uuid
+
+import pytest
+from fastapi.testclient import TestClient
+
+import src.core.engine as engine_module
+from src.api import routes as routes_module
+from src.api.app import app
+from src.api.schemas import AuthUserResponse
+from src.core import session_ownership as so
+from src.core.engine import GameEngine
+from src.core.session_ownership import RedisSessionOwnership, SessionOwnedElsewhereError
+from src.persistence.provider import PersistenceProvider
+from src.queueing.game_channel import LocalGameEventChannel
+
+
+class _InMemoryProvider(PersistenceProvider):
+    def __init__(self):
+        self.games: dict[str, dict] = {}
+        self.messages: dict[str, list[dict]] = {}
+
+    def create_game(self, title, config_json, username=None, game_mode="custom", **_kwargs) -> str:
+        game_id = str(uuid.uuid4())
+        self.games[game_id] = {
+            "id": game_id,
+            "title": title,
+            "user": username or "usuario",
+            "config_json": dict(config_json),
+            "state_json": {"turn": 0, "metadata": {}, "next_action": "user_input"},
+        }
+        self.messages[game_id] = []
+        return game_id
+
+    def save_game_state(self, game_id, state_json):
+        self.games[game_id]["state_json"] = dict(state_json)
+
+    def append_message(self, game_id, turn_number, role, content, metadata_json=None):
+        self.messages[game_id].append(
+            {"turn_number": turn_number, "role": role, "content": content, "metadata_json": metadata_json or {}}
+        )
+
+    def get_game(self, game_id):
+        if game_id not in self.games:
+            raise KeyError(game_id)
+        return dict(self.games[game_id])
+
+    def get_game_messages(self, game_id):
+        return list(self.messages[game_id])
+
+    def list_games_for_user(self, username):
+        return [g for g in self.games.values() if g.get("user") == username]
+
+    def create_feedback(self, game_id, user_id, feedback_text):
+        return str(uuid.uuid4())
+
+    def list_feedback(self, limit=500):
+        return []
+
+    def enqueue_domain_event(self, event_type, aggregate_type, aggregate_id, payload_json):
+        return str(uuid.uuid4())
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def __getattr__(self, name):
+        return lambda *args: self._ops.append((name, args))
+
+    def execute(self):
+        return [getattr(self._redis, name)(*args) for name, args in self._ops]
+
+
+class _FakeRedis:
+    """SET NX PX / GET, los dos scripts compare-and-set de los leases e INCR de la versión."""
+
+    def __init__(self):
+        self.values = {}
+
+    def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+    def expire(self, key, seconds):
+        return True
+
+    def pipeline(self):
+        return _FakePipeline(self)
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def eval(self, script, _numkeys, key, worker, *_args):
+        if self.values.get(key) != worker:
+            return 0
+        if "DEL" in script:
+            del self.values[key]
+        return 1
+
+
+class _FakeRedisModule:
+    def __init__(self, client):
+        self.Redis = type("Redis", (), {"from_url": staticmethod(lambda *_a, **_k: client)})
+
+
+def _config():
+    return {
+        "player_mission": "Descubrir al culpable",
+        "actors": [{"name": "Livia", "personality": "Calculadora", "mission": "Ocultar", "background": "Senadora"}],
+    }
+
+
+@pytest.fixture
+def workers(monkeypatch):
+    monkeypatch.setattr(engine_module, "create_character_agent", lambda **_: object())
+    monkeypatch.setattr(engine_module, "create_observer_agent", lambda **_: object())
+    client = _FakeRedis()
+    monkeypatch.setattr(so.importlib, "import_module", lambda _name: _FakeRedisModule(client))
+    provider = _InMemoryProvider()
+    engines = [
+        GameEngine(
+            persistence_provider=provider,
+            event_channel=LocalGameEventChannel(),
+            ownership=RedisSessionOwnership(worker_id=name, handoff_wait_seconds=0.3),
+        )
+        for name in ("w1", "w2")
+    ]
+    return provider, client, engines
+
+
+def _write(engine, game_id, content):
+    """Escritura como la de un turno: lease tomado, mensaje nuevo y persistencia."""
+    with engine._hold_lease(game_id):
+        session = engine._get_session(game_id)
+        session.manager.add_message("Livia", content)
+        engine._persist_session_state(game_id, session)
+
+
+def test_reads_do_not_hold_the_lease(workers):
+    provider, client, (w1, w2) = workers
+    game_id = provider.create_game("Partida", _config())
+
+    assert w1.resume_game(game_id)["loaded_from_memory"] is False
+    assert f"agora:session_owner:{game_id}" not in client.values
+    assert w2.get_status(game_id)["messages"] == []
+    assert w1.resume_game(game_id)["loaded_from_memory"] is True
+
+
+def test_game_hands_off_between_workers_after_each_write(workers):
+    provider, client, (w1, w2) = workers
+    game_id = provider.create_game("Partida", _config())
+    w1.get_status(game_id)
+    w2.get_status(game_id)
+
+    _write(w1, game_id, "Primero en w1.")
+    assert f"agora:session_owner:{game_id}" not in client.values
+    # w2 tenía una copia de la versión anterior: la descarta y rehidrata.
+    assert [m["content"] for m in w2.get_status(game_id)["messages"]] == ["Primero en w1."]
+
+    _write(w2, game_id, "Después en w2.")
+    assert [m["content"] for m in w1.get_status(game_id)["messages"]] == ["Primero en w1.", "Después en w2."]
+    assert [m["content"] for m in provider.messages[game_id]] == ["Primero en w1.", "Después en w2."]
+
+
+def test_writer_waits_for_handoff_then_gives_up_with_owner_hint(workers):
+    provider, client, (w1, w2) = workers
+    game_id = provider.create_game("Partida", _config())
+    key = f"agora:session_owner:{game_id}"
+
+    client.values[key] = "w1"  # w1 está a mitad de turno
+    with pytest.raises(SessionOwnedElsewhereError) as exc:
+        w2.tick(game_id)
+    assert exc.value.owner == "w1"
+
+    # Si w1 termina dentro de la espera, w2 toma el lease y escribe.
+    timer = threading.Timer(0.05, lambda: client.values.pop(key, None))
+    timer.start()
+    _write(w2, game_id, "Tras el handoff.")
+    timer.join()
+    assert [m["content"] for m in provider.messages[game_id]] == ["Tras el handoff."]
+
+
+def test_release_session_flushes_pending_messages(workers):
+    provider, client, (w1, w2) = workers
+    game_id = provider.create_game("Partida", _config())
+    w1.resume_game(game_id)
+    w1._registry[game_id].manager.add_message("Livia", "Os escucho.")
+
+    assert w1.release_session(game_id) is True
+    assert game_id not in w1._registry
+    assert f"agora:session_owner:{game_id}" not in client.values
+    assert [m["content"] for m in provider.messages[game_id]] == ["Os escucho."]
+
+    status = w2.get_status(game_id)
+    assert [m["content"] for m in status["messages"]] == ["Os escucho."]
+    assert w1.release_session(game_id) is False
+
+
+def test_lost_lease_discards_memory_and_blocks_writes(workers):
+    provider, client, (w1, _w2) = workers
+    game_id = provider.create_game("Partida", _config())
+    w1.resume_game(game_id)
+    session = w1._registry[game_id]
+    client.values[f"agora:session_owner:{game_id}"] = "w2"  # expiró y lo tomó otro worker
+
+    session.manager.add_message("Livia", "Mensaje huérfano")
+    with pytest.raises(SessionOwnedElsewhereError):
+        w1._persist_session_state(game_id, session)
+    assert provider.messages[game_id] == []
+    assert game_id not in w1._registry
+
+
+def test_api_answers_409_with_owner_hint():
+    class _OwnedElsewhereEngine:
+        def game_belongs_to_user(self, _session_id, _username):
+            return True
+
+        def get_status(self, session_id):
+            raise SessionOwnedElsewhereError(session_id, "w2")
+
+    app.dependency_overrides[routes_module.get_engine] = lambda: _OwnedElsewhereEngine()
+    app.dependency_overrides[routes_module.get_current_user] = lambda: AuthUserResponse(
+        id="u1", username="alice", is_active=True
+    )
+    try:
+        res = TestClient(app).get("/game/status", params={"session_id": "sid-1"})
+        assert res.status_code == 409
+        assert res.headers["X-Agora-Session-Owner"] == "w2"
+        assert res.headers["Retry-After"] == "1"
+    finally:
+        app.dependency_overrides.clear()
+
+
+def test_release_session_skips_games_with_a_turn_in_progress(workers):
+    provider, _client, (w1, _w2) = workers
+    game_id = provider.create_game("Partida", _config())
+    w1.resume_game(game_id)
+    w1._registry[game_id].manager.add_message("Livia", "Os escucho.")
+
+    w1._turn_locks.acquire(game_id)  # un turno sigue corriendo en otro hilo
+    try:
+        assert w1.release_session(game_id) is True
+        assert game_id in w1._registry
+        assert provider.messages[game_id] == []
+    finally:
+        w1._turn_locks.release(game_id)
+
+    assert w1.release_session(game_id) is True
+    assert game_id not in w1._registry
+    assert [m["content"] for m in provider.messages[game_id]] == ["Os escucho."]
@@ -0,0 +1,33 @@
+import pytest
+
+from src.text_limits import StreamingOutputTruncator, truncate_agent_output
+
+
+def _stream(text: str, chunk: int = 1) -> tuple[str, StreamingOutputTruncator]:
+    truncator = StreamingOutputTruncator()
+    emitted = ""
+    for start in range(0, len(text), chunk):
+        emitted += truncator.feed(text[start : start + chunk])
+        if truncator.done:
+            break
+    emitted += truncator.finish()
+    return emitted, truncator
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "a" * 45 + " " + "b" * 30 + "\n" + "c" * 150 + "\n" + "d" * 100,
+        "Primera frase corta.\nSegunda\tcon tabulador " + "x" * 300,
+        "palabra\t" * 60,
+        "línea uno\nlínea dos\n\nlínea tres " * 20,
+        "x" * 10 + " " + "y" * 400,
+        "Hola. ¿Qué tal? Bien… gracias!",
+    ],
+)
+@pytest.mark.parametrize("chunk", [1, 3, 17])
+def test_streamed_text_matches_truncate_agent_output(text, chunk):
+    emitted, truncator = _stream(text, chunk)
+    expected = truncate_agent_output(text)
+    assert emitted == expected
+    assert truncator.text == expected
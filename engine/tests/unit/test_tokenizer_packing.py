@@ -0,0 +1,72 @@
+"""Tests del tokenizer offline y del empaquetado de contexto por tokens."""
+
+import json
+
+from src.context_window import message_tokens, pack_messages
+from src.notary import processor as notary_processor
+from src.notary.processor import LLMNotaryProcessor
+from src.tokenizer import BPETokenizer, HeuristicTokenizer, count_tokens, get_tokenizer
+
+
+def _write_tokenizer(tmp_path):
+    # "Ġ" representa el espacio en los vocabularios BPE a nivel de byte.
+    vocab = {c: i for i, c in enumerate(["h", "o", "l", "a", "Ġ", "ho", "la", "hola", "Ġhola"])}
+    merges = ["h o", "l a", "ho la", "Ġ hola"]
+    path = tmp_path / "tokenizer.json"
+    path.write_text(json.dumps({"model": {"type": "BPE", "vocab": vocab, "merges": merges}}), encoding="utf-8")
+    return str(path)
+
+
+def test_bpe_tokenizer_applies_merges(tmp_path):
+    tokenizer = BPETokenizer.from_file(_write_tokenizer(tmp_path))
+    assert tokenizer.count("hola") == 1
+    assert tokenizer.count("hola hola") == 2
+    assert tokenizer.count("hol") == 2  # "ho" + "l"
+
+
+def test_get_tokenizer_uses_path_and_falls_back(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_TOKENIZER_PATH", _write_tokenizer(tmp_path))
+    assert isinstance(get_tokenizer(), BPETokenizer)
+    assert count_tokens("hola hola hola") == 3
+
+    monkeypatch.setenv("LLM_TOKENIZER_PATH", str(tmp_path / "missing.json"))
+    assert isinstance(get_tokenizer(), HeuristicTokenizer)
+    monkeypatch.delenv("LLM_TOKENIZER_PATH")
+    assert count_tokens("abcdefgh") == 2
+
+
+def test_message_tokens_are_cached_on_the_record(monkeypatch):
+    monkeypatch.delenv("LLM_TOKENIZER_PATH", raising=False)
+    message = {"author": "Marco", "content": "x" * 40}
+    first = message_tokens(message)
+    assert message["token_count"] == first
+    assert message["tokenizer"] == "heuristic"
+
+    message["content"] = "cambiado"  # el registro ya tiene su cuenta: no se re-tokeniza
+    assert message_tokens(message) == first
+
+
+def test_pack_messages_fills_budget_newest_first(monkeypatch):
+    monkeypatch.delenv("LLM_TOKENIZER_PATH", raising=False)
+    messages = [{"author": "A", "content": "x" * 400}] + [{"author": "B", "content": "y" * 8} for _ in range(5)]
+    packed = pack_messages(messages, 30)
+    assert packed == messages[1:]
+    # Un mensaje largo al final se incluye igualmente (min_recent=1).
+    assert pack_messages(messages[::-1], 30) == [messages[0]]
+
+
+def test_llm_notary_packs_recent_messages(monkeypatch):
+    monkeypatch.delenv("LLM_TOKENIZER_PATH", raising=False)
+    monkeypatch.setenv("NOTARY_CONTEXT_TOKENS", "20")
+    prompts = []
+
+    def fake_send(messages, **kwargs):
+        prompts.append(messages[1]["content"])
+        return json.dumps({"summary_text": "ok", "facts_json": [], "open_threads_json": []})
+
+    monkeypatch.setattr(notary_processor, "send_message", fake_send)
+    recent = [{"author": "Marco", "turn": 1, "content": f"mensaje largo {i} " * 5} for i in range(6)]
+    LLMNotaryProcessor().process(game_id="g1", turn=2, recent_messages=recent)
+
+    assert "mensaje largo 5" in prompts[0]
+    assert "mensaje largo 0" not in prompts[0]
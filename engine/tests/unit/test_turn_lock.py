@@ -0,0 +1,144 @@
+"""Tests del cerrojo de turno por partida."""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import routes as routes_module
+from src.api.app import app
+from src.api.schemas import AuthUserResponse
+from src.core import turn_lock as tl
+from src.core.engine import GameEngine
+from src.core.turn_lock import RedisTurnLocks, TurnInProgressError, TurnLocks
+from src.queueing.game_channel import LocalGameEventChannel
+
+
+def test_reject_policy_fails_fast_and_cleans_up():
+    locks = TurnLocks(policy="reject")
+    locks.acquire("g1")
+    assert locks.is_locked("g1")
+    with pytest.raises(TurnInProgressError):
+        locks.acquire("g1")
+    locks.acquire("g2")  # otras partidas no se bloquean
+    locks.release("g1")
+    locks.release("g2")
+    assert locks._locks == {}
+    with locks.hold("g1"):
+        assert locks.is_locked("g1")
+
+
+def test_queue_policy_waits_for_previous_turn():
+    locks = TurnLocks(policy="queue", wait_seconds=2)
+    locks.acquire("g1")
+    threading.Timer(0.05, lambda: locks.release("g1")).start()
+    t0 = time.monotonic()
+    locks.acquire("g1")
+    assert time.monotonic() - t0 >= 0.04
+    locks.release("g1")
+
+
+
+def test_queue_policy_can_skip_waiting():
+    locks = TurnLocks(policy="queue", wait_seconds=2)
+    locks.acquire("g1")
+    t0 = time.monotonic()
+    with pytest.raises(TurnInProgressError):
+        locks.acquire("g1", wait=False)
+    assert time.monotonic() - t0 < 0.5
+    locks.release("g1")
+    assert locks._locks == {}
+
+class _FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def set(self, key, value, nx=False, px=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def eval(self, _script, _numkeys, key, token):
+        if self.values.get(key) == token:
+            del self.values[key]
+            return 1
+        return 0
+
+
+def test_redis_locks_serialize_turns_across_processes(monkeypatch):
+    client = _FakeRedis()
+    module = type("M", (), {"Redis": type("Redis", (), {"from_url": staticmethod(lambda *_a, **_k: client)})})
+    monkeypatch.setattr(tl.importlib, "import_module", lambda _name: module)
+    worker_a = RedisTurnLocks(policy="reject")
+    worker_b = RedisTurnLocks(policy="reject")
+
+    worker_a.acquire("g1")
+    assert worker_b.is_locked("g1")
+    with pytest.raises(TurnInProgressError):
+        worker_b.acquire("g1")
+    assert not worker_b._locks  # el cerrojo local de B no queda tomado
+    worker_a.release("g1")
+    assert client.values == {}
+    with worker_b.hold("g1"):
+        assert "agora:turn_lock:g1" in client.values
+
+
+
+def test_redis_error_does_not_leak_local_lock(monkeypatch):
+    client = _FakeRedis()
+    module = type("M", (), {"Redis": type("Redis", (), {"from_url": staticmethod(lambda *_a, **_k: client)})})
+    monkeypatch.setattr(tl.importlib, "import_module", lambda _name: module)
+    locks = RedisTurnLocks(policy="reject")
+
+    def _down(*_args, **_kwargs):
+        raise ConnectionError("redis down")
+
+    monkeypatch.setattr(client, "set", _down)
+    with pytest.raises(ConnectionError):
+        locks.acquire("g1")
+    assert locks._locks == {}
+    assert not locks.is_locked("g1")
+
+    monkeypatch.delattr(client, "set")
+    with locks.hold("g1"):  # Redis de vuelta: la partida no quedó bloqueada
+        assert "agora:turn_lock:g1" in client.values
+
+def test_execute_turn_stream_rejects_concurrent_turn():
+    engine = GameEngine(persistence_provider=object(), event_channel=LocalGameEventChannel())
+    engine._turn_locks.acquire("g1")
+    try:
+        events = list(engine.execute_turn_stream("g1", "hola"))
+    finally:
+        engine._turn_locks.release("g1")
+    assert [ev["type"] for ev in events] == ["error"]
+    engine.check_turn_available("g1")  # libre otra vez
+    with engine._turn_locks.hold("g1"), pytest.raises(TurnInProgressError):
+        engine.check_turn_available("g1")
+
+
+def test_turn_endpoint_answers_409_while_turn_runs():
+    class _BusyEngine:
+        def game_belongs_to_user(self, _session_id, _username):
+            return True
+
+        def get_status(self, _session_id):
+            return {"player_can_write": True}
+
+        def check_turn_available(self, session_id):
+            raise TurnInProgressError(session_id)
+
+    app.dependency_overrides[routes_module.get_engine] = lambda: _BusyEngine()
+    app.dependency_overrides[routes_module.get_current_user] = lambda: AuthUserResponse(
+        id="u1", username="alice", is_active=True
+    )
+    try:
+        res = TestClient(app).post("/game/turn", json={"session_id": "sid-1", "text": "hola"})
+        assert res.status_code == 409
+        assert res.headers["Retry-After"] == "1"
+    finally:
+        app.dependency_overrides.clear()
@@ -33,6 +33,8 @@
     streamingNode: null,
     observerThinking: false,
     games_list: [],
+    games_next_cursor: null,
+    games_loading_more: false,
     games_loading: false,
     games_error: null,
     ui: {
@@ -319,9 +321,28 @@
     return url.pathname + url.search;
   }
 
+  // 409 con X-Agora-Session-Owner: otro worker está escribiendo la partida y suelta el lease
+  // al acabar el turno. Se reintenta tras Retry-After (el 409 de turno en curso no la lleva).
+  const SESSION_HANDOFF_RETRIES = 3;
+
+  async function fetchWithHandoff(url, init) {
+    for (let attempt = 0; ; attempt += 1) {
+      const res = await fetch(url, init);
+      if (
+        res.status !== 409 ||
+        !res.headers.has("X-Agora-Session-Owner") ||
+        attempt >= SESSION_HANDOFF_RETRIES
+      ) {
+        return res;
+      }
+      const retryAfter = Math.min(Math.max(Number(res.headers.get("Retry-After")) || 1, 1), 10);
+      await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+    }
+  }
+
   async function apiGet(path, params) {
     const url = API_BASE + apiUrl(path, params);
-    const res = await fetch(url, { credentials: "include" });
+    const res = await fetchWithHandoff(url, { credentials: "include" });
     if (res.status === 401) {
       await handleAuthExpired();
       throw new Error("Necesitas iniciar sesión.");
@@ -339,7 +360,7 @@
 
   async function apiPost(path, payload) {
     const url = API_BASE + path;
-    const res = await fetch(url, {
+    const res = await fetchWithHandoff(url, {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       credentials: "include",
@@ -367,6 +388,7 @@
     store.screen = "login";
     store.session_id = null;
     store.games_list = [];
+    store.games_next_cursor = null;
     store.ui.userMenuOpen = false;
     store.ui.gamesPanelOpen = false;
     store.ui.storyPanelOpen = false;
@@ -831,6 +853,7 @@
   async function fetchGamesList() {
     if (!store.auth.isAuthenticated) {
       store.games_list = [];
+      store.games_next_cursor = null;
       store.games_loading = false;
       renderGamesDrawer();
       renderLandingGames();
@@ -843,8 +866,10 @@
     try {
       const data = await apiGet("/game/list");
       store.games_list = Array.isArray(data.games) ? data.games : [];
+      store.games_next_cursor = data.next_cursor || null;
     } catch (e) {
       store.games_list = [];
+      store.games_next_cursor = null;
       store.games_error = e.message || "Error al cargar historias";
     } finally {
       store.games_loading = false;
@@ -853,6 +878,23 @@
     }
   }
 
+  async function fetchMoreGames() {
+    if (!store.games_next_cursor || store.games_loading_more) return;
+    store.games_loading_more = true;
+    renderGamesDrawer();
+    try {
+      const data = await apiGet("/game/list", { cursor: store.games_next_cursor });
+      const more = Array.isArray(data.games) ? data.games : [];
+      store.games_list = store.games_list.concat(more);
+      store.games_next_cursor = data.next_cursor || null;
+    } catch (e) {
+      showError(e.message || "Error al cargar historias");
+    } finally {
+      store.games_loading_more = false;
+      renderGamesDrawer();
+    }
+  }
+
   function formatShortDate(value) {
     if (!value) return "";
     const d = new Date(value);
@@ -1427,9 +1469,12 @@
       return;
     }
     const games = Array.isArray(store.games_list) ? store.games_list : [];
+    const loadMore = store.games_next_cursor
+      ? `<button type="button" class="game-item games-load-more" data-games-load-more="1"${store.games_loading_more ? " disabled" : ""}>${store.games_loading_more ? "Cargando…" : "Cargar más historias"}</button>`
+      : "";
     list.innerHTML = buildGamesMarkup(games, {
       emptyMessage: "Aún no tienes historias guardadas.",
-    });
+    }) + loadMore;
   }
 
   function renderLanding() {
@@ -1674,9 +1719,10 @@
     renderChat();
     updateInputState();
 
-    const url = API_BASE + "/game/turn";
+    // session_id también en la query: la afinidad del proxy (hash $arg_session_id) cubre el turno.
+    const url = API_BASE + apiUrl("/game/turn", { session_id: store.session_id });
     try {
-      const res = await fetch(url, {
+      const res = await fetchWithHandoff(url, {
         method: "POST",
         headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
         credentials: "include",
@@ -1924,6 +1970,10 @@
   });
   if (gamesDrawer) {
     gamesDrawer.addEventListener("click", (e) => {
+      if (e.target && e.target.closest && e.target.closest("[data-games-load-more]")) {
+        fetchMoreGames();
+        return;
+      }
       const target = e.target && e.target.closest ? e.target.closest("[data-game-id]") : null;
       if (!target) return;
       const gameId = target.getAttribute("data-game-id");